@@ -26,6 +26,7 @@ import {
 import { messaging, VAPIDKEY } from "@/firebase/firebaseConfig";
 import { NirmaanUsers } from "@/types/NirmaanStack/NirmaanUsers";
 import {
+  handleNotificationBatchEvent,
   handlePOAmendedEvent,
   handlePONewEvent,
   handlePRApproveNewEvent,
@@ -494,6 +495,10 @@ export function NewSidebar() {
     handlePRDeleteEvent(event, delete_notification);
   });
 
+  useFrappeEventListener("notifications:batch", async (event) => {
+    await handleNotificationBatchEvent(db, event, add_new_notification, delete_notification);
+  });
+
   useFrappeDocTypeEventListener("Project Payments", async (event) => {
     if (role === "Nirmaan Admin Profile" || user_id === "Administrator") {
       await adminPaymentsDataMutate();
@@ -26,7 +26,7 @@ import { getToken } from "firebase/messaging";
 import { messaging, VAPIDKEY } from "@/firebase/firebaseConfig";
 import { useNotificationStore } from "@/zustand/useNotificationStore";
 import { useDocCountStore } from "@/zustand/useDocCountStore";
-import { handlePRDeleteEvent, handlePRNewEvent, handlePRVendorSelectedEvent, handleSBVendorSelectedEvent, handlePOAmendedEvent, handlePRApproveNewEvent, handlePONewEvent, handleSBNewEvent, handleSRVendorSelectedEvent, handleSRApprovedEvent } from "@/zustand/eventListeners";
+import { handlePRDeleteEvent, handlePRNewEvent, handlePRVendorSelectedEvent, handleSBVendorSelectedEvent, handlePOAmendedEvent, handlePRApproveNewEvent, handlePONewEvent, handleSBNewEvent, handleSRVendorSelectedEvent, handleSRApprovedEvent, handleNotificationBatchEvent } from "@/zustand/eventListeners";
 
 export const NavBar = () => {
     const [collapsed, setCollapsed] = useState(false);
@@ -280,6 +280,10 @@ export const NavBar = () => {
         handlePRDeleteEvent(event, delete_notification);
     });
 
+    useFrappeEventListener("notifications:batch", async (event) => {
+        await handleNotificationBatchEvent(db, event, add_new_notification, delete_notification);
+    });
+
     // useFrappeEventListener("pr:statusChanged", async (event) => { // not working
     //     await handlePRStatusChangedEvent(role, user_id);
     // });
@@ -19,7 +19,11 @@ interface InvoiceItem {
     date: string,
     updated_by: string,
     invoice_attachment_id: string,
-    procurement_order: string
+    status?: string
+    document_type: "Procurement Orders" | "Service Requests"
+    document_name: string
+    procurement_order?: string
+    service_request?: string
     vendor: string
     vendor_name: string
 }
@@ -29,6 +33,8 @@ interface InvoicesDataCallResponse {
         invoice_entries: InvoiceItem[];
         total_invoices: number;
         total_amount: number;
+        start: number;
+        page_length: number;
     },
     status: number;
 }
@@ -153,25 +159,25 @@ const invoiceColumns: ColumnDef<InvoiceItem>[] =
         },
       },
       {
-        accessorKey: "procurement_order",
+        accessorKey: "document_name",
         header: ({ column }) => (
-          <DataTableColumnHeader column={column} title="Procurement Order" />
+          <DataTableColumnHeader column={column} title="PO / SR" />
         ),
         cell: ({ row }) => {
-          const po = row.original.procurement_order;
-          // Optionally, use a helper to transform or fetch PO details.
+          const { document_type, document_name } = row.original;
+          const isSR = document_type === "Service Requests";
           return (
             <div className="font-medium flex items-center">
-              {po}
+              {document_name}
               <HoverCard>
                 <HoverCardTrigger>
                   <Info
-                    onClick={() => navigate(`po/${po.replaceAll('/', "&=")}`)}
+                    onClick={() => navigate(isSR ? `/service-requests/${document_name}?tab=approved-sr` : `po/${document_name.replaceAll('/', "&=")}`)}
                     className="w-4 h-4 text-blue-600 cursor-pointer inline-block ml-1"
                   />
                 </HoverCardTrigger>
                 <HoverCardContent className="w-auto rounded-md shadow-lg">
-                  Click to view Procurement Order details.
+                  Click to view {isSR ? "Service Request" : "Procurement Order"} details.
                 </HoverCardContent>
               </HoverCard>
             </div>
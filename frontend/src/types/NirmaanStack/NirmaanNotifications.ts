@@ -36,4 +36,6 @@ export interface NirmaanNotifications{
 	type?: "info" | "warning" | "alert"
 	/**	Event Id : Data	*/
 	event_id: string
+	/**	Digest Count : Int - Number of notifications about this document this row stands for after compaction	*/
+	digest_count?: number
 }
\ No newline at end of file
@@ -101,6 +101,16 @@ export interface ProcurementOrder {
 	status: string
 	/**	Delivery Contact : Data	*/
 	delivery_contact?: string
+	/**	Amount : Currency	*/
+	amount?: number
+	/**	Tax Amount : Currency	*/
+	tax_amount?: number
+	/**	Additional Charges : Currency	*/
+	additional_charges?: number
+	/**	Additional Charges Tax : Currency	*/
+	additional_charges_tax?: number
+	/**	Total Amount : Currency	*/
+	total_amount?: number
 	custom? : string
 	delivery_data?: {data : DeliveryDataType}
 	invoice_data?: {data : InvoiceDataType}
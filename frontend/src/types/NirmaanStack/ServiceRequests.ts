@@ -46,5 +46,11 @@ export interface ServiceRequests{
 	advance?: string
 	/**	Project GST : Data	*/
 	project_gst?: string
+	/**	Amount : Currency	*/
+	amount?: number
+	/**	Tax Amount : Currency	*/
+	tax_amount?: number
+	/**	Total Amount : Currency	*/
+	total_amount?: number
 	invoice_data?: {data : InvoiceDataType}
 }
\ No newline at end of file
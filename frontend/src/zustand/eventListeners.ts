@@ -79,4 +79,19 @@ export const handleSRApprovedEvent = async (db, event, add_new_notification) =>
 
 export const handleSOAmendedEvent = async (db, event, add_new_notification) => {
     await handleNotification(db, event, add_new_notification)
-}
\ No newline at end of file
+}
+
+// Event listener for "notifications:batch": several events for this user,
+// coalesced per (event, docname) and published once after commit
+export const handleNotificationBatchEvent = async (db, batch, add_new_notification, delete_notification) => {
+    for (const { event, message } of batch?.events || []) {
+        const notificationIds = message?.notificationIds?.length ? message.notificationIds : [message?.notificationId];
+        for (const notificationId of notificationIds) {
+            if (event.endsWith(":delete")) {
+                handlePRDeleteEvent({ ...message, notificationId }, delete_notification);
+            } else {
+                await handleNotification(db, { ...message, notificationId }, add_new_notification);
+            }
+        }
+    }
+};
@@ -1,5 +1 @@
 __version__ = "0.0.1"
-
-from nirmaan_stack.integrations.firebase.firebase_admin_setup import initializeFirebase
-
-initializeFirebase()
\ No newline at end of file
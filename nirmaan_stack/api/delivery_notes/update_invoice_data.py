@@ -101,6 +101,8 @@ from frappe.model.document import Document
 from datetime import datetime
 from typing import Optional
 import json # Import json for cleaner handling if needed, though Frappe often handles it
+from nirmaan_stack.api.projects.project_wise_invoice_data import bump_project_invoice_version
+from nirmaan_stack.nirmaan_stack.doctype.vendor_invoices.vendor_invoices import add_invoice_entry, delete_invoice_entry_row
 
 @frappe.whitelist()
 def update_invoice_data(docname: str, invoice_data: str, invoice_attachment: str = None, isSR: bool = False):
@@ -154,6 +156,7 @@ def update_invoice_data(docname: str, invoice_data: str, invoice_attachment: str
         # 2. Add invoice data to the document's JSON field (including status)
         # Pass the attachment_id to be included in the stored data
         date_key_used = add_invoice_history(doc, new_invoice_entry_data, attachment_id)
+        add_invoice_entry(doc, date_key_used, doc.invoice_data["data"][date_key_used])
 
         # 3. Create the associated Task
         try:
@@ -166,6 +169,7 @@ def update_invoice_data(docname: str, invoice_data: str, invoice_attachment: str
 
         # 4. Save the main document (PO or SR)
         doc.save(ignore_permissions=True) # Consider permissions if needed
+        bump_project_invoice_version(doc.get("project"))
 
         # --- Commit Transaction ---
         frappe.db.commit()
@@ -373,6 +377,7 @@ def delete_invoice_entry(docname: str, date_key: str, isSR: bool = False):
 
         # 3. Delete the invoice entry from the dictionary
         del invoice_data_dict[date_key]
+        delete_invoice_entry_row(doctype, docname, date_key)
 
         # 4. Update the field on the document
         #    Important: Use doc.set() which marks the document as dirty
@@ -380,6 +385,7 @@ def delete_invoice_entry(docname: str, date_key: str, isSR: bool = False):
 
         # 5. Save the parent document
         doc.save(ignore_permissions=True) # Save changes to PO/SR
+        bump_project_invoice_version(doc.get("project"))
 
         # --- Commit Transaction ---
         frappe.db.commit()
@@ -1,6 +1,7 @@
 import frappe
 
 import frappe
+from nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary import rebuild_project_ledgers
 
 @frappe.whitelist()
 def handle_merge_pos(po_id: str, merged_items: list, order_data: dict):
@@ -64,7 +65,9 @@ def handle_merge_pos(po_id: str, merged_items: list, order_data: dict):
 
         for po_name in merge_hierarchy.keys():
             frappe.delete_doc("Procurement Orders", po_name)
-        
+
+        # Statuses were changed with set_value, which skips the ledger doc_events
+        rebuild_project_ledgers([po_doc.project])
         frappe.db.commit()
 
         return {
@@ -99,6 +102,7 @@ def handle_unmerge_pos(po_id: str, prev_merged_pos: list):
         
         frappe.db.delete("Nirmaan Attachments", {"associated_docname": ("=", po_id)})
         frappe.delete_doc("Procurement Orders", po_id)
+        rebuild_project_ledgers([po_doc.project])
         frappe.db.commit()
 
         return {"message": "Successfully unmerged PO(s)", "status": 200}
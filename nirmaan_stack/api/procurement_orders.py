@@ -1,5 +1,12 @@
+import csv
+import io
+import tempfile
+
 import frappe
 from frappe import _
+from frappe.utils import cint, get_datetime, getdate
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
 
 
 
@@ -107,60 +114,344 @@ from frappe import _
 #     }
 
 
+# ----------------------------------------------------------------------
+# PO item rows
+# ----------------------------------------------------------------------
+# One query expands order_list in PostgreSQL and joins the Procurement
+# Request for the work package (custom POs carry it per item as
+# procurement_package). Used by generate_po_summary and export_po_summary.
+# Rows are ordered by (PO creation, PO name, line number), which is also
+# the keyset generate_po_summary and export_po_summary page on.
+
+NUMERIC_TEXT_PATTERN = r"'^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)\s*$'"
+PO_ITEM_WORK_PACKAGE = "(CASE WHEN po.custom = 'true' THEN item ->> 'procurement_package' ELSE pr.work_package END)"
+PO_ITEMS_FROM = """
+    FROM "tabProcurement Orders" po
+    LEFT JOIN "tabProcurement Requests" pr ON pr.name = po.procurement_request
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(po.order_list::jsonb -> 'list') = 'array'
+            THEN po.order_list::jsonb -> 'list' ELSE '[]'::jsonb END
+    ) WITH ORDINALITY AS line(item, item_index)
+"""
+PO_ITEMS_SELECT = f"""
+    SELECT
+        po.name AS po_number,
+        po.creation,
+        po.vendor AS vendor_id,
+        po.vendor_name,
+        {PO_ITEM_WORK_PACKAGE} AS work_package,
+        item ->> 'category' AS category,
+        item ->> 'name' AS item_id,
+        item ->> 'item' AS item_name,
+        item ->> 'unit' AS unit,
+        item -> 'quantity' AS quantity,
+        item -> 'received' AS received,
+        item -> 'quote' AS quote,
+        item -> 'tax' AS tax,
+        (po.custom = 'true') AS custom,
+        line.item_index
+"""
+PO_ITEMS_ORDER = "po.creation, po.name, line.item_index"
+PO_ITEMS_AFTER = "(po.creation, po.name, line.item_index) > (%(after_creation)s, %(after_po)s, %(after_index)s)"
+
+
+def _po_item_number(key):
+    """An order_list item value as a number (0 when missing or not numeric)."""
+    value = f"(item ->> '{key}')"
+    return (
+        f"(CASE WHEN jsonb_typeof(item -> '{key}') = 'number' THEN {value}::numeric"
+        f" WHEN {value} ~ {NUMERIC_TEXT_PATTERN} THEN TRIM({value})::numeric ELSE 0 END)"
+    )
+
+
+# group_by -> (grouping expression, selected group columns)
+PO_ITEM_GROUPS = {
+    "item": ("item ->> 'name'", [
+        "item ->> 'name' AS item_id",
+        "MAX(item ->> 'item') AS item_name",
+        "MAX(item ->> 'unit') AS unit",
+        "MAX(item ->> 'category') AS category",
+    ]),
+    "category": ("item ->> 'category'", ["item ->> 'category' AS category"]),
+}
+PO_ITEM_GROUP_TOTALS = f"""
+    SUM({_po_item_number("quantity")}) AS quantity,
+    SUM({_po_item_number("received")}) AS received,
+    SUM({_po_item_number("quantity")} * {_po_item_number("quote")}) AS amount,
+    SUM({_po_item_number("quantity")} * {_po_item_number("quote")} * (1 + {_po_item_number("tax")} / 100)) AS amount_with_tax,
+    COUNT(DISTINCT po.name) AS po_count
+"""
+
+
+def get_po_item_conditions(
+    project_id=None, vendor=None, status=None, category=None, work_package=None, from_date=None, to_date=None
+):
+    """
+    WHERE clause (merged POs excluded) and query values for the PO item
+    filters. `status` may be a single status or a list. Without a project,
+    rows are limited to the projects the user may read (project-scoped
+    User Permissions).
+    """
+    conditions = ["po.status != 'Merged'"]
+    values = {}
+    if project_id:
+        conditions.append("po.project = %(project_id)s")
+        values["project_id"] = project_id
+    else:
+        projects = frappe.get_list("Projects", pluck="name")
+        if projects:
+            conditions.append("po.project IN %(projects)s")
+            values["projects"] = tuple(projects)
+        else:
+            conditions.append("FALSE")
+    if vendor:
+        conditions.append("po.vendor = %(vendor)s")
+        values["vendor"] = vendor
+    if status:
+        status = frappe.parse_json(status) if isinstance(status, str) and status.startswith("[") else status
+        conditions.append("po.status IN %(status)s")
+        values["status"] = tuple(status) if isinstance(status, (list, tuple)) else (status,)
+    if category:
+        conditions.append("item ->> 'category' = %(category)s")
+        values["category"] = category
+    if work_package:
+        conditions.append(f"{PO_ITEM_WORK_PACKAGE} = %(work_package)s")
+        values["work_package"] = work_package
+    if from_date:
+        conditions.append("po.creation >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        conditions.append("po.creation < %(to_date)s::date + 1")
+        values["to_date"] = getdate(to_date)
+    return " AND ".join(conditions), values
+
+
+def get_po_item_groups(group_by, conditions, values) -> list:
+    """PO item totals aggregated per item or per category, largest amount first."""
+    group_key, group_columns = PO_ITEM_GROUPS[group_by]
+    return frappe.db.sql(
+        f"""
+        SELECT {", ".join(group_columns)}, {PO_ITEM_GROUP_TOTALS}
+        {PO_ITEMS_FROM}
+        WHERE {conditions}
+        GROUP BY {group_key}
+        ORDER BY amount DESC
+        """,
+        values,
+        as_dict=True
+    )
+
+
 @frappe.whitelist()
-def generate_po_summary(project_id: str):
+def generate_po_summary(
+    project_id: str,
+    vendor: str = None,
+    status=None,
+    category: str = None,
+    work_package: str = None,
+    from_date: str = None,
+    to_date: str = None,
+    group_by: str = None,
+    page_length: int = 0,
+    after=None
+):
     """
     API to get PO summary rows item-wise for a project
+
+    Args:
+        project_id (str): The project.
+        vendor (str, optional): Vendor ID.
+        status (str | list, optional): PO status(es). Merged POs are always excluded.
+        category (str, optional): Item category.
+        work_package (str, optional): Work package (procurement package for custom POs).
+        from_date (str, optional): POs created on or after this date.
+        to_date (str, optional): POs created on or before this date.
+        group_by (str, optional): "item" or "category" to get aggregated totals instead of rows.
+        page_length (int, optional): Maximum rows returned; 0 (default) returns all of them.
+        after (dict | str, optional): The "next_cursor" of the previous page.
+
+    Returns:
+        dict: po_items and custom (rows of regular and custom POs) and
+        next_cursor (None on the last page); with group_by, groups.
     """
-    # Fetch all Procurement Orders for the given project_id that are not merged
-    po_records = frappe.get_all(
-        "Procurement Orders",
-        filters={
-            "project": project_id,
-            "status": ["!=", "Merged"]
-        },
-        fields=["name", "vendor", "vendor_name", "creation", "procurement_request", "order_list", "custom"]
+    conditions, values = get_po_item_conditions(
+        project_id=project_id, vendor=vendor, status=status, category=category,
+        work_package=work_package, from_date=from_date, to_date=to_date
     )
 
+    if group_by:
+        if group_by not in PO_ITEM_GROUPS:
+            frappe.throw(_("Invalid group_by: {0}. Use one of {1}").format(group_by, ", ".join(PO_ITEM_GROUPS)))
+        return {"groups": get_po_item_groups(group_by, conditions, values)}
+
+    if after:
+        after = frappe.parse_json(after)
+        conditions += f" AND {PO_ITEMS_AFTER}"
+        values.update({
+            "after_creation": get_datetime(after["creation"]),
+            "after_po": after["po_number"],
+            "after_index": cint(after["item_index"]),
+        })
+
+    page_length = cint(page_length)
+    query = f"{PO_ITEMS_SELECT} {PO_ITEMS_FROM} WHERE {conditions} ORDER BY {PO_ITEMS_ORDER}"
+    if page_length:
+        query += " LIMIT %(page_length)s"
+        values["page_length"] = page_length
+
+    rows = frappe.db.sql(query, values, as_dict=True)
+
     po_items = []
     custom_items = []
+    for row in rows:
+        # Append to the correct list
+        if row.pop("custom"):
+            custom_items.append(row)
+        else:
+            po_items.append(row)
 
-    for po in po_records:
-        # Parse the order_list JSON field to process individual items
-        order_list = frappe.parse_json(po.get("order_list", "{}")).get("list", [])
-        is_custom = po.get('custom') == "true"
-        
-        # Fetch the associated Procurement Request to get the work_package (only if not custom)
-        work_package = None
-        if po.get("procurement_request") and not is_custom:
-            pr_doc = frappe.get_value("Procurement Requests", po["procurement_request"], "work_package")
-            work_package = pr_doc
-       
-        # Process each item in the order_list
-        for item in order_list:
-            item_data = {
-                "po_number": po["name"],
-                "vendor_id": po["vendor"],
-                "vendor_name": po["vendor_name"],
-                "creation": po["creation"],
-                "item_id": item.get("name"),
-                "quote": item.get("quote"),
-                "quantity": item.get("quantity"),
-                "received": item.get("received"),
-                "category": item.get("category"),
-                "tax": item.get("tax"),
-                "unit": item.get("unit"),
-                "item_name": item.get("item"),
-                "work_package": work_package if not is_custom else item.get("procurement_package")
-            }
-
-            # Append to the correct list
-            if is_custom:
-                custom_items.append(item_data)
-            else:
-                po_items.append(item_data)
+    next_cursor = None
+    if page_length and len(rows) == page_length:
+        last = rows[-1]
+        next_cursor = {"creation": str(last.creation), "po_number": last.po_number, "item_index": last.item_index}
 
     return {
         "po_items": po_items,
-        "custom": custom_items
-    }
\ No newline at end of file
+        "custom": custom_items,
+        "next_cursor": next_cursor
+    }
+
+
+# ----------------------------------------------------------------------
+# PO item summary export (CSV / XLSX)
+# ----------------------------------------------------------------------
+# export_po_summary reads the PO item rows EXPORT_FETCH_SIZE at a time,
+# each batch continuing after the last row of the previous one (the same
+# keyset as generate_po_summary), writing them straight into the CSV /
+# XLSX writer. The file is spooled to disk once it outgrows
+# EXPORT_SPOOL_SIZE and streamed back from there: the database connection
+# is closed when the request handler returns, so the rows cannot be
+# fetched while the body is being sent. Memory use is constant whatever
+# the number of rows.
+
+EXPORT_FETCH_SIZE = 2000
+EXPORT_SPOOL_SIZE = 1024 * 1024  # bytes
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+PO_ITEM_COLUMNS = (
+    ("po_number", "PO Number"),
+    ("creation", "PO Date"),
+    ("vendor_id", "Vendor ID"),
+    ("vendor_name", "Vendor"),
+    ("work_package", "Work Package"),
+    ("category", "Category"),
+    ("item_id", "Item ID"),
+    ("item_name", "Item"),
+    ("unit", "Unit"),
+    ("quantity", "Quantity"),
+    ("received", "Received"),
+    ("quote", "Rate"),
+    ("tax", "Tax %"),
+    ("custom", "Custom PO"),
+    ("item_index", "Line No"),
+)
+NUMERIC_PO_ITEM_COLUMNS = ("quantity", "received", "quote", "tax")
+
+
+def iter_po_item_rows(filters, fetch_size=EXPORT_FETCH_SIZE):
+    """Yields PO item rows (tuples in PO_ITEM_COLUMNS order), one keyset-paged query per `fetch_size` rows."""
+    conditions, values = get_po_item_conditions(**filters)
+    values["fetch_size"] = fetch_size
+    order = f"ORDER BY {PO_ITEMS_ORDER} LIMIT %(fetch_size)s"
+
+    rows = frappe.db.sql(f"{PO_ITEMS_SELECT} {PO_ITEMS_FROM} WHERE {conditions} {order}", values)
+    next_query = f"{PO_ITEMS_SELECT} {PO_ITEMS_FROM} WHERE {conditions} AND {PO_ITEMS_AFTER} {order}"
+    while rows:
+        yield from rows
+        if len(rows) < fetch_size:
+            break
+        last = rows[-1]
+        values.update({"after_creation": last[1], "after_po": last[0], "after_index": last[-1]})
+        rows = frappe.db.sql(next_query, values)
+
+
+def _write_csv(rows, file):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text)
+    writer.writerow([label for _, label in PO_ITEM_COLUMNS])
+    writer.writerows(rows)
+    text.flush()
+    text.detach()
+
+
+def _to_number(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return value
+
+
+def _write_xlsx(rows, file):
+    from openpyxl import Workbook
+
+    numeric = [index for index, (key, _) in enumerate(PO_ITEM_COLUMNS) if key in NUMERIC_PO_ITEM_COLUMNS]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("PO Summary")
+    sheet.append([label for _, label in PO_ITEM_COLUMNS])
+    for row in rows:
+        row = list(row)
+        for index in numeric:
+            row[index] = _to_number(row[index])
+        sheet.append(row)
+    workbook.save(file)
+
+
+@frappe.whitelist()
+def export_po_summary(
+    project_id: str = None,
+    vendor: str = None,
+    status=None,
+    category: str = None,
+    work_package: str = None,
+    from_date: str = None,
+    to_date: str = None,
+    file_format: str = "csv"
+):
+    """
+    Downloads the item-wise PO summary as a CSV or XLSX file.
+
+    Args:
+        project_id (str, optional): Limit to one project; by default every project the user may read.
+        vendor (str, optional): Vendor ID.
+        status (str | list, optional): PO status(es). Merged POs are always excluded.
+        category (str, optional): Item category.
+        work_package (str, optional): Work package (procurement package for custom POs).
+        from_date (str, optional): POs created on or after this date.
+        to_date (str, optional): POs created on or before this date.
+        file_format (str, optional): "csv" (default) or "xlsx".
+    """
+    if file_format not in EXPORT_FORMATS:
+        frappe.throw(_("Unsupported export format: {0}").format(file_format))
+    frappe.has_permission("Procurement Orders", "read", throw=True)
+    if project_id:
+        frappe.has_permission("Projects", doc=project_id, throw=True)
+
+    filters = {
+        "project_id": project_id, "vendor": vendor, "status": status, "category": category,
+        "work_package": work_package, "from_date": from_date, "to_date": to_date
+    }
+    file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    writer = _write_xlsx if file_format == "xlsx" else _write_csv
+    writer(iter_po_item_rows(filters), file)
+    file.seek(0)
+
+    filename = f"po_summary_{project_id or 'all'}.{file_format}"
+    response = Response(
+        wrap_file(frappe.local.request.environ, file),
+        mimetype=EXPORT_FORMATS[file_format],
+        direct_passthrough=True
+    )
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -1,88 +1,169 @@
 import frappe
 from frappe import _
+from frappe.utils import cint, flt
 from frappe.utils.caching import redis_cache
 
+# ----------------------------------------------------------------------
+# Project-wise invoice report
+# ----------------------------------------------------------------------
+# The invoice entries of a project (the Vendor Invoices rows of its POs
+# and SRs) are cached in Redis under the project's invoice version.
+# update_invoice_data, delete_invoice_entry, update_invoice_task_status,
+# PO / SR deletion and rebuild_vendor_invoices bump the version once their
+# transaction commits, so the next request
+# reads fresh data under a new key; entries cached under older versions
+# simply expire.
+# Sorting and pagination are applied to the cached list on every request.
+
+INVOICE_VERSION_CACHE_PREFIX = "project_invoice_version:"
+INVOICE_ENTRIES_CACHE_TTL = 6 * 60 * 60  # seconds
+INVOICE_SOURCES = ("Procurement Orders", "Service Requests")
+INVOICE_SORT_KEYS = {
+    "date": lambda entry: entry["date"],
+    "vendor": lambda entry: (entry.get("vendor_name") or "").lower(),
+    "amount": lambda entry: flt(entry["amount"]),
+}
+
+
+def _invoice_version_key(project_id: str) -> str:
+    return frappe.cache().make_key(f"{INVOICE_VERSION_CACHE_PREFIX}{project_id}")
+
+
+def get_project_invoice_version(project_id: str) -> int:
+    try:
+        return cint(frappe.cache().get(_invoice_version_key(project_id)))
+    except Exception as e:
+        frappe.logger().error(f"Invoice version read failed: {e}")
+        return 0
+
+
+def bump_project_invoice_version(project_id: str) -> None:
+    """Invalidates the cached invoice entries of a project once the current transaction commits."""
+    if not project_id:
+        return
+
+    def bump():
+        try:
+            frappe.cache().incr(_invoice_version_key(project_id))
+        except Exception as e:
+            frappe.logger().error(f"Invoice version bump failed for {project_id}: {e}")
+
+    frappe.db.after_commit.add(bump)
+
+
+@redis_cache(ttl=INVOICE_ENTRIES_CACHE_TTL, shared=True)
+def get_project_invoice_entries(project_id: str, version: int = 0) -> list:
+    """
+    All invoice entries of the project's Procurement Orders and Service
+    Requests, read from Vendor Invoices. `version` is only part of the cache key.
+    """
+    rows = frappe.get_all(
+        "Vendor Invoices",
+        filters={"project": project_id, "document_type": ("in", INVOICE_SOURCES)},
+        fields=[
+            "date_key", "invoice_no", "amount", "status", "updated_by", "invoice_attachment",
+            "document_type", "document_name", "vendor"
+        ],
+        order_by="invoice_date asc"
+    )
+    vendors = list({row.vendor for row in rows if row.vendor})
+    vendor_names = dict(frappe.get_all(
+        "Vendors", filters={"name": ("in", vendors)}, fields=["name", "vendor_name"], as_list=True
+    )) if vendors else {}
+
+    invoice_entries = []
+    for row in rows:
+        entry = {
+            "date": row.date_key,
+            "invoice_no": row.invoice_no,
+            "amount": row.amount,
+            "status": row.status,
+            "updated_by": row.updated_by,
+            "invoice_attachment_id": row.invoice_attachment,
+            "document_type": row.document_type,
+            "document_name": row.document_name,
+            "vendor": row.vendor,
+            "vendor_name": vendor_names.get(row.vendor)
+        }
+        if row.document_type == "Procurement Orders":
+            entry["procurement_order"] = row.document_name
+        else:
+            entry["service_request"] = row.document_name
+        invoice_entries.append(entry)
+
+    return invoice_entries
+
+
 @frappe.whitelist()
-@redis_cache(shared=True)
-def generate_project_wise_invoice_data(project_id: str):
+def generate_project_wise_invoice_data(
+    project_id: str,
+    sort_by: str = "date",
+    sort_order: str = "desc",
+    start: int = 0,
+    page_length: int = 0
+):
     """
-    Generate consolidated invoice data for all Procurement Orders in a project.
-    
+    Generate consolidated invoice data for all Procurement Orders and Service Requests in a project.
+
     Args:
         project_id (str): The ID of the project for which invoice data is to be generated.
-        
+        sort_by (str, optional): "date", "vendor" or "amount". Defaults to "date".
+        sort_order (str, optional): "asc" or "desc". Defaults to "desc".
+        start (int, optional): Offset of the first entry returned.
+        page_length (int, optional): Number of entries returned; 0 returns all of them.
+
     Returns:
         dict: {
                 "message": {
                     "invoice_entries": List[InvoiceEntry],
                     "total_invoices": number,
-                    "total_amount": number
+                    "total_amount": number,
+                    "start": number,
+                    "page_length": number
                  },
                  "status": 200
               }
         where InvoiceEntry includes:
             - invoice_no (str)
             - amount (number)
+            - status (str, optional)
             - invoice_attachment_id (str, optional)
             - updated_by (str)
             - date (str)  (The key from each invoice_data object)
-            - procurement_order (str) (PO ID)
+            - document_type (str) ("Procurement Orders" or "Service Requests")
+            - document_name (str)
+            - procurement_order (str) (PO ID) or service_request (str) (SR ID)
             - vendor (str) (Vendor ID)
             - vendor_name (str) (Vendor Name)
-            
+        total_invoices and total_amount cover all entries, not only the page.
+
     Raises:
         frappe.DoesNotExistError: If the project is not found.
         Exception: For other unexpected errors.
     """
+    if sort_by not in INVOICE_SORT_KEYS:
+        frappe.throw(_("Invalid sort_by: {0}. Use one of {1}").format(sort_by, ", ".join(INVOICE_SORT_KEYS)))
+
     try:
         # Validate project existence; if not found, throw a DoesNotExistError.
         if not frappe.db.exists("Projects", project_id):
             frappe.throw(_("Project {0} not found").format(project_id), frappe.DoesNotExistError)
 
-        # Fetch all procurement orders for the given project.
-        procurement_orders = frappe.get_all(
-            "Procurement Orders",
-            filters={"project": project_id},
-            fields=["name", "invoice_data", "vendor", "vendor_name"]
+        invoice_entries = sorted(
+            get_project_invoice_entries(project_id, get_project_invoice_version(project_id)),
+            key=INVOICE_SORT_KEYS[sort_by],
+            reverse=sort_order != "asc"
         )
 
-        invoice_entries = []
-
-        # Loop through each procurement order and extract invoice data.
-        for po in procurement_orders:
-            # Skip if there is no invoice data or if the structure is not a dict.
-            if not po.get("invoice_data") or not isinstance(po.invoice_data, dict):
-                continue
-
-            # Expecting invoice_data to have a "data" key with a dictionary of invoice entries.
-            invoice_data = po.invoice_data.get("data", {})
-
-            for date_str, invoice_item in invoice_data.items():
-                # Validate that required keys are present before adding the entry.
-                if not all(key in invoice_item for key in ["invoice_no", "amount", "updated_by"]):
-                    frappe.log_error(
-                        _("Invalid invoice data structure in PO {0}").format(po.name),
-                        "Invoice Data Validation"
-                    )
-                    continue
-
-                entry = {
-                    "date": date_str,
-                    "invoice_no": invoice_item["invoice_no"],
-                    "amount": invoice_item["amount"],
-                    "updated_by": invoice_item["updated_by"],
-                    "invoice_attachment_id": invoice_item.get("invoice_attachment_id"),
-                    "procurement_order": po.name,
-                    "vendor": po.vendor,
-                    "vendor_name": po.vendor_name
-                }
-                invoice_entries.append(entry)
+        start, page_length = cint(start), cint(page_length)
+        page = invoice_entries[start:start + page_length] if page_length else invoice_entries[start:]
 
         formatted_invoice_entries = {
-            # "invoice_entries": sorted(invoice_entries, key=lambda x: x["date"]),
-            "invoice_entries": invoice_entries,  # Optionally sort if needed
+            "invoice_entries": page,
             "total_invoices": len(invoice_entries),
-            "total_amount": sum(entry["amount"] for entry in invoice_entries)
+            "total_amount": sum(flt(entry["amount"]) for entry in invoice_entries),
+            "start": start,
+            "page_length": page_length
         }
 
         return {"message": formatted_invoice_entries, "status": 200}
@@ -3,6 +3,7 @@ import frappe
 import json # Ensure json is imported if not already
 # Import necessary functions from the hooks file
 from ..integrations.Notifications.pr_notifications import PrNotification, get_admin_users, get_allowed_lead_users
+from ..integrations.Notifications.in_app_notifications import create_notifications_bulk
 from ..integrations.controllers.procurement_requests import validate_procurement_request_for_po
 from ..api.approve_vendor_quotes import generate_pos_from_selection # Make sure this path is correct
 
@@ -215,46 +216,20 @@ def handle_delayed_items(pr_id: str, comments: dict = None):
                         except Exception as e:
                            frappe.log_error(f"Failed to send push notification to {user.get('name')}: {e}", "handle_delayed_items Notification")
 
-                    # --- Send In-App Notification ---
-                    # (Assuming Nirmaan Notifications DocType exists and logic is similar)
-                    try:
-                        title = f"PR Requires Approval: {pr_doc.name}"
-                        description = f"Vendors selected for PR {pr_doc.name}, but PO validation failed. Please review."
-                        message = {
-                            "title": title,
-                            "description": description,
-                            "project": pr_doc.project,
-                            "work_package": pr_doc.work_package if not custom else "Custom",
-                            "sender": frappe.session.user,
-                            "docname": pr_doc.name
-                        }
-                        new_notification_doc = frappe.new_doc('Nirmaan Notifications')
-                        new_notification_doc.recipient = user['name']
-                        new_notification_doc.recipient_role = user['role_profile']
-                        if frappe.session.user != 'Administrator':
-                            new_notification_doc.sender = frappe.session.user
-                        new_notification_doc.title = message["title"]
-                        new_notification_doc.description = message["description"]
-                        new_notification_doc.document = 'Procurement Requests'
-                        new_notification_doc.docname = pr_doc.name
-                        new_notification_doc.project = pr_doc.project
-                        new_notification_doc.work_package = pr_doc.work_package if not custom else "Custom"
-                        new_notification_doc.seen = "false"
-                        new_notification_doc.type = "info"
-                        new_notification_doc.event_id = "pr:vendorSelected"
-                        new_notification_doc.action_url = f"purchase-orders/{pr_doc.name}?tab=Approve%20PO"
-                        new_notification_doc.insert()
-
-                        message["notificationId"] = new_notification_doc.name
-                        print(f"running publish realtime for: {user}")
-
-                        frappe.publish_realtime(
-                            event="pr:vendorSelected",  # Custom event name
-                            message=message,
-                            user=user['name']  # Notify only specific users
-                        )
-                    except Exception as e:
-                       frappe.log_error(f"Failed to send in-app notification to {user.get('name')}: {e}", "handle_delayed_items Notification")
+                # --- Send In-App Notifications ---
+                try:
+                    create_notifications_bulk("pr:vendorSelected", lead_admin_users, {
+                        "title": f"PR Requires Approval: {pr_doc.name}",
+                        "description": f"Vendors selected for PR {pr_doc.name}, but PO validation failed. Please review.",
+                        "project": pr_doc.project,
+                        "work_package": pr_doc.work_package if not custom else "Custom",
+                        "sender": frappe.session.user,
+                        "docname": pr_doc.name,
+                        "document": 'Procurement Requests',
+                        "action_url": f"purchase-orders/{pr_doc.name}?tab=Approve%20PO",
+                    })
+                except Exception as e:
+                   frappe.log_error(f"Failed to send in-app notifications for PR {pr_doc.name}: {e}", "handle_delayed_items Notification")
             else:
                 print(f"No lead/admin users found for notification on PR {pr_id} reaching Vendor Selected state.")
 
@@ -1,6 +1,8 @@
 import frappe
 from frappe.model.document import Document
 import json
+from nirmaan_stack.api.projects.project_wise_invoice_data import bump_project_invoice_version
+from nirmaan_stack.nirmaan_stack.doctype.vendor_invoices.vendor_invoices import set_invoice_entry_status
 
 @frappe.whitelist()
 def update_invoice_task_status(task_id: str, new_task_status: str):
@@ -94,6 +96,7 @@ def update_invoice_task_status(task_id: str, new_task_status: str):
 
         # Update the status within the JSON entry
         invoice_data_dict[date_key]["status"] = new_task_status
+        set_invoice_entry_status(parent_doctype, parent_docname, date_key, new_task_status)
         # Optional: Add approved/rejected by info
         # invoice_data_dict[date_key]["processed_by"] = assignee_name
         # invoice_data_dict[date_key]["processed_on"] = frappe.utils.now()
@@ -111,6 +114,7 @@ def update_invoice_task_status(task_id: str, new_task_status: str):
         # 5. Save Both Documents
         parent_doc.save(ignore_permissions=True) # Save PO/SR
         task.save(ignore_permissions=True)       # Save Task
+        bump_project_invoice_version(parent_doc.get("project"))
 
         # --- Commit Transaction ---
         frappe.db.commit()
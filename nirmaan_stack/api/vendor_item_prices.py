@@ -0,0 +1,67 @@
+import frappe
+from frappe import _
+from nirmaan_stack.nirmaan_stack.doctype.vendor_item_price_index.vendor_item_price_index import INDEX_FIELDS
+
+RANKING_FIELDS = ("last_quote", "min_quote", "median_quote", "weighted_average_quote")
+MAX_VENDORS_PER_ITEM = 50
+
+
+@frappe.whitelist()
+def get_top_vendors_for_items(item_ids, limit: int = 5, city: str = None, state: str = None, order_by: str = "last_quote"):
+    """
+    API to get the cheapest vendors for a set of items from the Vendor Item Price Index
+
+    Args:
+        item_ids (list | str): Item ids (a JSON list is accepted).
+        limit (int, optional): Vendors to return per item. Defaults to 5.
+        city (str, optional): Only consider quotes from vendors in this city.
+        state (str, optional): Only consider quotes from vendors in this state.
+        order_by (str, optional): Price used for ranking, one of RANKING_FIELDS.
+
+    Returns:
+        dict: item_id -> list of index rows, cheapest first, one per vendor
+        (its cheapest city / state when no city or state is given).
+    """
+    item_ids = frappe.parse_json(item_ids) if isinstance(item_ids, str) else item_ids
+    if not item_ids:
+        return {}
+    if order_by not in RANKING_FIELDS:
+        frappe.throw(_("order_by must be one of {0}").format(", ".join(RANKING_FIELDS)))
+    limit = min(max(int(limit), 1), MAX_VENDORS_PER_ITEM)
+
+    conditions = [f"{order_by} > 0", "item_id IN %(item_ids)s"]
+    values = {"item_ids": tuple(set(item_ids)), "limit": limit}
+    if city:
+        conditions.append("city = %(city)s")
+        values["city"] = city
+    if state:
+        conditions.append("state = %(state)s")
+        values["state"] = state
+
+    # The index has a row per (item, vendor, city, state): keep each vendor's
+    # best row, then only the `limit` cheapest vendors of every item
+    rows = frappe.db.sql(
+        f"""
+        SELECT * FROM (
+            SELECT vendor_prices.*, ROW_NUMBER() OVER (
+                PARTITION BY item_id ORDER BY {order_by} ASC, last_po_date DESC
+            ) AS vendor_rank
+            FROM (
+                SELECT DISTINCT ON (item_id, vendor) {", ".join(INDEX_FIELDS)}
+                FROM "tabVendor Item Price Index"
+                WHERE {" AND ".join(conditions)}
+                ORDER BY item_id, vendor, {order_by} ASC, last_po_date DESC
+            ) vendor_prices
+        ) ranked
+        WHERE vendor_rank <= %(limit)s
+        ORDER BY item_id, vendor_rank
+        """,
+        values,
+        as_dict=True
+    )
+
+    top_vendors = {item_id: [] for item_id in item_ids}
+    for row in rows:
+        del row["vendor_rank"]
+        top_vendors[row.item_id].append(row)
+    return top_vendors
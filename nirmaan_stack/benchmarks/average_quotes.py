@@ -0,0 +1,104 @@
+import contextlib
+import json
+import os
+import random
+import time
+from datetime import timezone
+
+from frappe.utils import add_days, now_datetime
+
+from nirmaan_stack.integrations.controllers.procurement_requests import calculate_historical_average_quote
+from nirmaan_stack.integrations.controllers.vectorized_quotes import (
+    calculate_historical_average_quotes_vectorized,
+    to_columns,
+)
+
+
+# ----------------------------------------------------------------------
+# Benchmark: scalar vs. columnar historical average quotes
+# ----------------------------------------------------------------------
+# Generates Approved Quotation rows in memory (quote and quantity stored as
+# text, with a share of dirty values) and times calculate_historical_average_quote
+# once per item against to_columns + calculate_historical_average_quotes_vectorized.
+# The columnar engine gets creation as epoch microseconds, the way
+# get_catalogue_average_quotes fetches it. No database access. Run with:
+# bench --site [site] execute nirmaan_stack.benchmarks.average_quotes.run
+# bench --site [site] execute nirmaan_stack.benchmarks.average_quotes.run --kwargs "{'row_counts': [1000000]}"
+
+DEFAULT_ROW_COUNTS = (100_000, 1_000_000)
+DEFAULT_ITEM_COUNT = 5_000
+HISTORY_DAYS = 730
+DIRTY_VALUES = ("1,250", "abc", "", None, "0")
+
+
+def make_rows(row_count, item_count, rng, dirty_share=0.01):
+    now = now_datetime()
+    rows = []
+    for _ in range(row_count):
+        quote = str(round(rng.uniform(10, 5000), 2))
+        if rng.random() < dirty_share:
+            quote = rng.choice(DIRTY_VALUES)
+        rows.append((
+            f"ITEM-{rng.randrange(item_count):06d}",
+            quote,
+            str(rng.randint(1, 500)),
+            add_days(now, -rng.randint(0, HISTORY_DAYS)),
+        ))
+    return rows
+
+
+def time_scalar(rows):
+    started = time.perf_counter()
+    quotes_by_item = {}
+    for item_id, quote, quantity, creation in rows:
+        quotes_by_item.setdefault(item_id, []).append({"quote": quote, "quantity": quantity, "creation": creation})
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        rates = {
+            item_id: calculate_historical_average_quote(item_quotes, item_id)["averageRate"]
+            for item_id, item_quotes in quotes_by_item.items()
+        }
+    return time.perf_counter() - started, rates
+
+
+def time_vectorized(rows):
+    rows = [
+        (item_id, quote, quantity, int(creation.replace(tzinfo=timezone.utc).timestamp() * 1_000_000))
+        for item_id, quote, quantity, creation in rows
+    ]
+    started = time.perf_counter()
+    columns = to_columns(rows)
+    columns_seconds = time.perf_counter() - started
+    rates = calculate_historical_average_quotes_vectorized(*columns)
+    return time.perf_counter() - started, columns_seconds, rates
+
+
+def run(row_counts=DEFAULT_ROW_COUNTS, item_count=DEFAULT_ITEM_COUNT, seed=42):
+    """
+    Times both engines for every row count and checks they agree.
+
+    Returns:
+        list: One result dict per row count.
+    """
+    rng = random.Random(seed)
+    results = []
+    for row_count in row_counts:
+        rows = make_rows(row_count, item_count, rng)
+        scalar_seconds, scalar_rates = time_scalar(rows)
+        vectorized_seconds, columns_seconds, vectorized_rates = time_vectorized(rows)
+
+        mismatches = sum(
+            1 for item_id, rate in scalar_rates.items()
+            if abs(vectorized_rates.get(item_id, 0.0) - rate) > 1e-6 * max(1.0, abs(rate))
+        )
+        result = {
+            "rows": row_count,
+            "items": len(scalar_rates),
+            "scalar_seconds": round(scalar_seconds, 3),
+            "vectorized_seconds": round(vectorized_seconds, 3),
+            "to_columns_seconds": round(columns_seconds, 3),
+            "speed_up": round(scalar_seconds / vectorized_seconds, 1) if vectorized_seconds else None,
+            "mismatches": mismatches,
+        }
+        results.append(result)
+        print(json.dumps(result))
+    return results
@@ -0,0 +1,80 @@
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ----------------------------------------------------------------------
+# Local stub of the FCM send endpoints
+# ----------------------------------------------------------------------
+# POST /send       {"token": ..., "notification": {...}}      -> one result
+# POST /multicast  {"tokens": [...], "notification": {...}}   -> {"responses": [...]}
+#
+# Every call sleeps `latency` seconds to stand in for the HTTPS round trip
+# to Google. Tokens starting with "unregistered-" or "invalid-" fail with
+# the matching FCM error code, and a title starting with "invalid-payload"
+# fails every token with a payload-level INVALID_ARGUMENT.
+# Point the app at it with
+# bench --site [site] set-config fcm_stub_url http://127.0.0.1:8765
+
+
+def _result_for(token, counter, title=""):
+    if title.startswith("invalid-payload"):
+        return {"success": False, "error": "Invalid value at 'message.webpush.fcm_options.link'", "error_code": "INVALID_ARGUMENT"}
+    if token.startswith("unregistered-"):
+        return {"success": False, "error": "Requested entity was not found.", "error_code": "UNREGISTERED"}
+    if token.startswith("invalid-"):
+        return {"success": False, "error": "The registration token is not a valid FCM registration token", "error_code": "INVALID_ARGUMENT"}
+    return {"success": True, "message_id": f"projects/stub/messages/{next(counter)}"}
+
+
+def make_handler(latency, counter, stats):
+    class FCMStubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            title = (payload.get("notification") or {}).get("title") or ""
+            time.sleep(latency)
+            if self.path.rstrip("/").endswith("/multicast"):
+                tokens = payload.get("tokens", [])
+                body = {"responses": [_result_for(token, counter, title) for token in tokens]}
+            else:
+                tokens = [payload.get("token", "")]
+                body = _result_for(tokens[0], counter, title)
+
+            with stats["lock"]:
+                stats["calls"] += 1
+                stats["tokens"] += len(tokens)
+
+            encoded = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FCMStubHandler
+
+
+def start_stub(host="127.0.0.1", port=0, latency=0.05):
+    """
+    Starts the stub in a daemon thread.
+
+    Returns:
+        (server, url, stats): call server.shutdown() to stop it; stats counts calls and tokens.
+    """
+    stats = {"calls": 0, "tokens": 0, "lock": threading.Lock()}
+    server = ThreadingHTTPServer((host, port), make_handler(latency, itertools.count(1), stats))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}", stats
+
+
+if __name__ == "__main__":
+    server, url, _stats = start_stub(port=8765)
+    print(f"FCM stub listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,96 @@
+import json
+import statistics
+import subprocess
+import sys
+
+
+# ----------------------------------------------------------------------
+# Benchmark: import cost of the nirmaan_stack package
+# ----------------------------------------------------------------------
+# Imports each module in a fresh interpreter with `python -X importtime`,
+# which is what every gunicorn / RQ worker and every bench command pays
+# when it loads the app. Reports the wall time of the import, the
+# cumulative import time of the module, the heaviest dependencies, and
+# whether firebase_admin was pulled in (it should only be imported by the
+# first push notification, see firebase_admin_setup.py).
+#
+# Run with:
+# bench --site [site] execute nirmaan_stack.benchmarks.import_time.run
+# python -m nirmaan_stack.benchmarks.import_time
+
+DEFAULT_MODULES = (
+    "nirmaan_stack",
+    "nirmaan_stack.hooks",
+    "nirmaan_stack.integrations.controllers.procurement_requests",
+    "nirmaan_stack.integrations.Notifications.pr_notifications",
+)
+DEFAULT_RUNS = 5
+TOP_DEPENDENCIES = 10
+WATCHED_PACKAGES = ("firebase_admin", "google.auth", "grpc", "dotenv")
+
+
+def parse_importtime(stderr):
+    """
+    Parses `-X importtime` output.
+
+    Returns:
+        dict: module -> (self_us, cumulative_us)
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure_import(module):
+    """Imports `module` in a fresh interpreter and returns its timings."""
+    script = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = parse_importtime(result.stderr)
+    return {
+        "wall_seconds": float(result.stdout.strip().splitlines()[-1]),
+        "cumulative_us": timings.get(module, (0, 0))[1],
+        "timings": timings,
+    }
+
+
+def run(modules=None, runs=DEFAULT_RUNS):
+    report = []
+    for module in modules or DEFAULT_MODULES:
+        samples = [measure_import(module) for _ in range(runs)]
+        last_timings = samples[-1]["timings"]
+        heaviest = sorted(last_timings.items(), key=lambda item: item[1][0], reverse=True)[:TOP_DEPENDENCIES]
+
+        report.append({
+            "module": module,
+            "runs": runs,
+            "median_wall_ms": round(statistics.median(sample["wall_seconds"] for sample in samples) * 1000, 2),
+            "median_cumulative_ms": round(statistics.median(sample["cumulative_us"] for sample in samples) / 1000, 2),
+            "imports": len(last_timings),
+            "loaded_watched_packages": [
+                package for package in WATCHED_PACKAGES
+                if any(name == package or name.startswith(f"{package}.") for name in last_timings)
+            ],
+            "heaviest_self_ms": {name: round(self_us / 1000, 2) for name, (self_us, _) in heaviest},
+        })
+
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    run()
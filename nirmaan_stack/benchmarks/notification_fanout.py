@@ -0,0 +1,109 @@
+import json
+import os
+import time
+
+import frappe
+import requests
+from frappe.utils import now_datetime
+
+from nirmaan_stack.benchmarks.fcm_stub import start_stub
+from nirmaan_stack.integrations.Notifications.fcm_batch import send_batched_notifications
+
+
+# ----------------------------------------------------------------------
+# Benchmark: push notification fan-out, per-user vs multicast
+# ----------------------------------------------------------------------
+# Sends the same notification to N synthetic recipients through a local FCM
+# stub (see fcm_stub.py), once with one call per recipient (the previous
+# behaviour) and once through send_batched_notifications. Nothing reaches
+# Firebase and nothing is written to the database.
+#
+# Run with:
+# bench --site [site] execute nirmaan_stack.benchmarks.notification_fanout.run
+# bench --site [site] execute nirmaan_stack.benchmarks.notification_fanout.run --kwargs "{'latency': 0.1}"
+
+DEFAULT_RECIPIENT_COUNTS = (10, 100, 1000, 5000)
+DEFAULT_LATENCY = 0.05  # seconds per FCM round trip
+INVALID_TOKEN_EVERY = 50  # every Nth recipient has an unregistered token
+
+
+def make_messages(count):
+    return [
+        {
+            "recipient": f"bench-user-{index}@nirmaan.app",
+            "fcm_token": f"unregistered-{index}" if index % INVALID_TOKEN_EVERY == 0 else f"token-{index}",
+            "title": "PR Approved",
+            "body": "Benchmark notification",
+            "click_action_url": "procurement-requests/BENCH-PR",
+        }
+        for index in range(count)
+    ]
+
+
+def send_one_by_one(stub_url, messages):
+    results = []
+    for message in messages:
+        response = requests.post(f"{stub_url}/send", json={
+            "token": message["fcm_token"],
+            "notification": {"title": message["title"], "body": message["body"]},
+        })
+        results.append(response.json())
+    return results
+
+
+def run(recipient_counts=DEFAULT_RECIPIENT_COUNTS, latency=DEFAULT_LATENCY, output_path=None):
+    """
+    Runs the fan-out benchmark and writes the results as JSON.
+
+    Args:
+        recipient_counts: Numbers of recipients to notify.
+        latency: Simulated FCM round trip per call, in seconds.
+        output_path: Where to write the JSON. Defaults to the site's private/benchmarks folder.
+
+    Returns:
+        str: Path of the written JSON file.
+    """
+    server, stub_url, stats = start_stub(latency=latency)
+    previous_stub_url = frappe.conf.get("fcm_stub_url")
+    frappe.conf.fcm_stub_url = stub_url
+    results = []
+
+    try:
+        for count in recipient_counts:
+            messages = make_messages(count)
+            for mode, sender in (("per_user", lambda: send_one_by_one(stub_url, messages)), ("multicast", lambda: send_batched_notifications(messages))):
+                calls_before = stats["calls"]
+                started = time.perf_counter()
+                delivery = sender()
+                elapsed = time.perf_counter() - started
+                result = {
+                    "mode": mode,
+                    "recipients": count,
+                    "fcm_calls": stats["calls"] - calls_before,
+                    "failed": sum(1 for item in delivery if not item["success"]),
+                    "seconds": round(elapsed, 3),
+                    "messages_per_second": round(count / elapsed, 1) if elapsed else None,
+                }
+                results.append(result)
+                print(json.dumps(result))
+    finally:
+        frappe.conf.fcm_stub_url = previous_stub_url
+        server.shutdown()
+
+    report = {
+        "app_version": frappe.get_attr("nirmaan_stack.__version__"),
+        "generated_at": str(now_datetime()),
+        "latency_seconds": latency,
+        "results": results,
+    }
+
+    if not output_path:
+        output_dir = frappe.get_site_path("private", "benchmarks")
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f"notification_fanout_{now_datetime().strftime('%Y%m%d_%H%M%S')}.json")
+
+    with open(output_path, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+
+    print(f"Benchmark results written to {output_path}")
+    return output_path
@@ -0,0 +1,196 @@
+import contextlib
+import json
+import os
+import random
+import statistics
+import time
+
+import frappe
+from frappe.utils import add_days, now_datetime
+
+from nirmaan_stack.integrations.controllers.item_rate_cache import evict_cached_item_rates
+from nirmaan_stack.integrations.controllers.procurement_requests import (
+    validate_procurement_request,
+    validate_procurement_request_for_po,
+)
+from nirmaan_stack.nirmaan_stack.doctype.item_rate_stats.item_rate_stats import rebuild_item_rate_stats
+
+
+# ----------------------------------------------------------------------
+# Benchmark: PR auto-approval validation at scale
+# ----------------------------------------------------------------------
+# Generates synthetic Items, Approved Quotations and Procurement Requests,
+# times validate_procurement_request / validate_procurement_request_for_po
+# end to end and counts DB queries per call. Everything is written inside
+# one transaction that is rolled back at the end, so it can be pointed at a
+# staging copy of production without leaving data behind.
+#
+# Run with:
+# bench --site [site] execute nirmaan_stack.benchmarks.pr_validation.run
+# bench --site [site] execute nirmaan_stack.benchmarks.pr_validation.run --kwargs "{'quote_counts': [1000, 10000]}"
+
+DEFAULT_ITEMS_PER_PR = (10, 100, 1000)
+DEFAULT_QUOTE_COUNTS = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_RUNS = 5
+HISTORY_DAYS = 730
+INSERT_CHUNK_SIZE = 10_000
+ITEM_PREFIX = "BENCH-ITEM-"
+AQ_PREFIX = "BENCH-AQ-"
+
+
+@contextlib.contextmanager
+def count_queries():
+    """Counts every frappe.db.sql call made inside the block."""
+    counter = {"queries": 0}
+    original_sql = frappe.db.sql
+
+    def counting_sql(*args, **kwargs):
+        counter["queries"] += 1
+        return original_sql(*args, **kwargs)
+
+    frappe.db.sql = counting_sql
+    try:
+        yield counter
+    finally:
+        frappe.db.sql = original_sql
+
+
+def insert_items(count):
+    item_ids = [f"{ITEM_PREFIX}{index:06d}" for index in range(count)]
+    timestamp = now_datetime()
+    frappe.db.bulk_insert(
+        "Items",
+        fields=["name", "creation", "modified", "owner", "modified_by", "item_name", "unit_name"],
+        values=[(item_id, timestamp, timestamp, "Administrator", "Administrator", f"Benchmark {item_id}", "Nos") for item_id in item_ids],
+        chunk_size=INSERT_CHUNK_SIZE
+    )
+    return item_ids
+
+
+def insert_approved_quotations(item_ids, start_index, count, rng):
+    """Spreads `count` quotes over the items, with creation dates across HISTORY_DAYS."""
+    now = now_datetime()
+    values = []
+    for index in range(start_index, start_index + count):
+        creation = add_days(now, -rng.randint(0, HISTORY_DAYS))
+        values.append((
+            f"{AQ_PREFIX}{index:08d}", creation, creation, "Administrator", "Administrator",
+            rng.choice(item_ids), str(round(rng.uniform(10, 5000), 2)), str(rng.randint(1, 500))
+        ))
+        if len(values) >= INSERT_CHUNK_SIZE:
+            _flush_approved_quotations(values)
+            values = []
+    _flush_approved_quotations(values)
+
+
+def _flush_approved_quotations(values):
+    if values:
+        frappe.db.bulk_insert(
+            "Approved Quotations",
+            fields=["name", "creation", "modified", "owner", "modified_by", "item_id", "quote", "quantity"],
+            values=values,
+            chunk_size=INSERT_CHUNK_SIZE
+        )
+
+
+def make_procurement_request(item_ids, rng):
+    """Builds an unsaved Procurement Request with every item Pending and a vendor quote set."""
+    procurement_list = {
+        "list": [
+            {
+                "name": item_id,
+                "item": f"Benchmark {item_id}",
+                "quantity": rng.randint(1, 20),
+                "quote": round(rng.uniform(10, 5000), 2),
+                "status": "Pending",
+            }
+            for item_id in item_ids
+        ]
+    }
+    return frappe.get_doc({
+        "doctype": "Procurement Requests",
+        "name": f"BENCH-PR-{len(item_ids)}",
+        "workflow_state": "Vendor Selected",
+        "procurement_list": json.dumps(procurement_list),
+    })
+
+
+def time_validator(validator, doc, runs, cache_state):
+    durations, queries = [], []
+    for _ in range(runs):
+        if cache_state == "cold":
+            evict_cached_item_rates(item["name"] for item in json.loads(doc.procurement_list)["list"])
+        frappe.local.message_log = []
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), count_queries() as counter:
+            started = time.perf_counter()
+            validator(doc)
+            durations.append((time.perf_counter() - started) * 1000)
+        queries.append(counter["queries"])
+
+    return {
+        "validator": validator.__name__,
+        "cache": cache_state,
+        "runs": runs,
+        "median_ms": round(statistics.median(durations), 3),
+        "min_ms": round(min(durations), 3),
+        "max_ms": round(max(durations), 3),
+        "queries_per_call": round(statistics.median(queries), 1),
+    }
+
+
+def run(items_per_pr=DEFAULT_ITEMS_PER_PR, quote_counts=DEFAULT_QUOTE_COUNTS, runs=DEFAULT_RUNS, output_path=None, seed=42):
+    """
+    Runs the benchmark matrix and writes the results as JSON.
+
+    Args:
+        items_per_pr: PR sizes (number of Pending items) to validate.
+        quote_counts: Approved Quotations history sizes; history is grown incrementally.
+        runs: Timed calls per validator, PR size and cache state.
+        output_path: Where to write the JSON. Defaults to the site's private/benchmarks folder.
+        seed: Seed for the synthetic data generator.
+
+    Returns:
+        str: Path of the written JSON file.
+    """
+    rng = random.Random(seed)
+    items_per_pr = sorted(items_per_pr)
+    results = []
+    item_ids = []
+
+    try:
+        item_ids = insert_items(max(items_per_pr))
+        inserted_quotes = 0
+        for quote_count in sorted(quote_counts):
+            insert_approved_quotations(item_ids, inserted_quotes, quote_count - inserted_quotes, rng)
+            inserted_quotes = quote_count
+            rebuild_item_rate_stats(item_ids)
+
+            for pr_size in items_per_pr:
+                doc = make_procurement_request(item_ids[:pr_size], rng)
+                for validator in (validate_procurement_request, validate_procurement_request_for_po):
+                    for cache_state in ("cold", "warm"):
+                        result = time_validator(validator, doc, runs, cache_state)
+                        result.update({"items_per_pr": pr_size, "approved_quotations": quote_count})
+                        results.append(result)
+                        print(json.dumps(result))
+    finally:
+        frappe.db.rollback()
+        evict_cached_item_rates(item_ids)
+
+    report = {
+        "app_version": frappe.get_attr("nirmaan_stack.__version__"),
+        "generated_at": str(now_datetime()),
+        "seed": seed,
+        "results": results,
+    }
+
+    if not output_path:
+        output_dir = frappe.get_site_path("private", "benchmarks")
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f"pr_validation_{now_datetime().strftime('%Y%m%d_%H%M%S')}.json")
+
+    with open(output_path, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+
+    print(f"Benchmark results written to {output_path}")
+    return output_path
@@ -131,6 +131,7 @@ doc_events = {
 		# "on_trash": "nirmaan_stack.nirmaan_stack.doctype.nirmaan_users.nirmaan_users.delete_user_profile"
 	},
     "Nirmaan Users": {
+        "on_update": "nirmaan_stack.integrations.controllers.nirmaan_users.on_update",
         "on_trash": [
             "nirmaan_stack.integrations.controllers.nirmaan_users.on_trash",
             "nirmaan_stack.integrations.controllers.delete_doc_versions.generate_versions",
@@ -162,8 +163,11 @@ doc_events = {
     },
     "Procurement Requests": {
         # "before_insert": "nirmaan_stack.integrations.controllers.procurement_requests.before_insert",
-        "after_insert": "nirmaan_stack.integrations.controllers.procurement_requests.after_insert",
-        "on_update": "nirmaan_stack.integrations.controllers.procurement_requests.on_update",
+        "after_insert": [
+            "nirmaan_stack.integrations.controllers.procurement_requests.after_insert",
+            "nirmaan_stack.integrations.Notifications.notification_rules.dispatch"
+        ],
+        "on_update": "nirmaan_stack.integrations.Notifications.notification_rules.dispatch",
         "on_trash": [
             "nirmaan_stack.integrations.controllers.procurement_requests.on_trash",
             "nirmaan_stack.integrations.controllers.delete_doc_versions.generate_versions"
@@ -171,16 +175,22 @@ doc_events = {
         "after_delete": "nirmaan_stack.integrations.controllers.procurement_requests.after_delete"
     },
     "Procurement Orders": {
-        "after_insert": "nirmaan_stack.integrations.controllers.procurement_orders.after_insert",
-        "on_update": "nirmaan_stack.integrations.controllers.procurement_orders.on_update",
+        "before_save": "nirmaan_stack.integrations.controllers.order_totals.set_po_totals",
+        "after_insert": "nirmaan_stack.integrations.Notifications.notification_rules.dispatch",
+        "on_update": [
+            "nirmaan_stack.integrations.controllers.procurement_orders.on_update",
+            "nirmaan_stack.integrations.Notifications.notification_rules.dispatch",
+            "nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary.update_project_ledger"
+        ],
         "on_trash": [
             "nirmaan_stack.integrations.controllers.procurement_orders.on_trash",
             "nirmaan_stack.integrations.controllers.delete_doc_versions.generate_versions",
-        ]
+        ],
+        "after_delete": "nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary.update_project_ledger"
     },
     "Sent Back Category": {
-        "after_insert": "nirmaan_stack.integrations.controllers.sent_back_category.after_insert",
-        "on_update": "nirmaan_stack.integrations.controllers.sent_back_category.on_update",
+        "after_insert": "nirmaan_stack.integrations.Notifications.notification_rules.dispatch",
+        "on_update": "nirmaan_stack.integrations.Notifications.notification_rules.dispatch",
         "on_trash": [
             "nirmaan_stack.integrations.controllers.sent_back_category.on_trash",
             "nirmaan_stack.integrations.controllers.delete_doc_versions.generate_versions",
@@ -194,22 +204,35 @@ doc_events = {
             ]
     },
     "Service Requests": {
+        "before_save": "nirmaan_stack.integrations.controllers.order_totals.set_sr_totals",
         "on_trash": [
             "nirmaan_stack.integrations.controllers.service_requests.on_trash",
             "nirmaan_stack.integrations.controllers.delete_doc_versions.generate_versions"
         ],
-        "on_update": "nirmaan_stack.integrations.controllers.service_requests.on_update"
+        "on_update": [
+            "nirmaan_stack.integrations.Notifications.notification_rules.dispatch",
+            "nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary.update_project_ledger"
+        ],
+        "after_delete": "nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary.update_project_ledger"
     },
     "Project Estimates" : {
         "on_trash": "nirmaan_stack.integrations.controllers.delete_doc_versions.generate_versions",
     },
     "Project Payments": {
-        "after_insert": "nirmaan_stack.integrations.controllers.project_payments.after_insert",
-        "on_update": "nirmaan_stack.integrations.controllers.project_payments.on_update",
+        "after_insert": "nirmaan_stack.integrations.Notifications.notification_rules.dispatch",
+        "on_update": [
+            "nirmaan_stack.integrations.Notifications.notification_rules.dispatch",
+            "nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary.update_project_ledger"
+        ],
         "on_trash": [
             "nirmaan_stack.integrations.controllers.project_payments.on_trash",
             "nirmaan_stack.integrations.controllers.delete_doc_versions.generate_versions",
-        ]
+        ],
+        "after_delete": "nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary.update_project_ledger"
+    },
+    "Project Inflows": {
+        "on_update": "nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary.update_project_ledger",
+        "after_delete": "nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary.update_project_ledger"
     },
 }
 
@@ -234,6 +257,17 @@ doc_events = {
 # 	],
 # }
 
+scheduler_events = {
+	"cron": {
+		"* * * * *": [
+			"nirmaan_stack.integrations.Notifications.notification_outbox.process_outbox"
+		]
+	},
+	"daily_long": [
+		"nirmaan_stack.integrations.Notifications.notification_retention.run_notification_retention"
+	]
+}
+
 # Testing
 # -------
 
@@ -325,6 +359,7 @@ fixtures = [
     "Workflow State",
     "Workflow Action Master",
     "Portal Menu Item",
+    "Nirmaan Notification Rule",
     # "Pincodes"
 ]
 
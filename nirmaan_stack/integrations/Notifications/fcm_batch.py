@@ -0,0 +1,166 @@
+import frappe
+import requests
+
+from ..firebase.firebase_admin_setup import get_messaging
+
+# ----------------------------------------------------------------------
+# Batched (multicast) FCM delivery
+# ----------------------------------------------------------------------
+# Messages that share a payload (title, body, click action) are sent to up
+# to FCM_MULTICAST_LIMIT tokens per call instead of one HTTPS round trip per
+# recipient. Per-token results are mapped back to the originating message so
+# failures can be recorded against the user.
+#
+# Setting "fcm_stub_url" in site_config.json sends the batches to a local
+# stub endpoint instead of Firebase (see nirmaan_stack/benchmarks/fcm_stub.py),
+# so fan-out throughput can be measured offline.
+
+FCM_MULTICAST_LIMIT = 500
+# FCM error codes per failure kind; anything else is treated as transient.
+# INVALID_ARGUMENT is also returned for bad payloads (oversized body, bad
+# webpush link, ...), so it only marks the token invalid when the error
+# message names the registration token.
+UNREGISTERED_ERROR_CODES = ("UNREGISTERED", "NOT_FOUND", "SENDER_ID_MISMATCH")
+INVALID_TOKEN_ERROR_CODES = ("INVALID_REGISTRATION",)
+INVALID_ARGUMENT_ERROR_CODE = "INVALID_ARGUMENT"
+INVALID_TOKEN_ERROR_MARKER = "registration token"
+NOTIFICATION_ICON = "https://nirmaan-stack-public-bucket.s3.ap-south-1.amazonaws.com/android-chrome-192x192.png"
+STUB_REQUEST_TIMEOUT = 30  # seconds
+
+
+def build_webpush_config(title, body, click_action_url):
+    messaging = get_messaging()
+    return messaging.WebpushConfig(
+        notification=messaging.WebpushNotification(
+            title=title,
+            body=body,
+            icon=NOTIFICATION_ICON,
+        ),
+        data={"click_action_url": click_action_url}
+    )
+
+
+def classify_delivery_error(error_code, error=None) -> str:
+    """
+    Classifies a failed send by its error code and message:
+    "unregistered" (the app was removed / token expired), "invalid" (the
+    token is malformed), "rejected" (FCM refused the payload; retrying will
+    not help, but the token is fine) or "transient" (worth retrying).
+    """
+    if error_code in UNREGISTERED_ERROR_CODES:
+        return "unregistered"
+    if error_code in INVALID_TOKEN_ERROR_CODES:
+        return "invalid"
+    if error_code == INVALID_ARGUMENT_ERROR_CODE:
+        return "invalid" if INVALID_TOKEN_ERROR_MARKER in (error or "").lower() else "rejected"
+    return "transient"
+
+
+def _delivery_result(success, message_id=None, error=None, error_code=None):
+    return {
+        "success": success,
+        "message_id": message_id,
+        "error": error,
+        "error_code": error_code,
+        "failure": None if success else classify_delivery_error(error_code, error),
+    }
+
+
+def _firebase_error_code(messaging, exception):
+    if isinstance(exception, messaging.UnregisteredError):
+        return "UNREGISTERED"
+    if isinstance(exception, messaging.SenderIdMismatchError):
+        return "SENDER_ID_MISMATCH"
+    return getattr(exception, "code", None) or type(exception).__name__
+
+
+def _send_multicast_with_firebase(tokens, title, body, click_action_url):
+    messaging = get_messaging()
+    message = messaging.MulticastMessage(
+        tokens=tokens,
+        notification=messaging.Notification(title=title, body=body),
+        webpush=build_webpush_config(title, body, click_action_url),
+    )
+    batch_response = messaging.send_each_for_multicast(message)
+    results = []
+    for response in batch_response.responses:
+        if response.success:
+            results.append(_delivery_result(True, message_id=response.message_id))
+        else:
+            exception = response.exception
+            results.append(_delivery_result(
+                False,
+                error=str(exception),
+                error_code=_firebase_error_code(messaging, exception),
+            ))
+    return results
+
+
+def _send_multicast_to_stub(stub_url, tokens, title, body, click_action_url):
+    response = requests.post(
+        f"{stub_url.rstrip('/')}/multicast",
+        json={
+            "tokens": tokens,
+            "notification": {"title": title, "body": body},
+            "data": {"click_action_url": click_action_url},
+        },
+        timeout=STUB_REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return [
+        _delivery_result(item.get("success", False), item.get("message_id"), item.get("error"), item.get("error_code"))
+        for item in response.json()["responses"]
+    ]
+
+
+def send_multicast(tokens, title, body, click_action_url):
+    """
+    Sends one payload to up to FCM_MULTICAST_LIMIT tokens in a single call.
+
+    Returns:
+        list: One result dict (success, message_id, error, error_code, failure) per token, in order.
+    """
+    if len(tokens) > FCM_MULTICAST_LIMIT:
+        frappe.throw(f"At most {FCM_MULTICAST_LIMIT} tokens can be sent in one multicast call")
+
+    stub_url = frappe.conf.get("fcm_stub_url")
+    if stub_url:
+        return _send_multicast_to_stub(stub_url, tokens, title, body, click_action_url)
+    return _send_multicast_with_firebase(tokens, title, body, click_action_url)
+
+
+def send_batched_notifications(messages):
+    """
+    Groups messages by payload and delivers each group with multicast calls
+    of at most FCM_MULTICAST_LIMIT tokens.
+
+    Args:
+        messages: Dicts with recipient, fcm_token, title, body and click_action_url.
+
+    Returns:
+        list: One result dict per message, in the same order. A failed call
+        (network error, stub down, ...) fails every message of its batch.
+    """
+    groups = {}
+    for index, message in enumerate(messages):
+        payload = (message.get("title"), message.get("body"), message.get("click_action_url"))
+        groups.setdefault(payload, []).append(index)
+
+    results = [None] * len(messages)
+    for (title, body, click_action_url), indexes in groups.items():
+        for start in range(0, len(indexes), FCM_MULTICAST_LIMIT):
+            chunk = indexes[start:start + FCM_MULTICAST_LIMIT]
+            tokens = [messages[index].get("fcm_token") for index in chunk]
+            try:
+                chunk_results = send_multicast(tokens, title, body, click_action_url)
+            except Exception as e:
+                frappe.logger().error(f"Multicast notification batch of {len(tokens)} tokens failed: {e}")
+                chunk_results = [_delivery_result(False, error=str(e), error_code="BATCH_FAILED")] * len(chunk)
+
+            for index, result in zip(chunk, chunk_results):
+                results[index] = result
+                if not result["success"]:
+                    frappe.logger().error(
+                        f"Failed to send notification to {messages[index].get('recipient')}: {result['error_code']} {result['error']}"
+                    )
+    return results
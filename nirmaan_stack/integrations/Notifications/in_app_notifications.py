@@ -0,0 +1,79 @@
+import frappe
+from frappe.utils import now_datetime
+
+from .realtime_buffer import queue_realtime
+from .unread_counters import increment_unread_counts
+
+NOTIFICATION_FIELDS = ("title", "description", "document", "docname", "project", "work_package", "type", "action_url")
+ROW_ONLY_FIELDS = ("document", "type", "action_url")  # Not part of the realtime message
+
+
+def create_notifications_bulk(event, recipients, payload, recipient_overrides=None):
+    """
+    Creates one Nirmaan Notifications row per recipient with a single
+    multi-row insert, queues the realtime event for every recipient (see
+    realtime_buffer.py) and commits once, which publishes the events.
+
+    Args:
+        event (str): Event id, stored on the rows and used as the realtime event name.
+        recipients (list): Nirmaan Users dicts with name and role_profile. Duplicates are notified once.
+        payload (dict): Notification fields (NOTIFICATION_FIELDS). Every key except
+            ROW_ONLY_FIELDS is also sent as the realtime message, where "sender"
+            defaults to the session user.
+        recipient_overrides (callable, optional): user -> dict of NOTIFICATION_FIELDS
+            that differ per recipient (e.g. a role specific action_url).
+
+    Returns:
+        dict: recipient -> name of the created notification.
+    """
+    unique_recipients = {}
+    for user in recipients or []:
+        unique_recipients.setdefault(user["name"], user)
+    if not unique_recipients:
+        return {}
+
+    timestamp = now_datetime()
+    session_user = frappe.session.user
+    sender = session_user if session_user != "Administrator" else None
+    values = {field: payload.get(field) for field in NOTIFICATION_FIELDS}
+    values["type"] = values["type"] or "info"
+
+    notification_names = {}
+    rows = []
+    for recipient, user in unique_recipients.items():
+        name = frappe.generate_hash(length=10)
+        notification_names[recipient] = name
+        row_values = {**values, **recipient_overrides(user)} if recipient_overrides else values
+        rows.append((
+            name, timestamp, timestamp, session_user, session_user,
+            recipient, user.get("role_profile"), sender, "false", event,
+            *(row_values[field] for field in NOTIFICATION_FIELDS)
+        ))
+
+    frappe.db.bulk_insert(
+        "Nirmaan Notifications",
+        fields=[
+            "name", "creation", "modified", "owner", "modified_by",
+            "recipient", "recipient_role", "sender", "seen", "event_id",
+            *NOTIFICATION_FIELDS
+        ],
+        values=rows
+    )
+
+    message = {key: value for key, value in payload.items() if key not in ROW_ONLY_FIELDS}
+    message.setdefault("sender", session_user)
+    for recipient, name in notification_names.items():
+        queue_realtime(
+            event=event,
+            message={**message, "notificationId": name},
+            user=recipient
+        )
+
+    # Also flushes the realtime buffer
+    frappe.db.commit()
+    increment_unread_counts([
+        {"recipient": recipient, "event_id": event, "project": values["project"]}
+        for recipient in notification_names
+    ])
+
+    return notification_names
@@ -0,0 +1,185 @@
+import frappe
+from frappe.utils import add_to_date, now_datetime
+
+# ----------------------------------------------------------------------
+# Push notification outbox
+# ----------------------------------------------------------------------
+# Doc-event hooks only write a "Nirmaan Notification Outbox" row per push
+# message. Rows are delivered by process_outbox, which runs in a background
+# worker: it is enqueued once the saving transaction commits and, as a
+# safety net and to pick up retries, every minute from the scheduler.
+# Transient failures are retried with exponential backoff until
+# MAX_SEND_ATTEMPTS; dead tokens fail at once and are pruned (push_health.py).
+
+OUTBOX_DOCTYPE = "Nirmaan Notification Outbox"
+MAX_SEND_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+OUTBOX_BATCH_SIZE = 500
+STALE_SENDING_MINUTES = 10  # Claimed rows of a worker that died are re-queued after this
+PROCESS_OUTBOX_METHOD = "nirmaan_stack.integrations.Notifications.notification_outbox.process_outbox"
+
+
+def enqueue_push_notification(user, title, body, click_action_url):
+    """
+    Queues a push message for a user. Only the outbox row is written in the
+    request; delivery happens in the background after commit.
+
+    Args:
+        user: Nirmaan Users dict/Document with name and fcm_token.
+    """
+    enqueue_push_notifications([{
+        "recipient": user.get("name"),
+        "fcm_token": user.get("fcm_token"),
+        "title": title,
+        "body": body,
+        "click_action_url": click_action_url,
+    }])
+
+
+def enqueue_push_notifications(messages):
+    """
+    Queues many push messages with a single multi-row insert.
+
+    Args:
+        messages: Dicts with recipient, fcm_token, title, body and click_action_url.
+            Messages without a token are skipped.
+    """
+    messages = [message for message in messages if message.get("fcm_token")]
+    if not messages:
+        return
+
+    timestamp = now_datetime()
+    session_user = frappe.session.user
+    frappe.db.bulk_insert(
+        OUTBOX_DOCTYPE,
+        fields=[
+            "name", "creation", "modified", "owner", "modified_by", "recipient", "fcm_token",
+            "title", "body", "click_action_url", "status", "attempts", "next_attempt_at"
+        ],
+        values=[
+            (
+                frappe.generate_hash(length=10), timestamp, timestamp, session_user, session_user,
+                message["recipient"], message["fcm_token"], message.get("title"), message.get("body"),
+                message.get("click_action_url"), "Queued", 0, timestamp
+            )
+            for message in messages
+        ]
+    )
+    schedule_outbox_processing()
+
+
+def schedule_outbox_processing():
+    """Enqueues one outbox run per request, after the transaction commits."""
+    if frappe.flags.notification_outbox_scheduled:
+        return
+    frappe.flags.notification_outbox_scheduled = True
+    frappe.enqueue(PROCESS_OUTBOX_METHOD, queue="short", enqueue_after_commit=True)
+
+
+def get_backoff_seconds(attempts: int) -> int:
+    """Delay before the next attempt: 30s, 60s, 120s, ... capped at BACKOFF_MAX_SECONDS."""
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+def claim_due_messages(limit=OUTBOX_BATCH_SIZE):
+    """
+    Marks up to `limit` due Queued rows as Sending and returns them. Rows
+    locked by a concurrent worker are skipped, so parallel runs never send
+    the same message twice.
+    """
+    Outbox = frappe.qb.DocType(OUTBOX_DOCTYPE)
+    rows = (
+        frappe.qb.from_(Outbox)
+        .select(Outbox.name, Outbox.recipient, Outbox.fcm_token, Outbox.title, Outbox.body, Outbox.click_action_url, Outbox.attempts)
+        .where(Outbox.status == "Queued")
+        .where(Outbox.next_attempt_at <= now_datetime())
+        .orderby(Outbox.next_attempt_at)
+        .limit(limit)
+        .for_update(skip_locked=True)
+    ).run(as_dict=True)
+
+    if rows:
+        frappe.db.set_value(
+            OUTBOX_DOCTYPE,
+            {"name": ["in", [row.name for row in rows]]},
+            {"status": "Sending", "last_attempt_at": now_datetime()},
+            update_modified=False
+        )
+    frappe.db.commit()
+    return rows
+
+
+def requeue_stale_messages():
+    """Returns rows stuck in Sending (worker killed mid-batch) to the queue."""
+    frappe.db.set_value(
+        OUTBOX_DOCTYPE,
+        {"status": "Sending", "last_attempt_at": ["<", add_to_date(now_datetime(), minutes=-STALE_SENDING_MINUTES)]},
+        "status",
+        "Queued",
+        update_modified=False
+    )
+
+
+def record_delivery(row, message_id=None, error=None, permanent=False):
+    """
+    Stores the outcome of one send attempt and schedules a retry on a
+    transient failure. Permanent failures (dead token) are never retried.
+    """
+    timestamp = now_datetime()
+    attempts = (row.attempts or 0) + 1
+    values = {"attempts": attempts, "last_attempt_at": timestamp}
+
+    if error is None:
+        values.update({"status": "Sent", "sent_at": timestamp, "message_id": message_id, "last_error": None})
+    elif permanent or attempts >= MAX_SEND_ATTEMPTS:
+        values.update({"status": "Failed", "last_error": str(error)})
+    else:
+        values.update({
+            "status": "Queued",
+            "last_error": str(error),
+            "next_attempt_at": add_to_date(timestamp, seconds=get_backoff_seconds(attempts)),
+        })
+
+    frappe.db.set_value(OUTBOX_DOCTYPE, row.name, values, update_modified=False)
+
+
+def process_outbox():
+    """
+    Background job: delivers every due outbox message, batch by batch.
+    Messages with the same payload go out together as multicast calls.
+    """
+    from .fcm_batch import send_batched_notifications
+    from .push_health import is_permanent_failure, record_push_results
+
+    requeue_stale_messages()
+    while True:
+        rows = claim_due_messages()
+        if rows:
+            results = send_batched_notifications(rows)
+            for row, result in zip(rows, results):
+                if result["success"]:
+                    record_delivery(row, message_id=result["message_id"])
+                else:
+                    record_delivery(
+                        row,
+                        error=f"{result['error_code']}: {result['error']}",
+                        permanent=is_permanent_failure(result)
+                    )
+            record_push_results(list(zip(rows, results)))
+        frappe.db.commit()
+        if len(rows) < OUTBOX_BATCH_SIZE:
+            break
+
+
+@frappe.whitelist()
+def get_outbox_status(recipient: str = None):
+    """
+    Returns the number of outbox messages per delivery status.
+
+    Args:
+        recipient (str, optional): Limit the counts to one user.
+    """
+    filters = {"recipient": recipient} if recipient else {}
+    rows = frappe.get_list(OUTBOX_DOCTYPE, filters=filters, fields=["status", "count(name) as count"], group_by="status")
+    return {row.status: row.count for row in rows}
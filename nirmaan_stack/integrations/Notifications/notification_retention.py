@@ -0,0 +1,171 @@
+import time
+
+import frappe
+from frappe.query_builder.functions import Count
+from frappe.utils import add_days, cint, now_datetime
+
+from .unread_counters import decrement_unread_counts
+
+# ----------------------------------------------------------------------
+# Retention, archival and compaction of Nirmaan Notifications
+# ----------------------------------------------------------------------
+# Runs daily (see hooks.py) and keeps the hot notifications table bounded:
+#   1. seen notifications older than "notification_retention_days" are
+#      moved to Nirmaan Notification Archive,
+#   2. unseen notifications older than "notification_digest_days" are
+#      compacted per (recipient, document): the newest one is kept as the
+#      digest, with digest_count set to the number of rows it stands for,
+#      and the older ones are archived.
+# Both settings are read from site_config.json. Rows are moved in batches,
+# each one a bulk insert + delete committed on its own, so the job can be
+# interrupted and resumed at any point.
+
+ARCHIVE_DOCTYPE = "Nirmaan Notification Archive"
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_DIGEST_DAYS = 30
+RETENTION_BATCH_SIZE = 2000
+DIGEST_GROUP_BATCH_SIZE = 500
+ARCHIVED_FIELDS = (
+    "title", "description", "document", "docname", "project", "work_package", "seen",
+    "action_url", "type", "event_id", "sender", "recipient", "recipient_role"
+)
+NOTIFICATION_ROW_FIELDS = ["name", "creation", "digest_count", *ARCHIVED_FIELDS]
+
+
+def archive_notifications(rows, reason) -> None:
+    """Copies the rows to the archive (keeping their names) and deletes them."""
+    if not rows:
+        return
+
+    timestamp = now_datetime()
+    frappe.db.bulk_insert(
+        ARCHIVE_DOCTYPE,
+        fields=[
+            "name", "creation", "modified", "owner", "modified_by",
+            *ARCHIVED_FIELDS, "digest_count", "notification_creation", "archived_on", "archive_reason"
+        ],
+        values=[
+            (
+                row.name, timestamp, timestamp, "Administrator", "Administrator",
+                *(row.get(field) for field in ARCHIVED_FIELDS),
+                row.digest_count or 1, row.creation, timestamp, reason
+            )
+            for row in rows
+        ],
+        ignore_duplicates=True
+    )
+    frappe.db.delete("Nirmaan Notifications", {"name": ("in", [row.name for row in rows])})
+
+
+def archive_seen_notifications(cutoff, batch_size=RETENTION_BATCH_SIZE) -> int:
+    """Moves seen notifications created before `cutoff` to the archive. Returns the rows moved."""
+    moved = 0
+    while True:
+        rows = frappe.get_all(
+            "Nirmaan Notifications",
+            filters={"seen": "true", "creation": ("<", cutoff)},
+            fields=NOTIFICATION_ROW_FIELDS,
+            order_by="creation asc",
+            limit=batch_size
+        )
+        if not rows:
+            return moved
+
+        archive_notifications(rows, "Seen")
+        frappe.db.commit()
+        moved += len(rows)
+
+
+def compact_unseen_notifications(cutoff, group_batch_size=DIGEST_GROUP_BATCH_SIZE):
+    """
+    Collapses the unseen notifications created before `cutoff` into one
+    digest per recipient and document.
+
+    Returns:
+        tuple: (rows archived, digests written)
+    """
+    Notifications = frappe.qb.DocType("Nirmaan Notifications")
+    archived = digests = 0
+
+    while True:
+        groups = (
+            frappe.qb.from_(Notifications)
+            .select(Notifications.recipient, Notifications.document, Notifications.docname)
+            .where(Notifications.seen == "false")
+            .where(Notifications.creation < cutoff)
+            .where(Notifications.docname.isnotnull())
+            .groupby(Notifications.recipient, Notifications.document, Notifications.docname)
+            .having(Count(Notifications.name) > 1)
+            .limit(group_batch_size)
+        ).run(as_dict=True)
+        if not groups:
+            return archived, digests
+
+        wanted = {(group.recipient, group.document, group.docname) for group in groups}
+        rows = frappe.get_all(
+            "Nirmaan Notifications",
+            filters={
+                "seen": "false",
+                "creation": ("<", cutoff),
+                "recipient": ("in", list({group.recipient for group in groups})),
+                "docname": ("in", list({group.docname for group in groups})),
+            },
+            fields=NOTIFICATION_ROW_FIELDS,
+            order_by="creation desc"
+        )
+
+        rows_by_group = {}
+        for row in rows:
+            key = (row.recipient, row.document, row.docname)
+            if key in wanted:
+                rows_by_group.setdefault(key, []).append(row)
+
+        to_archive = []
+        for group_rows in rows_by_group.values():
+            digest, older = group_rows[0], group_rows[1:]
+            frappe.db.set_value(
+                "Nirmaan Notifications", digest.name, "digest_count",
+                sum(row.digest_count or 1 for row in group_rows),
+                update_modified=False
+            )
+            to_archive += older
+
+        archive_notifications(to_archive, "Compacted")
+        decrement_unread_counts(to_archive)
+        frappe.db.commit()
+        archived += len(to_archive)
+        digests += len(rows_by_group)
+
+
+def run_notification_retention(retention_days=None, digest_days=None):
+    """
+    Scheduled entry point; also runnable by hand:
+    bench --site [site] execute nirmaan_stack.integrations.Notifications.notification_retention.run_notification_retention
+
+    Returns:
+        dict: rows moved per step and the time taken.
+    """
+    retention_days = cint(retention_days or frappe.conf.get("notification_retention_days") or DEFAULT_RETENTION_DAYS)
+    digest_days = cint(digest_days or frappe.conf.get("notification_digest_days") or DEFAULT_DIGEST_DAYS)
+    now = now_datetime()
+
+    start = time.monotonic()
+    archived_seen = archive_seen_notifications(add_days(now, -retention_days))
+    archive_seconds = time.monotonic() - start
+
+    compacted, digests = compact_unseen_notifications(add_days(now, -digest_days))
+    total_seconds = time.monotonic() - start
+
+    report = {
+        "retention_days": retention_days,
+        "digest_days": digest_days,
+        "archived_seen": archived_seen,
+        "archived_compacted": compacted,
+        "digests": digests,
+        "rows_moved": archived_seen + compacted,
+        "archive_seconds": round(archive_seconds, 2),
+        "compaction_seconds": round(total_seconds - archive_seconds, 2),
+        "total_seconds": round(total_seconds, 2),
+    }
+    frappe.logger().info(f"Notification retention: {report}")
+    return report
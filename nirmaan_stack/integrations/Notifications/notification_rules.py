@@ -0,0 +1,184 @@
+from functools import lru_cache
+
+import frappe
+from frappe.utils import get_url
+from jinja2 import meta
+
+from ..controllers.user_name_cache import get_user_name
+from .in_app_notifications import create_notifications_bulk
+from .notification_outbox import enqueue_push_notifications
+from .project_recipients import ADMIN_PROFILE, get_admin_recipients, get_project_recipients
+
+# ----------------------------------------------------------------------
+# Declarative notification rules
+# ----------------------------------------------------------------------
+# "Nirmaan Notification Rule" rows describe which state transition of which
+# doctype notifies whom, and with what text. dispatch() is hooked on the
+# after_insert / on_update doc_events of every doctype that has rules: it
+# matches the cached rules, resolves the recipients once (project recipient
+# cache), renders the templates and writes all push outbox rows and in-app
+# notifications with one multi-row insert each and a single commit.
+#
+# Templates are Jinja, rendered with:
+#   doc, old_doc      the document and its state before the save
+#   sender, sender_name
+#   project_name      name of doc.project, if any
+#   procurement_request_work_package
+#                     work package of doc.procurement_request, if any
+#   vendor_name       name of doc.vendor, if any
+#   work_package      the rendered work package template
+#   site_url          base URL for push click actions
+#   user              the recipient (push templates only)
+
+RULES_CACHE_KEY = "nirmaan_notification_rules"
+RULE_FIELDS = [
+    "name", "document_type", "trigger", "state_field", "from_states", "to_state", "condition", "event_id",
+    "recipients", "title_template", "description_template", "work_package_template", "action_url_template",
+    "push_title_template", "push_body_template", "push_url_template"
+]
+
+
+def _load_rules():
+    rules = {}
+    for rule in frappe.get_all("Nirmaan Notification Rule", filters={"enabled": 1}, fields=RULE_FIELDS, order_by="name asc"):
+        rule.from_states = [state.strip() for state in (rule.from_states or "").split(",") if state.strip()]
+        rule.recipients = (frappe.parse_json(rule.recipients) or {}).get("list", []) if rule.recipients else []
+        rules.setdefault(f"{rule.document_type}:{rule.trigger}", []).append(rule)
+    return rules
+
+
+def get_rules(document_type, trigger):
+    """Returns the enabled rules of a doctype and trigger (cached)."""
+    return frappe.cache().get_value(RULES_CACHE_KEY, generator=_load_rules).get(f"{document_type}:{trigger}", [])
+
+
+def clear_rules_cache():
+    frappe.cache().delete_value(RULES_CACHE_KEY)
+
+
+def rule_matches(rule, doc, old_doc) -> bool:
+    state_field = rule.state_field or "workflow_state"
+    new_state = doc.get(state_field)
+    if rule.to_state and new_state != rule.to_state:
+        return False
+
+    if rule.trigger == "on_update":
+        old_state = old_doc.get(state_field) if old_doc else None
+        if rule.from_states and old_state not in rule.from_states:
+            return False
+        if rule.to_state and old_doc and old_state == new_state:
+            return False
+
+    if rule.condition and not frappe.safe_eval(rule.condition, None, {"doc": doc, "old_doc": old_doc}):
+        return False
+    return True
+
+
+def resolve_rule_recipients(rule, doc):
+    """Users of the rule's role profiles on doc.project, in rule order, each once."""
+    role_profiles = [recipient.get("role_profile") for recipient in rule.recipients]
+    project_recipients = get_project_recipients(doc.get("project")) if doc.get("project") else {}
+
+    users = []
+    for role_profile in role_profiles:
+        if role_profile == ADMIN_PROFILE:
+            users += get_admin_recipients()
+        else:
+            users += project_recipients.get(role_profile, [])
+
+    seen = set()
+    return [user for user in users if not (user["name"] in seen or seen.add(user["name"]))]
+
+
+def render(template, context):
+    return frappe.render_template(template, context).strip() if template else None
+
+
+@lru_cache(maxsize=256)
+def uses_variable(template, variable) -> bool:
+    """Whether the Jinja template reads `variable` from its context."""
+    return variable in meta.find_undeclared_variables(frappe.get_jenv().parse(template))
+
+
+def dispatch(doc, method=None):
+    """doc_events entry point: fires every rule matching this save."""
+    rules = get_rules(doc.doctype, method)
+    if not rules:
+        return
+
+    old_doc = doc.get_doc_before_save() if method == "on_update" else None
+    for rule in rules:
+        if rule_matches(rule, doc, old_doc):
+            fire_rule(rule, doc, old_doc)
+
+
+def fire_rule(rule, doc, old_doc):
+    users = resolve_rule_recipients(rule, doc)
+    if not users:
+        return
+
+    context = {
+        "doc": doc,
+        "old_doc": old_doc,
+        "sender": frappe.session.user,
+        "sender_name": get_user_name(frappe.session.user),
+        "project_name": frappe.get_cached_value("Projects", doc.project, "project_name") if doc.get("project") else None,
+        "procurement_request_work_package": frappe.get_cached_value(
+            "Procurement Requests", doc.procurement_request, "work_package"
+        ) if doc.get("procurement_request") else None,
+        "vendor_name": frappe.get_cached_value("Vendors", doc.vendor, "vendor_name") if doc.get("vendor") else None,
+        "site_url": get_url(),
+    }
+    context["work_package"] = render(rule.work_package_template, context)
+
+    overrides_by_role = {}
+    for recipient in rule.recipients:
+        overrides = {}
+        if recipient.get("action_url"):
+            overrides["action_url"] = render(recipient["action_url"], context)
+        if recipient.get("push_url"):
+            overrides["push_url"] = render(recipient["push_url"], context)
+        overrides_by_role[recipient.get("role_profile")] = overrides
+
+    if rule.push_title_template:
+        enqueue_push_notifications(build_push_messages(rule, users, context, overrides_by_role))
+
+    create_notifications_bulk(render(rule.event_id, context), users, {
+        "title": render(rule.title_template, context),
+        "description": render(rule.description_template, context),
+        "project": doc.get("project"),
+        "work_package": context["work_package"],
+        "sender": frappe.session.user,
+        "docname": doc.name,
+        "document": doc.doctype,
+        "action_url": render(rule.action_url_template, context),
+    }, recipient_overrides=lambda user: {
+        key: value for key, value in overrides_by_role.get(user["role_profile"], {}).items() if key == "action_url"
+    })
+
+
+def build_push_messages(rule, users, context, overrides_by_role):
+    """
+    Renders the push templates. Templates that do not use the `user`
+    variable are rendered once for the whole event instead of once per
+    recipient.
+    """
+    shared = {}
+    templates = {"title": rule.push_title_template, "body": rule.push_body_template, "click_action_url": rule.push_url_template}
+    for key, template in templates.items():
+        if template and not uses_variable(template, "user"):
+            shared[key] = render(template, context)
+
+    messages = []
+    for user in users:
+        if user.get("push_notification") != "true" or not user.get("fcm_token"):
+            continue
+        user_context = {**context, "user": user}
+        message = {"recipient": user["name"], "fcm_token": user["fcm_token"]}
+        for key, template in templates.items():
+            message[key] = shared[key] if key in shared else render(template, user_context)
+        push_url = overrides_by_role.get(user["role_profile"], {}).get("push_url")
+        if push_url:
+            message["click_action_url"] = push_url
+        messages.append(message)
+    return messages
@@ -0,0 +1,105 @@
+import frappe
+
+# ----------------------------------------------------------------------
+# Project-scoped notification recipients
+# ----------------------------------------------------------------------
+# All Nirmaan Users with a permission on a project are resolved with one
+# join and cached in Redis per project, grouped by role profile. Admins are
+# cached under their own key. Entries are evicted from the User Permission
+# and Nirmaan Users / User hooks (see user_permission.py, nirmaan_users.py).
+
+PROJECT_RECIPIENTS_CACHE_PREFIX = "project_recipients:"
+ADMIN_RECIPIENTS_CACHE_KEY = "project_recipients::admins"
+PROJECT_RECIPIENTS_CACHE_TTL = 6 * 60 * 60  # seconds
+ADMIN_PROFILE = "Nirmaan Admin Profile"
+RECIPIENT_FIELDS = ("fcm_token", "name", "full_name", "role_profile", "push_notification")
+
+
+def _project_cache_key(project: str) -> str:
+    return f"{PROJECT_RECIPIENTS_CACHE_PREFIX}{project}"
+
+
+def _load_project_recipients(project):
+    Users = frappe.qb.DocType("Nirmaan Users")
+    Permissions = frappe.qb.DocType("Nirmaan User Permissions")
+    rows = (
+        frappe.qb.from_(Users)
+        .join(Permissions).on(Permissions.user == Users.name)
+        .select(*(Users[field] for field in RECIPIENT_FIELDS))
+        .where(Permissions.for_value == project)
+        .distinct()
+        .orderby(Users.name)
+    ).run(as_dict=True)
+
+    recipients = {}
+    for row in rows:
+        recipients.setdefault(row.role_profile, []).append(row)
+    return recipients
+
+
+def get_project_recipients(project) -> dict:
+    """
+    Returns every user with access to the project, grouped by role profile.
+
+    Returns:
+        dict: role_profile -> list of Nirmaan Users rows (RECIPIENT_FIELDS).
+    """
+    if not project:
+        return {}
+    return frappe.cache().get_value(
+        _project_cache_key(project),
+        generator=lambda: _load_project_recipients(project),
+        expires_in_sec=PROJECT_RECIPIENTS_CACHE_TTL
+    ) or {}
+
+
+def get_admin_recipients() -> list:
+    """Returns all Nirmaan Admin users (cached)."""
+    return frappe.cache().get_value(
+        ADMIN_RECIPIENTS_CACHE_KEY,
+        generator=lambda: frappe.get_all(
+            "Nirmaan Users",
+            filters={"role_profile": ADMIN_PROFILE},
+            fields=list(RECIPIENT_FIELDS),
+            order_by="name asc"
+        ),
+        expires_in_sec=PROJECT_RECIPIENTS_CACHE_TTL
+    ) or []
+
+
+def get_project_users(project, role_profiles, include_admins=False) -> list:
+    """
+    Flattens the project's recipients for the given role profiles, in the
+    order given, optionally followed by the admins. Each user appears once.
+    """
+    recipients = get_project_recipients(project)
+    users = [user for role_profile in role_profiles for user in recipients.get(role_profile, [])]
+    if include_admins:
+        users += get_admin_recipients()
+
+    seen = set()
+    return [user for user in users if not (user["name"] in seen or seen.add(user["name"]))]
+
+
+def invalidate_project_recipients(projects, include_admins=False) -> None:
+    """
+    Evicts the cached recipients of the given projects, immediately and
+    again after commit so a concurrent reader cannot re-cache stale rows.
+    """
+    keys = [_project_cache_key(project) for project in set(projects) if project]
+    if include_admins:
+        keys.append(ADMIN_RECIPIENTS_CACHE_KEY)
+    if not keys:
+        return
+
+    def evict():
+        frappe.cache().delete_value(keys)
+
+    evict()
+    frappe.db.after_commit.add(evict)
+
+
+def invalidate_user_recipients(user) -> None:
+    """Evicts every cached project the user belongs to, plus the admin list."""
+    projects = frappe.get_all("Nirmaan User Permissions", filters={"user": user}, pluck="for_value", distinct=True)
+    invalidate_project_recipients(projects, include_admins=True)
@@ -0,0 +1,176 @@
+import frappe
+from frappe.utils import now_datetime
+
+from .project_recipients import invalidate_user_recipients
+
+# ----------------------------------------------------------------------
+# Push delivery health and stale FCM token pruning
+# ----------------------------------------------------------------------
+# process_outbox reports every send result here. Per user, "Nirmaan Push
+# Delivery Health" keeps sent / failed counters, the current failure streak
+# and the last error. Tokens that FCM reports as unregistered or invalid
+# are dead: the token is cleared from Nirmaan Users (only if it is still
+# the user's current token), messages still queued for it are cancelled,
+# and the cached recipients are evicted, so no further message is queued
+# for the user until the app registers a new token. A payload FCM rejects
+# fails its message without retry but leaves the token alone.
+
+HEALTH_DOCTYPE = "Nirmaan Push Delivery Health"
+OUTBOX_DOCTYPE = "Nirmaan Notification Outbox"
+DEAD_TOKEN_FAILURES = ("unregistered", "invalid")
+PERMANENT_FAILURES = (*DEAD_TOKEN_FAILURES, "rejected")
+HEALTH_COUNTER_FIELDS = ("sent_count", "failed_count", "consecutive_failures", "tokens_pruned")
+
+
+def is_permanent_failure(result) -> bool:
+    """The message must not be retried."""
+    return not result["success"] and result.get("failure") in PERMANENT_FAILURES
+
+
+def is_dead_token(result) -> bool:
+    """The token itself is unusable and must be pruned."""
+    return not result["success"] and result.get("failure") in DEAD_TOKEN_FAILURES
+
+
+def _summarize(deliveries) -> dict:
+    """Folds (outbox row, result) pairs into one health update per user, in send order."""
+    timestamp = now_datetime()
+    summaries = {}
+    for row, result in deliveries:
+        summary = summaries.setdefault(row.recipient, {
+            "sent": 0, "failed": 0, "streak": 0, "streak_reset": False, "values": {}, "dead_tokens": set()
+        })
+        if result["success"]:
+            summary["sent"] += 1
+            summary["streak"] = 0
+            summary["streak_reset"] = True
+            summary["values"].update({"last_success_at": timestamp, "token_status": "Valid"})
+            continue
+
+        summary["failed"] += 1
+        summary["streak"] += 1
+        summary["values"].update({
+            "last_failure_at": timestamp,
+            "last_error_code": result.get("error_code"),
+            "last_error": result.get("error"),
+        })
+        if is_dead_token(result):
+            summary["dead_tokens"].add(row.fcm_token)
+            summary["values"]["token_status"] = "Unregistered" if result["failure"] == "unregistered" else "Invalid"
+    return summaries
+
+
+def record_push_results(deliveries) -> None:
+    """
+    Updates the delivery health of every recipient in the batch and prunes
+    dead tokens. One read for all users, one write per user.
+
+    Args:
+        deliveries: (outbox row, send result) pairs in the order they were sent.
+    """
+    summaries = _summarize(deliveries)
+    if not summaries:
+        return
+
+    existing = {
+        row.name: row
+        for row in frappe.get_all(
+            HEALTH_DOCTYPE,
+            filters={"name": ("in", list(summaries))},
+            fields=["name", *HEALTH_COUNTER_FIELDS]
+        )
+    }
+
+    timestamp = now_datetime()
+    new_rows = []
+    for user, summary in summaries.items():
+        current = existing.get(user) or {}
+        # A success in this batch resets the streak, otherwise it continues
+        streak_base = 0 if summary["streak_reset"] else (current.get("consecutive_failures") or 0)
+        values = {
+            **summary["values"],
+            "sent_count": (current.get("sent_count") or 0) + summary["sent"],
+            "failed_count": (current.get("failed_count") or 0) + summary["failed"],
+            "consecutive_failures": streak_base + summary["streak"],
+            "tokens_pruned": (current.get("tokens_pruned") or 0) + len(summary["dead_tokens"]),
+        }
+        if user in existing:
+            frappe.db.set_value(HEALTH_DOCTYPE, user, values, update_modified=False)
+        else:
+            new_rows.append((user, values))
+
+        if summary["dead_tokens"]:
+            prune_dead_tokens(user, summary["dead_tokens"])
+
+    if new_rows:
+        fields = ["token_status", *HEALTH_COUNTER_FIELDS, "last_success_at", "last_failure_at", "last_error_code", "last_error"]
+        frappe.db.bulk_insert(
+            HEALTH_DOCTYPE,
+            fields=["name", "creation", "modified", "owner", "modified_by", "user", *fields],
+            values=[
+                (
+                    user, timestamp, timestamp, "Administrator", "Administrator", user,
+                    *(values.get("token_status", "Valid") if field == "token_status" else values.get(field) for field in fields)
+                )
+                for user, values in new_rows
+            ],
+            ignore_duplicates=True
+        )
+
+
+def prune_dead_tokens(user, tokens) -> None:
+    """Clears the user's token if it is one of `tokens` and cancels its queued messages."""
+    tokens = [token for token in tokens if token]
+    if not tokens:
+        return
+
+    frappe.db.set_value(
+        "Nirmaan Users",
+        {"name": user, "fcm_token": ("in", tokens)},
+        "fcm_token",
+        None,
+        update_modified=False
+    )
+    frappe.db.set_value(
+        OUTBOX_DOCTYPE,
+        {"recipient": user, "fcm_token": ("in", tokens), "status": "Queued"},
+        {"status": "Failed", "last_error": "FCM token pruned after a permanent delivery failure"},
+        update_modified=False
+    )
+    invalidate_user_recipients(user)
+    frappe.logger().info(f"Pruned {len(tokens)} dead FCM token(s) of {user}")
+
+
+def mark_token_refreshed(user) -> None:
+    """Called when a user registers a new FCM token: the streak starts over."""
+    if frappe.db.exists(HEALTH_DOCTYPE, user):
+        frappe.db.set_value(
+            HEALTH_DOCTYPE, user,
+            {"token_status": "Valid", "consecutive_failures": 0},
+            update_modified=False
+        )
+
+
+@frappe.whitelist()
+def get_push_delivery_health(user: str = None, unhealthy_only: bool = False):
+    """
+    Returns the push delivery health of one or all users.
+
+    Args:
+        user (str, optional): Limit to one user.
+        unhealthy_only (bool, optional): Only users with a dead token or a failure streak.
+    """
+    filters = {"user": user} if user else {}
+    or_filters = None
+    if frappe.parse_json(unhealthy_only):
+        or_filters = {"token_status": ("!=", "Valid"), "consecutive_failures": (">", 0)}
+    return frappe.get_list(
+        HEALTH_DOCTYPE,
+        filters=filters,
+        or_filters=or_filters,
+        fields=[
+            "user", "token_status", *HEALTH_COUNTER_FIELDS,
+            "last_success_at", "last_failure_at", "last_error_code", "last_error"
+        ],
+        order_by="consecutive_failures desc"
+    )
@@ -0,0 +1,59 @@
+import frappe
+
+# ----------------------------------------------------------------------
+# Request-scoped realtime buffer
+# ----------------------------------------------------------------------
+# queue_realtime() collects notification events per user in frappe.local
+# instead of publishing them one by one. Events with the same
+# (event, docname) are coalesced into one entry whose "notificationIds"
+# lists every notification involved. The buffer is flushed once the
+# transaction commits (dropped on rollback): a user with a single event
+# receives it unchanged, a user with several receives one
+# REALTIME_BATCH_EVENT message, {"events": [{"event", "message"}, ...]},
+# handled by handleNotificationBatchEvent in the frontend.
+
+REALTIME_BATCH_EVENT = "notifications:batch"
+
+
+def _get_buffer() -> dict:
+    buffer = getattr(frappe.local, "nirmaan_realtime_buffer", None)
+    if buffer is None:
+        buffer = frappe.local.nirmaan_realtime_buffer = {}
+        frappe.db.after_commit.add(flush_realtime_buffer)
+        frappe.db.after_rollback.add(clear_realtime_buffer)
+    return buffer
+
+
+def queue_realtime(event, message, user) -> None:
+    """Buffers a realtime event for `user` until the current transaction commits."""
+    entries = _get_buffer().setdefault(user, {})
+    key = (event, message.get("docname"))
+    notification_id = message.get("notificationId")
+
+    entry = entries.get(key)
+    if entry is None:
+        entries[key] = {**message, "notificationIds": [notification_id] if notification_id else []}
+        return
+
+    entry.update({field: value for field, value in message.items() if field != "notificationId"})
+    if notification_id and notification_id not in entry["notificationIds"]:
+        entry["notificationIds"].append(notification_id)
+
+
+def clear_realtime_buffer() -> None:
+    frappe.local.nirmaan_realtime_buffer = None
+
+
+def flush_realtime_buffer() -> None:
+    """Publishes the buffered events, one message per user."""
+    buffer = getattr(frappe.local, "nirmaan_realtime_buffer", None)
+    clear_realtime_buffer()
+    if not buffer:
+        return
+
+    for user, entries in buffer.items():
+        events = [{"event": event, "message": message} for (event, _docname), message in entries.items()]
+        if len(events) == 1 and len(events[0]["message"]["notificationIds"]) <= 1:
+            frappe.publish_realtime(event=events[0]["event"], message=events[0]["message"], user=user)
+        else:
+            frappe.publish_realtime(event=REALTIME_BATCH_EVENT, message={"events": events}, user=user)
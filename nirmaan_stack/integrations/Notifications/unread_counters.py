@@ -0,0 +1,214 @@
+from collections import Counter
+
+import frappe
+from frappe.utils import now_datetime
+
+# ----------------------------------------------------------------------
+# Per-user unread notification counters
+# ----------------------------------------------------------------------
+# Each user has one Redis hash holding the number of unseen Nirmaan
+# Notifications in total, per event_id ("event:<event_id>") and per project
+# ("project:<project>"). The hash is built from the database with one
+# grouped query the first time it is read, and is then kept up to date
+# incrementally:
+#   - create_notifications_bulk increments it after its commit,
+#   - mark_notifications_seen, the Nirmaan Notifications controller and
+#     the on_trash handlers that delete notifications by docname decrement
+#     it once their transaction commits.
+# Increments only apply to a hash that has been built (a Lua script checks
+# the BUILT_FIELD marker), so a partially counted hash is never served.
+# Hashes expire after UNREAD_COUNTS_TTL, which bounds any drift.
+
+UNREAD_COUNTS_CACHE_PREFIX = "nirmaan_unread_counts:"
+UNREAD_COUNTS_TTL = 24 * 60 * 60  # seconds
+TOTAL_FIELD = "total"
+BUILT_FIELD = "_built"
+EVENT_FIELD_PREFIX = "event:"
+PROJECT_FIELD_PREFIX = "project:"
+
+# HINCRBY field/delta pairs (ARGV) on KEYS[1], only if the hash was built
+APPLY_DELTAS_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    for i = 3, #ARGV, 2 do
+        redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+
+def _cache_key(user: str) -> str:
+    return frappe.cache().make_key(f"{UNREAD_COUNTS_CACHE_PREFIX}{user}")
+
+
+def get_count_fields(notification) -> list:
+    """The counter fields a notification contributes to."""
+    fields = [TOTAL_FIELD]
+    if notification.get("event_id"):
+        fields.append(f"{EVENT_FIELD_PREFIX}{notification.get('event_id')}")
+    if notification.get("project"):
+        fields.append(f"{PROJECT_FIELD_PREFIX}{notification.get('project')}")
+    return fields
+
+
+def _collect_deltas(notifications, sign: int) -> dict:
+    deltas = {}
+    for notification in notifications:
+        if notification.get("seen", "false") != "false" or not notification.get("recipient"):
+            continue
+        counter = deltas.setdefault(notification.get("recipient"), Counter())
+        for field in get_count_fields(notification):
+            counter[field] += sign
+    return deltas
+
+
+def _apply_deltas(deltas: dict) -> None:
+    if not deltas:
+        return
+
+    try:
+        cache = frappe.cache()
+        script = cache.register_script(APPLY_DELTAS_SCRIPT)
+        pipeline = cache.pipeline()
+        for user, counter in deltas.items():
+            args = [BUILT_FIELD, UNREAD_COUNTS_TTL]
+            for field, delta in counter.items():
+                if delta:
+                    args += [field, delta]
+            script(keys=[_cache_key(user)], args=args, client=pipeline)
+        pipeline.execute()
+    except Exception as e:
+        # A cache outage must never fail the notification write itself
+        frappe.logger().error(f"Unread notification counter update failed: {e}")
+
+
+def increment_unread_counts(notifications) -> None:
+    """
+    Counts newly created, committed notifications (dicts with recipient,
+    event_id, project and optionally seen).
+    """
+    _apply_deltas(_collect_deltas(notifications, 1))
+
+
+def decrement_unread_counts(notifications) -> None:
+    """
+    Uncounts notifications that were marked seen or deleted. Rows without a
+    "seen" value are treated as unseen. Applied once the current
+    transaction commits, so a rollback leaves the counters untouched.
+    """
+    deltas = _collect_deltas(notifications, -1)
+    if deltas:
+        frappe.db.after_commit.add(lambda: _apply_deltas(deltas))
+
+
+def clear_unread_counts(user: str) -> None:
+    """Drops the user's counters; they are rebuilt on the next read."""
+    frappe.cache().delete(_cache_key(user))
+
+
+def _build_unread_counts(user: str) -> dict:
+    rows = frappe.get_all(
+        "Nirmaan Notifications",
+        filters={"recipient": user, "seen": "false"},
+        fields=["event_id", "project", "count(name) as count"],
+        group_by="event_id, project"
+    )
+
+    counts = Counter()
+    for row in rows:
+        for field in get_count_fields(row):
+            counts[field] += row["count"]
+
+    key = _cache_key(user)
+    pipeline = frappe.cache().pipeline()
+    pipeline.delete(key)
+    pipeline.hset(key, mapping={**counts, BUILT_FIELD: 1})
+    pipeline.expire(key, UNREAD_COUNTS_TTL)
+    pipeline.execute()
+    return dict(counts)
+
+
+def _read_unread_counts(user: str) -> dict:
+    try:
+        # Plain HGETALL through a pipeline: RedisWrapper.hgetall unpickles values
+        pipeline = frappe.cache().pipeline()
+        pipeline.hgetall(_cache_key(user))
+        values = pipeline.execute()[0]
+    except Exception as e:
+        frappe.logger().error(f"Unread notification counter read failed: {e}")
+        values = {}
+
+    counts = {
+        (field.decode() if isinstance(field, bytes) else field): int(value)
+        for field, value in values.items()
+    }
+    if not counts.pop(BUILT_FIELD, None):
+        counts = _build_unread_counts(user)
+    return counts
+
+
+@frappe.whitelist()
+def get_unread_counts():
+    """
+    Returns the session user's unseen notification counts.
+
+    Returns:
+        dict: total, by_event (event_id -> count) and by_project (project -> count).
+    """
+    counts = _read_unread_counts(frappe.session.user)
+
+    result = {"total": max(counts.get(TOTAL_FIELD, 0), 0), "by_event": {}, "by_project": {}}
+    for field, count in counts.items():
+        if count <= 0:
+            continue
+        if field.startswith(EVENT_FIELD_PREFIX):
+            result["by_event"][field[len(EVENT_FIELD_PREFIX):]] = count
+        elif field.startswith(PROJECT_FIELD_PREFIX):
+            result["by_project"][field[len(PROJECT_FIELD_PREFIX):]] = count
+    return result
+
+
+@frappe.whitelist(methods=["POST"])
+def mark_notifications_seen(names=None, event_id=None, project=None, docname=None):
+    """
+    Marks the session user's unseen notifications as seen in one UPDATE and
+    decrements the counters by exactly the rows it flipped, so concurrent
+    calls never uncount a notification twice. Without filters every unseen
+    notification of the user is marked.
+
+    Args:
+        names (list, optional): Notification names.
+        event_id (str, optional): Only notifications of this event.
+        project (str, optional): Only notifications of this project.
+        docname (str, optional): Only notifications about this document.
+
+    Returns:
+        dict: marked (int) and the updated counts.
+    """
+    names = frappe.parse_json(names) if isinstance(names, str) else names
+
+    Notifications = frappe.qb.DocType("Nirmaan Notifications")
+    query = (
+        frappe.qb.update(Notifications)
+        .set(Notifications.seen, "true")
+        .set(Notifications.modified, now_datetime())
+        .where(Notifications.recipient == frappe.session.user)
+        .where(Notifications.seen == "false")
+    )
+    if names:
+        query = query.where(Notifications.name.isin(names))
+    if event_id:
+        query = query.where(Notifications.event_id == event_id)
+    if project:
+        query = query.where(Notifications.project == project)
+    if docname:
+        query = query.where(Notifications.docname == docname)
+
+    marked = query.returning(
+        Notifications.recipient, Notifications.event_id, Notifications.project
+    ).run(as_dict=True)
+
+    decrement_unread_counts(marked)
+    frappe.db.commit()
+    return {"marked": len(marked), "counts": get_unread_counts()}
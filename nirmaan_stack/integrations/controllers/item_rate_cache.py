@@ -0,0 +1,112 @@
+import frappe
+
+# ----------------------------------------------------------------------
+# Shared (cross-worker) cache of item rate estimates
+# ----------------------------------------------------------------------
+# Estimated rates are stored in Redis under one key per item_id, so every
+# gunicorn / RQ worker of the site sees the same entries. Entries expire
+# after ITEM_RATE_CACHE_TTL and are evicted as soon as Approved Quotations
+# of the item are inserted or deleted (see procurement_orders.py).
+
+ITEM_RATE_CACHE_PREFIX = "item_rate_estimate:"
+ITEM_RATE_CACHE_TTL = 6 * 60 * 60  # seconds
+ITEM_RATE_CACHE_HITS_KEY = "item_rate_estimate_cache_hits"
+ITEM_RATE_CACHE_MISSES_KEY = "item_rate_estimate_cache_misses"
+
+
+def _cache_key(item_id: str) -> str:
+    return frappe.cache().make_key(f"{ITEM_RATE_CACHE_PREFIX}{item_id}")
+
+
+def get_cached_item_rates(item_ids: list[str]) -> dict[str, float]:
+    """
+    Fetches the cached rates of the given items with a single MGET and
+    records hits and misses.
+
+    Returns:
+        dict: item_id -> averageRate for the items found in the cache.
+    """
+    if not item_ids:
+        return {}
+
+    cache = frappe.cache()
+    try:
+        values = cache.mget([_cache_key(item_id) for item_id in item_ids])
+        rates = {item_id: float(value) for item_id, value in zip(item_ids, values) if value is not None}
+
+        pipeline = cache.pipeline()
+        pipeline.incrby(cache.make_key(ITEM_RATE_CACHE_HITS_KEY), len(rates))
+        pipeline.incrby(cache.make_key(ITEM_RATE_CACHE_MISSES_KEY), len(item_ids) - len(rates))
+        pipeline.execute()
+        return rates
+    except Exception as e:
+        # A cache outage must never block PR validation
+        frappe.logger().error(f"Item rate cache read failed: {e}")
+        return {}
+
+
+def set_cached_item_rates(rates: dict[str, float]) -> None:
+    """Stores item_id -> averageRate entries with the cache TTL."""
+    if not rates:
+        return
+
+    try:
+        pipeline = frappe.cache().pipeline()
+        for item_id, rate in rates.items():
+            pipeline.set(_cache_key(item_id), repr(float(rate)), ex=ITEM_RATE_CACHE_TTL)
+        pipeline.execute()
+    except Exception as e:
+        frappe.logger().error(f"Item rate cache write failed: {e}")
+
+
+def evict_cached_item_rates(item_ids) -> None:
+    """
+    Evicts the cached rates of the given items, immediately and again once
+    the current transaction commits, so a concurrent reader cannot re-cache
+    a rate computed from pre-commit data.
+    """
+    keys = [_cache_key(item_id) for item_id in set(item_ids) if item_id]
+    if not keys:
+        return
+
+    def evict():
+        try:
+            frappe.cache().delete(*keys)
+        except Exception as e:
+            frappe.logger().error(f"Item rate cache eviction failed: {e}")
+
+    evict()
+    frappe.db.after_commit.add(evict)
+
+
+def clear_item_rate_cache() -> None:
+    """Drops every cached item rate, e.g. after rebuilding Item Rate Stats."""
+    frappe.cache().delete_keys(ITEM_RATE_CACHE_PREFIX)
+
+
+@frappe.whitelist()
+def get_item_rate_cache_stats(reset: bool = False):
+    """
+    Returns the hit/miss counters of the item rate cache.
+
+    Args:
+        reset (bool, optional): Zero the counters after reading them.
+    """
+    frappe.only_for("System Manager")
+
+    cache = frappe.cache()
+    hits_key = cache.make_key(ITEM_RATE_CACHE_HITS_KEY)
+    misses_key = cache.make_key(ITEM_RATE_CACHE_MISSES_KEY)
+
+    hits = int(cache.get(hits_key) or 0)
+    misses = int(cache.get(misses_key) or 0)
+    if frappe.parse_json(reset):
+        cache.delete(hits_key, misses_key)
+
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        "ttl_seconds": ITEM_RATE_CACHE_TTL,
+    }
@@ -1,4 +1,22 @@
 import frappe
+from ..Notifications.project_recipients import invalidate_user_recipients
+from ..Notifications.push_health import mark_token_refreshed
+from .user_name_cache import invalidate_user_names
+from ..Notifications.unread_counters import clear_unread_counts, decrement_unread_counts
+
+RECIPIENT_CACHE_FIELDS = ["full_name", "role_profile", "fcm_token", "push_notification"]
+
+def on_update(doc, method):
+    """
+    Evict cached notification recipients when a field they carry changes
+    (e.g. a new FCM token after login)
+    """
+    if any(doc.has_value_changed(field) for field in RECIPIENT_CACHE_FIELDS):
+        invalidate_user_recipients(doc.name)
+    if doc.has_value_changed("full_name"):
+        invalidate_user_names(doc.name)
+    if doc.fcm_token and doc.has_value_changed("fcm_token"):
+        mark_token_refreshed(doc.name)
 
 def on_trash(doc, method):
     """
@@ -8,10 +26,20 @@ def on_trash(doc, method):
         # frappe.db.begin()
 
         email = doc.name
+        invalidate_user_recipients(email)
+        invalidate_user_names(email)
         # print("Deleting user:", email)
         frappe.db.delete("User Permission", {"user": ("=",email)})
+        sent_notifications = frappe.get_all(
+            "Nirmaan Notifications",
+            filters={"sender": email, "recipient": ("!=", email), "seen": "false"},
+            fields=["recipient", "seen", "event_id", "project"]
+        )
         frappe.db.delete("Nirmaan Notifications", {"recipient": ("=", email)})
         frappe.db.delete("Nirmaan Notifications", {"sender": ("=", email)})
+        frappe.db.delete("Nirmaan Push Delivery Health", {"user": ("=", email)})
+        decrement_unread_counts(sent_notifications)
+        clear_unread_counts(email)
         user = frappe.get_doc("User", email)
         user.delete()
 
@@ -0,0 +1,121 @@
+import frappe
+from frappe.utils import cint, flt
+
+# ----------------------------------------------------------------------
+# Stored monetary totals of Procurement Orders and Service Requests
+# ----------------------------------------------------------------------
+# The totals are computed from order_list / service_order_list by the
+# routines below on every save (before_save, see hooks.py) and stored on
+# the document, so reports can SUM the columns instead of parsing JSON.
+# Amounts follow the calculation the financial APIs have always used:
+# quotes, quantities and tax rates are whole numbers (cint), the GST of a
+# PO line is truncated to a whole amount, and loading / freight charges
+# carry ADDITIONAL_CHARGES_GST_RATE.
+
+ADDITIONAL_CHARGES_GST_RATE = 0.18
+SR_GST_RATE = 0.18
+PO_TOTAL_FIELDS = ("amount", "tax_amount", "additional_charges", "additional_charges_tax", "total_amount")
+SR_TOTAL_FIELDS = ("amount", "tax_amount", "total_amount")
+
+
+def _get_list(data) -> list:
+    return (frappe.parse_json(data or "{}") or {}).get("list") or []
+
+
+def calculate_po_totals(order_list, loading_charges=0, freight_charges=0) -> dict:
+    """
+    Totals of a Procurement Order.
+
+    Returns:
+        dict: amount (items), tax_amount (items GST), additional_charges
+        (loading + freight), additional_charges_tax and total_amount.
+    """
+    items = _get_list(order_list)
+    if not items:
+        return dict.fromkeys(PO_TOTAL_FIELDS, 0)
+
+    amount = tax_amount = 0
+    for item in items:
+        line_amount = cint(item.get("quote", 0)) * cint(item.get("quantity", 1))
+        amount += line_amount
+        tax_amount += cint(line_amount * cint(item.get("tax", 0)) / 100)
+
+    additional_charges = cint(loading_charges) + cint(freight_charges)
+    additional_charges_tax = flt(additional_charges * ADDITIONAL_CHARGES_GST_RATE)
+    return {
+        "amount": amount,
+        "tax_amount": tax_amount,
+        "additional_charges": additional_charges,
+        "additional_charges_tax": additional_charges_tax,
+        "total_amount": amount + tax_amount + additional_charges + additional_charges_tax,
+    }
+
+
+def calculate_sr_totals(service_order_list, gst="true") -> dict:
+    """
+    Totals of a Service Request; GST applies only when `gst` is "true".
+
+    Returns:
+        dict: amount, tax_amount and total_amount.
+    """
+    amount = sum(
+        cint(item.get("rate", 0)) * cint(item.get("quantity", 0))
+        for item in _get_list(service_order_list)
+    )
+    tax_amount = flt(amount * SR_GST_RATE) if gst == "true" else 0
+    return {"amount": amount, "tax_amount": tax_amount, "total_amount": amount + tax_amount}
+
+
+def get_po_totals(doc) -> dict:
+    return calculate_po_totals(doc.get("order_list"), doc.get("loading_charges"), doc.get("freight_charges"))
+
+
+def get_sr_totals(doc) -> dict:
+    return calculate_sr_totals(doc.get("service_order_list"), doc.get("gst"))
+
+
+def set_po_totals(doc, method=None):
+    doc.update(get_po_totals(doc))
+
+
+def set_sr_totals(doc, method=None):
+    doc.update(get_sr_totals(doc))
+
+
+ORDER_TOTALS = {
+    "Procurement Orders": (["order_list", "loading_charges", "freight_charges"], PO_TOTAL_FIELDS, get_po_totals),
+    "Service Requests": (["service_order_list", "gst"], SR_TOTAL_FIELDS, get_sr_totals),
+}
+BACKFILL_BATCH_SIZE = 500
+
+
+def backfill_order_totals(doctype, batch_size=BACKFILL_BATCH_SIZE) -> int:
+    """
+    Recomputes the stored totals of every document of `doctype`, in batches
+    ordered by name. Rows whose totals are already right are not written.
+
+    Returns:
+        int: documents updated.
+    """
+    fields, total_fields, get_totals = ORDER_TOTALS[doctype]
+    updated, last_name = 0, ""
+
+    while True:
+        rows = frappe.get_all(
+            doctype,
+            filters={"name": (">", last_name)},
+            fields=["name", *fields, *total_fields],
+            order_by="name asc",
+            limit=batch_size
+        )
+        if not rows:
+            return updated
+
+        for row in rows:
+            totals = get_totals(row)
+            if any(flt(row.get(field)) != flt(totals[field]) for field in total_fields):
+                frappe.db.set_value(doctype, row.name, totals, update_modified=False)
+                updated += 1
+
+        frappe.db.commit()
+        last_name = rows[-1].name
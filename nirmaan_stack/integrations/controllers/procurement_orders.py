@@ -1,81 +1,12 @@
 import frappe
 from frappe import _
-from ..Notifications.pr_notifications import PrNotification, get_allowed_lead_users, get_admin_users, get_allowed_procurement_users, get_allowed_accountants
-from .procurement_requests import get_user_name
-
-def after_insert(doc, method):
-        proc_admin_account_users = get_allowed_procurement_users(doc) + get_admin_users() + get_allowed_accountants(doc)
-        pr = frappe.get_doc("Procurement Requests", doc.procurement_request)
-        custom = doc.custom == "true"
-        if proc_admin_account_users:
-            for user in proc_admin_account_users:
-                if user["push_notification"] == "true":
-                    # Dynamically generate notification title/body for each lead
-                    notification_title = f"New {'Custom PO' if custom else 'PO'} for Project {doc.project_name}"
-                    notification_body = None
-                    if custom:
-                        notification_body = (
-                            f"Hi {user['full_name']}, a new Custom PO for the {doc.project_name} "
-                            f"project has been approved and created by {get_user_name(frappe.session.user)}, click here to take action."
-                            )
-                    else:
-                        notification_body = (
-                            f"Hi {user['full_name']}, a new purchase order for the {pr.work_package} "
-                            f"work package has been approved and created by {get_user_name(frappe.session.user)}, click here to take action."
-                            )
-                    if user['role_profile'] != "Nirmaan Accountant Profile":
-                        click_action_url = f"{frappe.utils.get_url()}/frontend/purchase-orders?tab=Approved%20PO"
-                    else:
-                        click_action_url = f"{frappe.utils.get_url()}/frontend/project-payments?tab=PO%20Wise"
-                    # Send notification for each lead
-                    PrNotification(user, notification_title, notification_body, click_action_url)
-                else:
-                    print(f"push notifications were not enabled for user: {user['full_name']}")
-        else:
-            print("No Proc Execs, Accountants or Admins found with push notifications enabled.")
-        
-
-        message = {
-            "title": _(f"New {'Custom Purchase' if custom else 'Purchase'} Order"),
-            "description": _(f"New {'Custom PO' if custom else 'PO'}: {doc.name} has been approved and created."),
-            "project": doc.project,
-            "work_package": pr.work_package if not custom else "Custom",
-            "sender": frappe.session.user,
-            "docname": doc.name
-        }
-        # Emit the event to the allowed users
-        for user in proc_admin_account_users:
-            new_notification_doc = frappe.new_doc('Nirmaan Notifications')
-            new_notification_doc.recipient = user['name']
-            new_notification_doc.recipient_role = user['role_profile']
-            if frappe.session.user != 'Administrator':
-                new_notification_doc.sender = frappe.session.user
-            new_notification_doc.title = message["title"]
-            new_notification_doc.description = message["description"]
-            new_notification_doc.document = 'Procurement Orders'
-            new_notification_doc.docname = doc.name
-            new_notification_doc.project = doc.project
-            new_notification_doc.work_package = pr.work_package if not custom else "Custom"
-            new_notification_doc.seen = "false"
-            new_notification_doc.type = "info"
-            new_notification_doc.event_id = "po:new"
-            action_url = doc.name.replace("/", "&=")
-            if user['role_profile'] != "Nirmaan Accountant Profile":
-                new_notification_doc.action_url = f"purchase-orders/{action_url}?tab=Approved%20PO"
-            else:
-                new_notification_doc.action_url = f"project-payments/{action_url}?tab=PO%20Wise"
-            new_notification_doc.insert()
-            frappe.db.commit()
-
-            message["notificationId"] = new_notification_doc.name
-            print(f"running publish realtime for: {user}")
-
-            frappe.publish_realtime(
-                event="po:new",  # Custom event name
-                message=message,
-                user=user['name']  # Notify only specific users
-            )
-
+from frappe.utils import cstr, now_datetime
+from ...nirmaan_stack.doctype.item_rate_stats.item_rate_stats import apply_approved_quotations
+from ...nirmaan_stack.doctype.vendor_item_price_index.vendor_item_price_index import refresh_vendor_item_prices
+from .item_rate_cache import evict_cached_item_rates
+from ...api.projects.project_wise_invoice_data import bump_project_invoice_version
+from ..Notifications.realtime_buffer import queue_realtime
+from ..Notifications.unread_counters import decrement_unread_counts
 
 def on_update(doc, method):
     """
@@ -83,117 +14,41 @@ def on_update(doc, method):
     """
     old_doc = doc.get_doc_before_save()
     doc = frappe.get_doc("Procurement Orders", doc.name)
-    custom = doc.custom == "true"
 
-    if(doc.status=="PO Approved"):
+    # A dispatch reverted to PO Approved withdraws the PO's quotes
+    if old_doc and old_doc.status == "Dispatched" and doc.status == "PO Approved":
         try:
             delete_existing_aq_docs(doc)
         except frappe.DoesNotExistError:
             print("PO NOT AVAILABLE IN DB")
 
-    if old_doc and old_doc.status == 'PO Approved' and doc.status=="Dispatched":
+    # On dispatch, or when a dispatched PO's lines or vendor change, diff its
+    # Approved Quotations against order_list
+    if doc.status == "Dispatched" and (
+        not old_doc
+        or old_doc.status != "Dispatched"
+        or old_doc.vendor != doc.vendor
+        or frappe.parse_json(old_doc.order_list or "{}") != frappe.parse_json(doc.order_list or "{}")
+    ):
         try:
             vendor = frappe.get_doc("Vendors", doc.vendor)
-            orders = doc.order_list
-
-            delete_existing_aq_docs(doc)
-
-            for order in orders['list']:
-                aq = frappe.new_doc('Approved Quotations')
-                try:
-                    if not custom:
-                        aq.item_id=order['name']
-                    aq.vendor=doc.vendor
-                    aq.procurement_order=doc.name
-                    aq.item_name=order['item']
-                    aq.unit=order['unit']
-                    aq.quantity=order['quantity']
-                    aq.quote=order['quote']
-                    aq.tax=order['tax']
-                    
-                    if "makes" in order and 'list' in order['makes']:
-                        enabled_make = next(
-                            (make['make'] for make in order['makes']['list'] if make['enabled'] == "true"), 
-                            None
-                        )
-                        aq.make = enabled_make
-                    aq.city=vendor.vendor_city
-                    aq.state=vendor.vendor_state
-                    aq.insert()
-                except frappe.DoesNotExistError:
-                    continue
+            sync_approved_quotations(doc, vendor)
         except frappe.DoesNotExistError:
             print("VENDOR NOT AVAILABLE IN DB")
     if(doc.status=="Cancelled"):
         frappe.delete_doc("Procurement Orders", doc.name)
 
-    if old_doc and old_doc.status == 'PO Approved' and doc.status == "PO Amendment":
-        lead_admin_users = get_allowed_lead_users(doc) + get_admin_users()
-        pr = frappe.get_doc("Procurement Requests", doc.procurement_request)
-        if lead_admin_users:
-            for user in lead_admin_users:
-                if user["push_notification"] == "true":
-                    # Dynamically generate notification title/body for each lead
-                    notification_title = f"PO: {doc.name} has been Amended"
-                    notification_body = (
-                        f"Hi {user['full_name']}, {'Custom PO' if custom else 'PO'}: {doc.name} for the {doc.project} "
-                        f"project has been amended by {get_user_name(frappe.session.user)} and is awaiting your review."
-                        )
-                    click_action_url = f"{frappe.utils.get_url()}/frontend/purchase-orders?tab=Approve%20Amended%20PO"
-                    # Send notification for each lead
-                    PrNotification(user, notification_title, notification_body, click_action_url)
-                else:
-                    print(f"push notifications were not enabled for user: {user['full_name']}")
-        else:
-            print("No project leads or admins found with push notifications enabled.")
-
-        message = {
-            "title": _(f"{'Custom PO' if custom else 'PO'} Status Updated!"),
-            "description": _(f" {'Custom PO' if custom else 'PO'}: {doc.name} has been amended!"),
-            "project": doc.project,
-            "work_package": pr.work_package if not custom else "Custom",
-            "sender": frappe.session.user,
-            "docname": doc.name
-        }
-        # Emit the event to the allowed users
-        for user in lead_admin_users:
-            new_notification_doc = frappe.new_doc('Nirmaan Notifications')
-            new_notification_doc.recipient = user['name']
-            new_notification_doc.recipient_role = user['role_profile']
-            if frappe.session.user != 'Administrator':
-                new_notification_doc.sender = frappe.session.user
-            new_notification_doc.title = message["title"]
-            new_notification_doc.description = message["description"]
-            new_notification_doc.document = 'Procurement Orders'
-            new_notification_doc.docname = doc.name
-            new_notification_doc.project = doc.project
-            new_notification_doc.work_package = pr.work_package if not custom else "Custom"
-            new_notification_doc.seen = "false"
-            new_notification_doc.type = "info"
-            new_notification_doc.event_id = "po:amended"
-            action_url = doc.name.replace("/", "&=")
-            new_notification_doc.action_url = f"purchase-orders/{action_url}?tab=Approve%20Amended%20PO"
-            new_notification_doc.insert()
-            frappe.db.commit()
-
-            message["notificationId"] = new_notification_doc.name
-            print(f"running publish realtime for: {user}")
-
-            frappe.publish_realtime(
-                event="po:amended",  # Custom event name
-                message=message,
-                user=user['name']  # Notify only specific users
-            )
-
 def on_trash(doc, method):
     frappe.db.delete("Nirmaan Comments", {
         "reference_name" : ("=", doc.name)
     })
+    frappe.db.delete("Vendor Invoices", {"document_type": doc.doctype, "document_name": doc.name})
+    bump_project_invoice_version(doc.get("project"))
     delete_existing_aq_docs(doc)
     print(f"flagged for delete po document: {doc} {doc.modified_by} {doc.owner}")
     notifications = frappe.db.get_all("Nirmaan Notifications", 
                                       filters={"docname": doc.name},
-                                      fields={"name", "recipient"}
+                                      fields=["name", "recipient", "seen", "event_id", "project"]
                                       )
 
     if notifications:
@@ -206,7 +61,7 @@ def on_trash(doc, method):
             "sender": frappe.session.user,
             "notificationId" : notification["name"]
             }
-            frappe.publish_realtime(
+            queue_realtime(
                 event="po:delete",
                 message=message,
                 user=notification["recipient"]
@@ -214,10 +69,125 @@ def on_trash(doc, method):
     frappe.db.delete("Nirmaan Notifications", {
         "docname": ("=", doc.name)
     })
+    decrement_unread_counts(notifications)
 
 
 def delete_existing_aq_docs(doc):
     # Check and delete existing approved quotations for this procurement order
+    existing_aqs = frappe.get_all("Approved Quotations",
+                                  filters={"procurement_order": doc.name},
+                                  fields=["name", "item_id", "vendor", "quote", "quantity", "creation"]
+                                  )
+    if not existing_aqs:
+        return
+
     frappe.db.delete("Approved Quotations", {
         "procurement_order" : ("=", doc.name)
-    })
\ No newline at end of file
+    })
+    # Keep the per-item rate statistics in step with the deleted quotes
+    apply_approved_quotations(existing_aqs, removed=True)
+    evict_cached_item_rates(aq.item_id for aq in existing_aqs)
+    refresh_vendor_item_prices(existing_aqs)
+
+
+AQ_SYNC_FIELDS = ("item_id", "vendor", "item_name", "unit", "quantity", "quote", "tax", "make", "city", "state")
+
+
+def build_approved_quotation_rows(doc, vendor):
+    """
+    Builds the Approved Quotation rows (as dicts of AQ_SYNC_FIELDS) for every
+    line of the PO's order_list, without touching the database.
+    """
+    custom = doc.custom == "true"
+    orders = frappe.parse_json(doc.order_list or "{}").get("list", [])
+
+    def as_data(value):
+        return None if value is None else cstr(value)
+
+    rows = []
+    for order in orders:
+        enabled_make = None
+        if "makes" in order and order['makes'] and 'list' in order['makes']:
+            enabled_make = next(
+                (make['make'] for make in order['makes']['list'] if make['enabled'] == "true"),
+                None
+            )
+        rows.append({
+            "item_id": None if custom else order.get('name'),
+            "vendor": doc.vendor,
+            "item_name": order.get('item'),
+            "unit": as_data(order.get('unit')),
+            "quantity": as_data(order.get('quantity')),
+            "quote": as_data(order.get('quote')),
+            "tax": as_data(order.get('tax')),
+            "make": enabled_make,
+            "city": vendor.vendor_city,
+            "state": vendor.vendor_state,
+        })
+
+    # Lines whose item no longer exists are skipped, as a failed insert used to be
+    item_ids = {row["item_id"] for row in rows if row["item_id"]}
+    existing_items = set(frappe.get_all("Items", filters={"name": ["in", list(item_ids)]}, pluck="name")) if item_ids else set()
+    return [row for row in rows if not row["item_id"] or row["item_id"] in existing_items]
+
+
+def sync_approved_quotations(doc, vendor):
+    """
+    Brings the PO's Approved Quotations in line with its order_list by diffing
+    the existing rows against the desired ones: unchanged lines are kept,
+    stale ones are deleted and new or changed ones are written with a single
+    multi-row insert (names generated in bulk), instead of deleting and
+    re-creating every line through the full document lifecycle.
+    """
+    desired_rows = build_approved_quotation_rows(doc, vendor)
+    existing_aqs = frappe.get_all("Approved Quotations",
+                                  filters={"procurement_order": doc.name},
+                                  fields=["name", "creation", *AQ_SYNC_FIELDS]
+                                  )
+
+    def signature(row):
+        return tuple(cstr(row.get(field)) for field in AQ_SYNC_FIELDS)
+
+    unmatched = {}
+    for aq in existing_aqs:
+        unmatched.setdefault(signature(aq), []).append(aq)
+
+    rows_to_insert = []
+    for row in desired_rows:
+        matches = unmatched.get(signature(row))
+        if matches:
+            matches.pop()
+        else:
+            rows_to_insert.append(row)
+    aqs_to_delete = [aq for aqs in unmatched.values() for aq in aqs]
+
+    if aqs_to_delete:
+        frappe.db.delete("Approved Quotations", {
+            "name": ("in", [aq.name for aq in aqs_to_delete])
+        })
+        apply_approved_quotations(aqs_to_delete, removed=True)
+
+    inserted_aqs = []
+    if rows_to_insert:
+        timestamp = now_datetime()
+        for row in rows_to_insert:
+            row.update({
+                "name": frappe.generate_hash(length=10),
+                "creation": timestamp,
+                "modified": timestamp,
+                "owner": frappe.session.user,
+                "modified_by": frappe.session.user,
+                "procurement_order": doc.name,
+            })
+            inserted_aqs.append(frappe._dict(row))
+
+        fields = ["name", "creation", "modified", "owner", "modified_by", "procurement_order", *AQ_SYNC_FIELDS]
+        frappe.db.bulk_insert(
+            "Approved Quotations",
+            fields=fields,
+            values=[tuple(aq[field] for field in fields) for aq in inserted_aqs]
+        )
+        apply_approved_quotations(inserted_aqs)
+
+    evict_cached_item_rates(aq.item_id for aq in aqs_to_delete + inserted_aqs)
+    refresh_vendor_item_prices(aqs_to_delete + inserted_aqs)
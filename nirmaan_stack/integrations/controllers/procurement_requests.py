@@ -1,14 +1,22 @@
 import frappe
 import json
-from ..Notifications.pr_notifications import PrNotification, get_admin_users, get_allowed_lead_users, get_allowed_procurement_users, get_allowed_manager_users
 from frappe import _
 
 from frappe.model.document import Document
 from frappe.utils import flt, get_datetime, add_months, now_datetime
 from datetime import datetime
-from functools import lru_cache
 import math # Though not used in the final version 3 logic, kept if needed later
 from ...api.approve_vendor_quotes import generate_pos_from_selection
+from ...nirmaan_stack.doctype.item_rate_stats.item_rate_stats import (
+    estimate_average_rate,
+    get_boundary_quotes,
+    get_window_cutoff,
+    has_boundary_bucket,
+)
+from .item_rate_cache import get_cached_item_rates, set_cached_item_rates
+from .user_name_cache import get_user_name
+from ..Notifications.realtime_buffer import queue_realtime
+from ..Notifications.unread_counters import decrement_unread_counts
 
 # Import only necessary components from typing (TypedDict is not built-in)
 # 'Any' might still be useful for generic dictionary values if strict typing isn't needed there.
@@ -32,13 +40,12 @@ class ProcessedQuote(TypedDict):
 # Helper Function: Calculate Historical Average Quote Rate for an Item
 # ----------------------------------------------------------------------
 
-# Using lru_cache for memoization
-@lru_cache(maxsize=128)
 def get_historical_average_quote_cached(item_id: str) -> HistoricalAverageResult:
     """
     Fetches approved quotes for the item and calculates the historical average rate.
     This function acts as a wrapper to fetch data and call the core logic,
     allowing the core logic to be potentially testable with mocked data.
+    Cross-request caching of rates lives in item_rate_cache.py.
 
     Args:
         item_id: The name (ID) of the item to calculate the rate for.
@@ -179,6 +186,96 @@ def calculate_historical_average_quote(
     }
 
 
+def get_historical_average_quotes(item_ids: list[str]) -> dict[str, HistoricalAverageResult]:
+    """
+    Bulk variant of get_historical_average_quote_cached: fetches the approved
+    quotes of every given item with a single query, groups them in memory and
+    applies calculate_historical_average_quote to each group.
+
+    Args:
+        item_ids: The names (IDs) of the items to calculate rates for.
+
+    Returns:
+        A dict mapping each item_id to its HistoricalAverageResult.
+    """
+    unique_item_ids = list(dict.fromkeys(item_id for item_id in item_ids if item_id))
+    if not unique_item_ids:
+        return {}
+
+    all_approved_quotes = frappe.get_all(
+        "Approved Quotations",
+        filters={"item_id": ["in", unique_item_ids]},
+        fields=["name", "creation", "quote", "quantity", "item_id"],
+        order_by="creation desc"
+    )
+
+    quotes_by_item: dict[str, list[dict[str, any]]] = {item_id: [] for item_id in unique_item_ids}
+    for quote in all_approved_quotes:
+        quotes_by_item[quote["item_id"]].append(quote)
+
+    return {
+        item_id: calculate_historical_average_quote(quotes, item_id)
+        for item_id, quotes in quotes_by_item.items()
+    }
+
+
+def get_item_rate_estimates(item_ids: list[str]) -> dict[str, HistoricalAverageResult]:
+    """
+    Resolves the estimated rates of all given items, in order of preference:
+    1. the shared Redis rate cache (one MGET),
+    2. the precomputed Item Rate Stats rows (one query, plus one for the
+       quotes of the month the 3-month window starts in),
+    3. get_historical_average_quotes for items without a stats row yet,
+       e.g. before the backfill patch has run (one query).
+    Freshly computed rates are written back to the cache, so the cost grows
+    neither with the number of Approved Quotations nor with the number of items.
+
+    Args:
+        item_ids: The names (IDs) of the items to calculate rates for.
+
+    Returns:
+        A dict mapping each item_id to its HistoricalAverageResult.
+        contributingQuotes is only populated on the fallback path.
+    """
+    unique_item_ids = list(dict.fromkeys(item_id for item_id in item_ids if item_id))
+    if not unique_item_ids:
+        return {}
+
+    results: dict[str, HistoricalAverageResult] = {
+        item_id: {"averageRate": rate, "contributingQuotes": []}
+        for item_id, rate in get_cached_item_rates(unique_item_ids).items()
+    }
+
+    uncached_item_ids = [item_id for item_id in unique_item_ids if item_id not in results]
+    if not uncached_item_ids:
+        return results
+
+    stats_rows = frappe.get_all(
+        "Item Rate Stats",
+        filters={"item_id": ["in", uncached_item_ids]},
+        fields=["item_id", "monthly_stats", "latest_quote"]
+    )
+    # The month the window starts in is split at the exact cutoff (one query)
+    cutoff = get_window_cutoff()
+    boundary_quotes = get_boundary_quotes(
+        [stats["item_id"] for stats in stats_rows if has_boundary_bucket(stats, cutoff)], cutoff
+    )
+    computed: dict[str, HistoricalAverageResult] = {
+        stats["item_id"]: {
+            "averageRate": estimate_average_rate(stats, boundary_quotes.get(stats["item_id"], []), cutoff),
+            "contributingQuotes": []
+        }
+        for stats in stats_rows
+    }
+
+    missing_item_ids = [item_id for item_id in uncached_item_ids if item_id not in computed]
+    computed.update(get_historical_average_quotes(missing_item_ids))
+
+    set_cached_item_rates({item_id: result["averageRate"] for item_id, result in computed.items()})
+    results.update(computed)
+    return results
+
+
 # ----------------------------------------------------------------------
 # Main Validation Function for Procurement Request
 # ----------------------------------------------------------------------
@@ -194,8 +291,6 @@ def validate_procurement_request(doc: Document) -> bool:
         True if all checks pass, False otherwise.
         (Consider raising frappe.ValidationError in hooks)
     """
-    get_historical_average_quote_cached.cache_clear()
-
     procurement_list_json = doc.get("procurement_list")
     items = []
     if procurement_list_json:
@@ -226,6 +321,15 @@ def validate_procurement_request(doc: Document) -> bool:
             frappe.msgprint(f"Procurement Request {doc.name} contains item '{item_display}' with status 'Request'. Please add the item to the database first.", indicator="red", title="Validation Failed")
             return False # Fail check 1
 
+    # --- Fetch estimated rates for all "Pending" items in one go ---
+    pending_item_ids = [item.get("name") for item in items if item.get("status") == "Pending" and item.get("name")]
+    try:
+        rate_results = get_item_rate_estimates(pending_item_ids)
+    except Exception as e:
+        frappe.log_error(f"Error calculating rates for items in PR {doc.name}: {e}", "Procurement Validation Error")
+        frappe.msgprint(f"An error occurred while calculating the estimated rates for PR {doc.name}.", indicator="red", title="System Error")
+        return False
+
     # --- Checks 2, 3 & 4: Calculate total estimated amount for "Pending" items ---
     for item in items:
         # Already checked item is a dict
@@ -251,7 +355,7 @@ def validate_procurement_request(doc: Document) -> bool:
 
             # --- Check 2 & 3: Get Estimated Rate ---
             try:
-                rate_result = get_historical_average_quote_cached(item_id)
+                rate_result = rate_results[item_id]
                 print(f"Fetched rate for item {item_id}: {rate_result}")
                 estimated_rate = rate_result["averageRate"]
 
@@ -349,7 +453,18 @@ def validate_procurement_request_for_po(doc: Document) -> bool:
     total_estimated_amount = 0.0
 
     items_processed_count = 0 # Count items used for calculation
-    get_historical_average_quote_cached.cache_clear() # Clear cache before calculations
+
+    # Fetch estimated rates for all "Pending" items in one go
+    pending_item_ids = [
+        item.get("name") for item in items
+        if isinstance(item, dict) and item.get("status") == "Pending" and item.get("name")
+    ]
+    try:
+        rate_results = get_item_rate_estimates(pending_item_ids)
+    except Exception as e:
+        frappe.log_error(f"Error calculating estimated rates for items in PR {doc.name}: {e}", "Procurement PO Validation Error")
+        frappe.msgprint(f"An error occurred while calculating the estimated rates for PR {doc.name}.", indicator="red", title="System Error")
+        return False
 
     for item in items:
         if not isinstance(item, dict):
@@ -397,7 +512,7 @@ def validate_procurement_request_for_po(doc: Document) -> bool:
 
         # Calculate Estimated Amount component
         try:
-            rate_result = get_historical_average_quote_cached(item_id)
+            rate_result = rate_results[item_id]
             estimated_rate = rate_result["averageRate"]
             if estimated_rate <= 0:
                 frappe.msgprint(f"Could not determine a valid historical estimated rate (> 0) for item '{item_display_name}' (ID: {item_id}). Cannot perform comparison.", indicator="red", title="Validation Failed")
@@ -523,363 +638,13 @@ def after_insert(doc, method):
         doc.workflow_state = "Approved"
         doc.save(ignore_permissions=True)
         doc.db_set("modified_by", "Administrator", update_modified=False)
-         
-    elif doc.work_package is not None:
-        lead_admin_users = get_allowed_lead_users(doc) + get_admin_users()
-        custom = True if doc.work_package is None else False
-        if lead_admin_users:
-            for user in lead_admin_users:
-                if user["push_notification"] == "true":
-                    # Dynamically generate notification title/body for each lead
-                    notification_title = f"New {'Custom PR' if custom else 'PR'} Created for Project {doc.project}"
-                    notification_body = (
-                        f"Hi {user['full_name']}, a new {'custom procurement' if custom else 'procurement'} procurement request for the {doc.project if custom else doc.work_package}"
-                        f"{' project' if custom else ' work package'} has been submitted and is awaiting your review."
-                        )
-                    click_action_url = f"{frappe.utils.get_url()}/frontend/procurement-requests?tab=Approve%20PR"
-                    # Send notification for each lead
-                    PrNotification(user, notification_title, notification_body, click_action_url)
-                else:
-                    print(f"push notifications were not enabled for user: {user['full_name']}")
-        else:
-            print("No project leads or admins found with push notifications enabled.")
-
-        message = {
-            "title": _(f"New {'Custom PR' if custom else 'PR'} Created"),
-            "description": _(f"A new {'Custom PR' if custom else 'PR'}: {doc.name} has been created."),
-            "project": doc.project,
-            "work_package": doc.work_package if not custom else "Custom",
-            "sender": doc.owner,
-            "docname": doc.name
-        }
-        # Emit the event to the allowed users
-        for user in lead_admin_users:
-            new_notification_doc = frappe.new_doc('Nirmaan Notifications')
-            new_notification_doc.recipient = user['name']
-            new_notification_doc.recipient_role = user['role_profile']
-            if frappe.session.user != 'Administrator':
-                new_notification_doc.sender = frappe.session.user
-            new_notification_doc.title = message["title"]
-            new_notification_doc.description = message["description"]
-            new_notification_doc.document = 'Procurement Requests'
-            new_notification_doc.docname = doc.name
-            new_notification_doc.project = doc.project
-            new_notification_doc.work_package = doc.work_package if not custom else "Custom"
-            new_notification_doc.seen = "false"
-            new_notification_doc.type = "info"
-            new_notification_doc.event_id = "pr:new"
-            new_notification_doc.action_url = f"procurement-requests/{doc.name}?tab=Approve%20PR"
-            new_notification_doc.insert()
-            frappe.db.commit()
-
-            message["notificationId"] = new_notification_doc.name
-            print(f"running publish realtime for: {user}")
-
-            frappe.publish_realtime(
-                event="pr:new",  # Custom event name
-                message=message,
-                user=user['name']  # Notify only specific users
-            )
+
 
 def update_quantity(data, target_name, new_quantity):
     for item in data['list']:
         if item['name'] == target_name:
             item['quantity'] += new_quantity
 
-def on_update(doc, method):
-    custom = True if doc.work_package is None else False
-    old_doc = doc.get_doc_before_save()
-    # if old_doc and old_doc.workflow_state=='In Progress' and doc.workflow_state == "Vendor Selected":
-    #     if validate_procurement_request_for_po(doc):
-    #         doc.workflow_state = "Vendor Approved"
-    #         doc.save(ignore_permissions=True)
-    #         doc.db_set("modified_by", "Administrator", update_modified=False)
-
-    #         # Generate POs (Ensure data is prepared correctly)
-    #         procurement_list_data = doc.get("procurement_list") # Get potentially updated data
-    #         items_data = None
-    #         if isinstance(procurement_list_data, str): items_data = json.loads(procurement_list_data)
-    #         elif isinstance(procurement_list_data, dict): items_data = procurement_list_data
-    #         if items_data and isinstance(items_data.get("list"), list):
-    #             items_list = items_data.get("list")
-    #             items_arr = [item.get("name") for item in items_list if item.get("status") == "Pending"]
-    #             selected_vendors = {item["name"]: item["vendor"] for item in items_list if item.get("status") == "Pending" and item.get("vendor")}
-
-    #         po = generate_pos_from_selection(doc.project, doc.name, items_arr, selected_vendors, False )
-    #         print(f"PO generated: {po}")
-    #         po_doc = frappe.get_doc("Procurement Orders", po['po'])
-    #         po_doc.db_set("owner", "Administrator", update_modified=False)
-    #     else:
-    #         lead_admin_users = get_allowed_lead_users(doc) + get_admin_users()
-    #         if lead_admin_users:
-    #             for user in lead_admin_users:
-    #                 if user["push_notification"] == "true":
-    #                     notification_title = None
-    #                     if custom:
-    #                         notification_title = f"New Custom PR: {doc.name} created and Vendors Selected!"
-    #                     else:
-    #                         notification_title = f"Vendors Selected for the PR: {doc.name}!"
-    #                     notification_body = None
-    #                     if custom:
-    #                         notification_body = (
-    #                             f"Hi {user['full_name']}, A new Custom PR: {doc.name} created and Vendors have been selected. "
-    #                             "Please review it and proceed with approval or rejection."
-    #                         )
-    #                     else:
-    #                         notification_body = (
-    #                                 f"Hi {user['full_name']}, Vendors have been selected for the {doc.work_package} work package. "
-    #                                 "Please review the selection and proceed with approval or rejection."
-    #                             )
-    #                     click_action_url = f"{frappe.utils.get_url()}/frontend/purchase-orders?tab=Approve%20PO"
-    #                     print(f"click_action_url: {click_action_url}")
-    #                     PrNotification(user, notification_title, notification_body, click_action_url)
-    #                 else:
-    #                     print(f"push notifications were not enabled for user: {user['full_name']}")
-
-    #                 # send in-app notification for all allowed users
-    #                 title = None
-    #                 if custom:
-    #                     title = f"New Custom PR created and Vendors Selected!"
-    #                 else:
-    #                     title = f"PR Status Updated!"
-
-    #                 description = None
-    #                 if custom:
-    #                     description = f"A new Custom PR: {doc.name} created and Vendors have been selected."
-    #                 else:
-    #                     description = f"Vendors have been selected for the PR: {doc.name}!"
-    #                 message = {
-    #                     "title": _(title),
-    #                     "description": _(description),
-    #                     "project": doc.project,
-    #                     "work_package": doc.work_package if not custom else "Custom",
-    #                     "sender": frappe.session.user,
-    #                     "docname": doc.name
-    #                 }
-    #                 new_notification_doc = frappe.new_doc('Nirmaan Notifications')
-    #                 new_notification_doc.recipient = user['name']
-    #                 new_notification_doc.recipient_role = user['role_profile']
-    #                 if frappe.session.user != 'Administrator':
-    #                     new_notification_doc.sender = frappe.session.user
-    #                 new_notification_doc.title = message["title"]
-    #                 new_notification_doc.description = message["description"]
-    #                 new_notification_doc.document = 'Procurement Requests'
-    #                 new_notification_doc.docname = doc.name
-    #                 new_notification_doc.project = doc.project
-    #                 new_notification_doc.work_package = doc.work_package if not custom else "Custom"
-    #                 new_notification_doc.seen = "false"
-    #                 new_notification_doc.type = "info"
-    #                 new_notification_doc.event_id = "pr:vendorSelected"
-    #                 new_notification_doc.action_url = f"purchase-orders/{doc.name}?tab=Approve%20PO"
-    #                 new_notification_doc.insert()
-    #                 frappe.db.commit()
-
-    #                 message["notificationId"] = new_notification_doc.name
-    #                 print(f"running publish realtime for: {user}")
-
-    #                 frappe.publish_realtime(
-    #                     event="pr:vendorSelected",  # Custom event name
-    #                     message=message,
-    #                     user=user['name']  # Notify only specific users
-    #                 )
-    #         else:
-    #             print("No project leads or admins found with push notifications enabled.")
-    if old_doc and old_doc.workflow_state=='Pending' and doc.workflow_state == "Vendor Selected":
-        lead_admin_users = get_allowed_lead_users(doc) + get_admin_users()
-        if lead_admin_users:
-            for user in lead_admin_users:
-                if user["push_notification"] == "true":
-                    notification_title = None
-                    if custom:
-                        notification_title = f"New Custom PR: {doc.name} created and Vendors Selected!"
-                    else:
-                        notification_title = f"Vendors Selected for the PR: {doc.name}!"
-                    notification_body = None
-                    if custom:
-                        notification_body = (
-                            f"Hi {user['full_name']}, A new Custom PR: {doc.name} created and Vendors have been selected. "
-                            "Please review it and proceed with approval or rejection."
-                        )
-                    else:
-                        notification_body = (
-                                f"Hi {user['full_name']}, Vendors have been selected for the {doc.work_package} work package. "
-                                "Please review the selection and proceed with approval or rejection."
-                            )
-                    click_action_url = f"{frappe.utils.get_url()}/frontend/purchase-orders?tab=Approve%20PO"
-                    print(f"click_action_url: {click_action_url}")
-                    PrNotification(user, notification_title, notification_body, click_action_url)
-                else:
-                    print(f"push notifications were not enabled for user: {user['full_name']}")
-
-                # send in-app notification for all allowed users
-                title = None
-                if custom:
-                    title = f"New Custom PR created and Vendors Selected!"
-                else:
-                    title = f"PR Status Updated!"
-                
-                description = None
-                if custom:
-                    description = f"A new Custom PR: {doc.name} created and Vendors have been selected."
-                else:
-                    description = f"Vendors have been selected for the PR: {doc.name}!"
-                message = {
-                    "title": _(title),
-                    "description": _(description),
-                    "project": doc.project,
-                    "work_package": doc.work_package if not custom else "Custom",
-                    "sender": frappe.session.user,
-                    "docname": doc.name
-                }
-                new_notification_doc = frappe.new_doc('Nirmaan Notifications')
-                new_notification_doc.recipient = user['name']
-                new_notification_doc.recipient_role = user['role_profile']
-                if frappe.session.user != 'Administrator':
-                    new_notification_doc.sender = frappe.session.user
-                new_notification_doc.title = message["title"]
-                new_notification_doc.description = message["description"]
-                new_notification_doc.document = 'Procurement Requests'
-                new_notification_doc.docname = doc.name
-                new_notification_doc.project = doc.project
-                new_notification_doc.work_package = doc.work_package if not custom else "Custom"
-                new_notification_doc.seen = "false"
-                new_notification_doc.type = "info"
-                new_notification_doc.event_id = "pr:vendorSelected"
-                new_notification_doc.action_url = f"purchase-orders/{doc.name}?tab=Approve%20PO"
-                new_notification_doc.insert()
-                frappe.db.commit()
-
-                message["notificationId"] = new_notification_doc.name
-                print(f"running publish realtime for: {user}")
-
-                frappe.publish_realtime(
-                    event="pr:vendorSelected",  # Custom event name
-                    message=message,
-                    user=user['name']  # Notify only specific users
-                )
-        else:
-            print("No project leads or admins found with push notifications enabled.")
-
-
-    elif old_doc and old_doc.workflow_state == "Pending" and doc.workflow_state == "Approved":
-        proc_admin_users = get_allowed_procurement_users(doc) + get_admin_users()
-        if proc_admin_users:
-            for user in proc_admin_users:
-                if user["push_notification"] == "true":
-                    # Dynamically generate notification title/body for each lead
-                    notification_title = f"New PR Request for Project {doc.project}"
-                    notification_body = (
-                        f"Hi {user['full_name']}, a new procurement request for the {doc.work_package} "
-                        f"work package has been approved by {get_user_name(frappe.session.user)}, click here to take action."
-                        )
-                    click_action_url = f"{frappe.utils.get_url()}/frontend/procurement-requests?tab=New%20PR%20Request"
-                    # Send notification for each lead
-                    PrNotification(user, notification_title, notification_body, click_action_url)
-                else:
-                    print(f"push notifications were not enabled for user: {user['full_name']}")
-        else:
-            print("No Proc Execs or admins found with push notifications enabled.")
-
-        message = {
-            "title": _("New PR Request"),
-            "description": _(f"New PR: {doc.name} has been approved."),
-            "project": doc.project,
-            "work_package": doc.work_package,
-            "sender": frappe.session.user,
-            "docname": doc.name
-        }
-        # Emit the event to the allowed users
-        for user in proc_admin_users:
-            new_notification_doc = frappe.new_doc('Nirmaan Notifications')
-            new_notification_doc.recipient = user['name']
-            new_notification_doc.recipient_role = user['role_profile']
-            if frappe.session.user != 'Administrator':
-                new_notification_doc.sender = frappe.session.user
-            new_notification_doc.title = message["title"]
-            new_notification_doc.description = message["description"]
-            new_notification_doc.document = 'Procurement Requests'
-            new_notification_doc.docname = doc.name
-            new_notification_doc.project = doc.project
-            new_notification_doc.work_package = doc.work_package
-            new_notification_doc.seen = "false"
-            new_notification_doc.type = "info"
-            new_notification_doc.event_id = "pr:approved"
-            new_notification_doc.action_url = f"procurement-requests/{doc.name}?tab=New%20PR%20Request"
-            new_notification_doc.insert()
-            frappe.db.commit()
-
-            message["notificationId"] = new_notification_doc.name
-            print(f"running publish realtime for: {user}")
-
-            frappe.publish_realtime(
-                event="pr:approved",  # Custom event name
-                message=message,
-                user=user['name']  # Notify only specific users
-            )
-
-
-    elif old_doc and old_doc.workflow_state in ('Pending', 'Vendor Selected') and doc.workflow_state == "Rejected":
-        manager_admin_users = get_allowed_manager_users(doc) + get_admin_users()
-        if manager_admin_users:
-            for user in manager_admin_users:
-                if user["push_notification"] == "true":
-                    # Dynamically generate notification title/body for each lead
-                    notification_body = None
-                    if custom:
-                        notification_body = (
-                            f"Hi {user['full_name']}, the Custom PR: {doc.name} has been rejected by {get_user_name(frappe.session.user)}, click here to resolve."
-                        )
-                    else:
-                        notification_body = (
-                            f"Hi {user['full_name']}, the procurement request: {doc.name} for the {doc.work_package} "
-                            f"work package has been rejected by {get_user_name(frappe.session.user)}, click here to resolve."
-                        )
-                    notification_title = f"{'Custom PR' if custom else 'PR'}: {doc.name} Rejected!"
-                    click_action_url = f"{frappe.utils.get_url()}/frontend/prs&milestones/procurement-requests/{doc.name}"
-                    # Send notification for each lead
-                    PrNotification(user, notification_title, notification_body, click_action_url)
-                else:
-                    print(f"push notifications were not enabled for user: {user['full_name']}")
-        else:
-            print("No Managers or admins found with push notifications enabled.")
-
-        message = {
-            "title": _(f"{'Custom PR' if custom else 'PR'} Status Updated"),
-            "description": _(f"{'Custom PR' if custom else 'PR'}: {doc.name} has been rejected."),
-            "project": doc.project,
-            "work_package": doc.work_package if not custom else "Custom",
-            "sender": frappe.session.user,
-            "docname": doc.name
-        }
-        # Emit the event to the allowed users
-        for user in manager_admin_users:
-            new_notification_doc = frappe.new_doc('Nirmaan Notifications')
-            new_notification_doc.recipient = user['name']
-            new_notification_doc.recipient_role = user['role_profile']
-            if frappe.session.user != 'Administrator':
-                new_notification_doc.sender = frappe.session.user
-            new_notification_doc.title = message["title"]
-            new_notification_doc.description = message["description"]
-            new_notification_doc.document = 'Procurement Requests'
-            new_notification_doc.docname = doc.name
-            new_notification_doc.project = doc.project
-            new_notification_doc.work_package = doc.work_package if not custom else "Custom"
-            new_notification_doc.seen = "false"
-            new_notification_doc.type = "info"
-            new_notification_doc.event_id = "pr:rejected"
-            new_notification_doc.action_url = f"prs&milestones/procurement-requests/{doc.name}"
-            new_notification_doc.insert()
-            frappe.db.commit()
-
-            message["notificationId"] = new_notification_doc.name
-            print(f"running publish realtime for: {user}")
-
-            frappe.publish_realtime(
-                event="pr:rejected",  # Custom event name
-                message=message,
-                user=user['name']  # Notify only specific users
-            )
-
 def get_makes_for_category(project, category):
     # Parse project_work_packages if it's a string
     project_work_packages = project.get('project_work_packages', "[]")
@@ -904,17 +669,6 @@ def get_makes_for_category(project, category):
     return makes
         
 
-def get_user_name(id):
-    nirmaan_users = frappe.db.get_list(
-        'Nirmaan Users',
-        fields=['name', 'full_name']
-    )
-    for item in nirmaan_users:
-        if item['name'] == id:
-            return item['full_name']
-    return None
-
-
 def on_trash(doc, method):
     frappe.db.delete("Nirmaan Comments", {
         "reference_name" : ("=", doc.name)
@@ -926,7 +680,7 @@ def on_trash(doc, method):
     print(f"flagged for delete pr document: {doc} {doc.modified_by} {doc.owner}")
     notifications = frappe.db.get_all("Nirmaan Notifications", 
                                       filters={"docname": doc.name},
-                                      fields={"name", "recipient"}
+                                      fields=["name", "recipient", "seen", "event_id", "project"]
                                       )
 
     if notifications:
@@ -939,7 +693,7 @@ def on_trash(doc, method):
             "sender": frappe.session.user,
             "notificationId" : notification["name"]
             }
-            frappe.publish_realtime(
+            queue_realtime(
                 event="pr:delete",
                 message=message,
                 user=notification["recipient"]
@@ -947,6 +701,7 @@ def on_trash(doc, method):
     frappe.db.delete("Nirmaan Notifications", {
         "docname": ("=", doc.name)
     })
+    decrement_unread_counts(notifications)
 
 
 def after_delete(doc, method):
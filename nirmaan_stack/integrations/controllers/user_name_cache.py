@@ -0,0 +1,80 @@
+import pickle
+
+import frappe
+
+# ----------------------------------------------------------------------
+# Cached Nirmaan Users display names
+# ----------------------------------------------------------------------
+# Names are kept in one Redis hash, one field per user id, so a lookup
+# reads a single field (get_user_names a single HMGET) whatever the number
+# of users. A missing field is filled from the database on first use.
+# frappe.cache().hget also memoizes fields in frappe.local for the rest of
+# the request, so repeated lookups inside notification loops cost a dict
+# access. A user's field is evicted from the Nirmaan Users / User hooks
+# (see nirmaan_users.py).
+
+USER_NAME_CACHE_KEY = "nirmaan_user_names"  # Redis hash; the older single-value key expires on its own
+USER_NAME_CACHE_TTL = 24 * 60 * 60  # seconds
+
+
+def _cache_user_names(user_names: dict) -> None:
+    cache = frappe.cache()
+    for id, full_name in user_names.items():
+        cache.hset(USER_NAME_CACHE_KEY, id, full_name)
+    cache.expire(cache.make_key(USER_NAME_CACHE_KEY), USER_NAME_CACHE_TTL)
+
+
+def get_user_name(id):
+    """Returns the full name of a Nirmaan User, or None for unknown ids."""
+    if not id:
+        return None
+
+    full_name = frappe.cache().hget(USER_NAME_CACHE_KEY, id)
+    if full_name is None:
+        full_name = frappe.db.get_value("Nirmaan Users", id, "full_name")
+        if full_name is not None:
+            _cache_user_names({id: full_name})
+    return full_name
+
+
+def get_user_names(ids) -> dict:
+    """
+    Batch variant of get_user_name: one HMGET, and one query for the ids
+    that are not cached yet.
+
+    Returns:
+        dict: id -> full_name (None for unknown ids) for every given id.
+    """
+    ids = list(ids)
+    lookup_ids = list(dict.fromkeys(id for id in ids if id))
+    if not lookup_ids:
+        return dict.fromkeys(ids)
+
+    cache = frappe.cache()
+    cached = cache.hmget(cache.make_key(USER_NAME_CACHE_KEY), lookup_ids)
+    user_names = {id: pickle.loads(value) for id, value in zip(lookup_ids, cached) if value is not None}
+
+    missing = [id for id in lookup_ids if id not in user_names]
+    if missing:
+        loaded = {
+            user.name: user.full_name
+            for user in frappe.get_all("Nirmaan Users", filters={"name": ("in", missing)}, fields=["name", "full_name"])
+            if user.full_name is not None
+        }
+        if loaded:
+            _cache_user_names(loaded)
+        user_names.update(loaded)
+
+    return {id: user_names.get(id) for id in ids}
+
+
+def invalidate_user_names(id) -> None:
+    """
+    Evicts the cached name of a user, immediately and again after commit so
+    a concurrent reader cannot re-cache the pre-commit name.
+    """
+    def evict():
+        frappe.cache().hdel(USER_NAME_CACHE_KEY, id)
+
+    evict()
+    frappe.db.after_commit.add(evict)
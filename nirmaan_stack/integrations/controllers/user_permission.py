@@ -1,4 +1,5 @@
 import frappe
+from ..Notifications.project_recipients import invalidate_project_recipients
 
 def after_insert(doc, method):
     """
@@ -29,6 +30,7 @@ def add_nirmaan_user_permissions(doc, medthod):
     nup.allow = doc.allow
     nup.for_value = doc.for_value
     nup.insert(ignore_permissions=True)
+    invalidate_project_recipients([doc.for_value])
 
 def on_trash(doc, method):
     """
@@ -39,6 +41,7 @@ def on_trash(doc, method):
                                  'allow': doc.allow,
                                  'for_value': doc.for_value
                              })
+    invalidate_project_recipients([doc.for_value])
     up = frappe.db.get_all("Nirmaan User Permissions", 
             filters={
                 'user':doc.user
@@ -0,0 +1,175 @@
+import frappe
+import numpy as np
+from frappe.utils import flt, get_datetime, add_months, now_datetime
+
+
+# ----------------------------------------------------------------------
+# Columnar engine for historical weighted-average quote computation
+# ----------------------------------------------------------------------
+# Applies the same rules as calculate_historical_average_quote in
+# procurement_requests.py, but to every item at once:
+#   1. Only quotes with quote > 0, quantity > 0 and a creation date count.
+#   2. A single valid quote is used as is.
+#   3. Exactly one quote within the last 3 months is used as is.
+#   4. Several quotes within the last 3 months -> weighted average of those.
+#   5. No quote within the last 3 months -> weighted average of all quotes.
+# Meant for catalogue-wide jobs (nightly re-pricing, cache warming) where
+# running the scalar function once per item is too slow.
+
+RECENT_WINDOW_MONTHS = 3
+DATETIME_DTYPE = "datetime64[us]"
+
+
+def _parse_distinct(values, dtype, parse):
+    """Parses each distinct value once with `parse`; unparseable values become NaN / NaT."""
+    distinct, inverse = np.unique(values.astype(str), return_inverse=True)
+
+    def parse_value(value):
+        try:
+            return parse(value)
+        except (TypeError, ValueError):
+            return None
+
+    return np.array([parse_value(value) for value in distinct], dtype=object).astype(dtype)[inverse]
+
+
+def _to_float_column(values):
+    """
+    Parses quote / quantity values like flt: numbers and numeric text are
+    cast in bulk, thousands separators are ignored. The few values that are
+    not plain decimals ("1e3", "abc", ...) are parsed one distinct value at a time.
+    """
+    try:
+        return values.astype(np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    text = np.char.strip(np.char.replace(values.astype(str), ",", ""))
+    unsigned = np.char.lstrip(text, "+-")
+    plain = (
+        (np.char.str_len(text) - np.char.str_len(unsigned) <= 1)
+        & np.char.isdecimal(np.char.replace(unsigned, ".", "", count=1))
+    )
+
+    column = np.full(len(values), np.nan)
+    try:
+        column[plain] = text[plain].astype(np.float64)
+    except ValueError:
+        # Non-ASCII digits: leave them all to flt
+        plain[:] = False
+    other = ~plain & ~np.equal(values, None)
+    if other.any():
+        column[other] = _parse_distinct(values[other], np.float64, flt)
+    return column
+
+
+def _to_datetime_column(values):
+    """
+    Parses creation values: datetimes, ISO text or epoch microseconds (the
+    fastest to convert, see get_catalogue_average_quotes).
+    """
+    try:
+        return values.astype(DATETIME_DTYPE)
+    except (TypeError, ValueError):
+        pass
+
+    column = np.full(len(values), np.datetime64("NaT"), dtype=DATETIME_DTYPE)
+    present = ~np.equal(values, None)
+    column[present] = _parse_distinct(values[present], DATETIME_DTYPE, get_datetime)
+    return column
+
+
+def to_columns(approved_quotes):
+    """
+    Converts Approved Quotation rows (dicts or (item_id, quote, quantity, creation)
+    tuples) into NumPy columns, parsing values exactly like the scalar function.
+    Rows without an item_id, quote, quantity or creation come out as NaN / NaT
+    and are dropped by calculate_historical_average_quotes_vectorized.
+
+    Returns:
+        (item_ids, quotes, quantities, creations) arrays of equal length.
+    """
+    approved_quotes = list(approved_quotes)
+    if approved_quotes and isinstance(approved_quotes[0], dict):
+        approved_quotes = [
+            (row.get("item_id"), row.get("quote"), row.get("quantity"), row.get("creation"))
+            for row in approved_quotes
+        ]
+
+    rows = np.empty((len(approved_quotes), 4), dtype=object)
+    if approved_quotes:
+        rows[:] = approved_quotes
+
+    item_ids = rows[:, 0]
+    creations = _to_datetime_column(rows[:, 3])
+    # Rows without an item take no part in the calculation
+    creations[~item_ids.astype(bool)] = np.datetime64("NaT")
+
+    return item_ids, _to_float_column(rows[:, 1]), _to_float_column(rows[:, 2]), creations
+
+
+def calculate_historical_average_quotes_vectorized(item_ids, quotes, quantities, creations, reference_time=None):
+    """
+    Computes the historical average rate of every item in one pass.
+
+    Args:
+        item_ids, quotes, quantities, creations: Columns as returned by to_columns.
+        reference_time: The "now" used for the 3-month window. Defaults to now_datetime().
+
+    Returns:
+        dict: item_id -> averageRate. Items without any valid quote are omitted.
+    """
+    valid = (quotes > 0) & (quantities > 0) & ~np.isnat(creations)
+    if not valid.any():
+        return {}
+
+    item_ids = item_ids[valid]
+    quotes = quotes[valid]
+    quantities = quantities[valid]
+    creations = creations[valid]
+
+    unique_items, group = np.unique(item_ids.astype(str), return_inverse=True)
+    group_count = len(unique_items)
+    amounts = quotes * quantities
+
+    cutoff = np.datetime64(add_months(reference_time or now_datetime(), -RECENT_WINDOW_MONTHS), "us")
+    recent = creations >= cutoff
+
+    all_count = np.bincount(group, minlength=group_count)
+    all_quantity = np.bincount(group, weights=quantities, minlength=group_count)
+    all_amount = np.bincount(group, weights=amounts, minlength=group_count)
+    # With a single contributing quote the sum of quotes is that quote, exactly
+    all_quote = np.bincount(group, weights=quotes, minlength=group_count)
+
+    recent_count = np.bincount(group[recent], minlength=group_count)
+    recent_quantity = np.bincount(group[recent], weights=quantities[recent], minlength=group_count)
+    recent_amount = np.bincount(group[recent], weights=amounts[recent], minlength=group_count)
+    recent_quote = np.bincount(group[recent], weights=quotes[recent], minlength=group_count)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        all_average = np.where(all_quantity > 0, all_amount / all_quantity, 0.0)
+        recent_average = np.where(recent_quantity > 0, recent_amount / recent_quantity, 0.0)
+
+    rates = np.where(recent_count > 1, recent_average, all_average)
+    rates = np.where(recent_count == 1, recent_quote, rates)
+    rates = np.where(all_count == 1, all_quote, rates)
+
+    return dict(zip(unique_items.tolist(), rates.tolist()))
+
+
+def get_catalogue_average_quotes(item_ids=None) -> dict[str, float]:
+    """
+    Loads Approved Quotations (optionally limited to item_ids) as columns and
+    returns the historical average rate of every item that has valid quotes.
+    """
+    conditions = "item_id IN %(item_ids)s" if item_ids else "item_id IS NOT NULL AND item_id != ''"
+    # creation as epoch microseconds: converted to datetime64 without a Python loop
+    rows = frappe.db.sql(
+        f"""
+        SELECT item_id, quote, quantity, (EXTRACT(EPOCH FROM creation) * 1000000)::bigint AS creation
+        FROM "tabApproved Quotations"
+        WHERE {conditions}
+        """,
+        {"item_ids": tuple(item_ids or ())}
+    )
+    return calculate_historical_average_quotes_vectorized(*to_columns(rows))
@@ -1,9 +1,16 @@
-import firebase_admin
-from firebase_admin import credentials
+import base64
 import io
 import os
-import base64
-from dotenv import dotenv_values
+import threading
+
+# ----------------------------------------------------------------------
+# Lazy Firebase Admin initialization
+# ----------------------------------------------------------------------
+# Nothing here runs at import time: fcm.env is read, the credentials are
+# decoded and the Firebase app is initialized on the first call to
+# get_firebase_app() / get_messaging(), i.e. when a worker actually sends a
+# push notification. Web workers and bench commands that never send one do
+# not pay for firebase_admin (and its google-auth / grpc imports) at all.
 
 # Dynamically get the absolute path of the script's location
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,45 +18,72 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 # Join the absolute path with the relative path to fcm.env
 env_file_path = os.path.join(script_dir, './fcm.env')
 
-# Step 1: Read the base64-encoded content from the file
-try:
-    with open(env_file_path, 'r') as file:
-        base64_content = file.read().strip()
-except FileNotFoundError:
-    print(f"Error: The file '{env_file_path}' was not found.")
-    exit(1)
+_firebase_app = None
+_firebase_lock = threading.Lock()
 
-# Step 2: Decode the base64 content into a UTF-8 string
-decoded_env_content = base64.b64decode(base64_content).decode('utf-8')
 
-# Step 3: Create a StringIO stream to simulate a file for dotenv_values
-env_stream = io.StringIO(decoded_env_content)
+def load_firebase_credentials() -> dict:
+    """
+    Reads the base64-encoded fcm.env next to this file and returns the
+    service account credentials. As before the lazy setup, fcm.env values
+    take precedence over variables already set in os.environ.
+    """
+    from dotenv import dotenv_values
 
-# Step 4: Load the environment variables from the decoded content
-env_vars = dotenv_values(stream=env_stream)
+    try:
+        with open(env_file_path, 'r') as file:
+            base64_content = file.read().strip()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Firebase credentials file '{env_file_path}' was not found.")
 
-# Step 4: Manually load these environment variables into os.environ
-os.environ.update(env_vars)
+    decoded_env_content = base64.b64decode(base64_content).decode('utf-8')
+    env_vars = {**os.environ, **dotenv_values(stream=io.StringIO(decoded_env_content))}
 
+    return {
+        "type": env_vars.get('FIREBASE_TYPE'),
+        "project_id": env_vars.get('FIREBASE_PROJECT_ID'),
+        "private_key_id": env_vars.get('FIREBASE_PRIVATE_KEY_ID'),
+        "private_key": (env_vars.get('FIREBASE_PRIVATE_KEY') or "").replace("\\n", "\n"),
+        "client_email": env_vars.get('FIREBASE_CLIENT_EMAIL'),
+        "client_id": env_vars.get('FIREBASE_CLIENT_ID'),
+        "auth_uri": env_vars.get('FIREBASE_AUTH_URI'),
+        "token_uri": env_vars.get('FIREBASE_TOKEN_URI'),
+        "auth_provider_x509_cert_url": env_vars.get('FIREBASE_AUTH_PROVIDER_CERT_URL'),
+        "client_x509_cert_url": env_vars.get('FIREBASE_CLIENT_CERT_URL'),
+        "universe_domain": env_vars.get('UNIVERSE_DOMAIN')
+    }
 
 
+def get_firebase_app():
+    """
+    Returns the default Firebase app, initializing it on first use.
+    Safe to call from several threads; the app is initialized once.
+    """
+    global _firebase_app
+    if _firebase_app is not None:
+        return _firebase_app
 
-firebase_credentials = {
-    "type": os.getenv('FIREBASE_TYPE'),
-    "project_id": os.getenv('FIREBASE_PROJECT_ID'),
-    "private_key_id": os.getenv('FIREBASE_PRIVATE_KEY_ID'),
-    "private_key": os.getenv('FIREBASE_PRIVATE_KEY').replace("\\n", "\n"),
-    "client_email": os.getenv('FIREBASE_CLIENT_EMAIL'),
-    "client_id": os.getenv('FIREBASE_CLIENT_ID'),
-    "auth_uri": os.getenv('FIREBASE_AUTH_URI'),
-    "token_uri": os.getenv('FIREBASE_TOKEN_URI'),
-    "auth_provider_x509_cert_url": os.getenv('FIREBASE_AUTH_PROVIDER_CERT_URL'),
-    "client_x509_cert_url": os.getenv('FIREBASE_CLIENT_CERT_URL'),
-    "universe_domain": os.getenv('UNIVERSE_DOMAIN')
-}
+    with _firebase_lock:
+        if _firebase_app is None:
+            import firebase_admin
+            from firebase_admin import credentials
+
+            try:
+                _firebase_app = firebase_admin.get_app()
+            except ValueError:
+                cred = credentials.Certificate(load_firebase_credentials())
+                _firebase_app = firebase_admin.initialize_app(cred)
+                print("firebase admin initialized successfully!")
+    return _firebase_app
 
-def initializeFirebase():
-    cred = credentials.Certificate(firebase_credentials)
-    firebase_admin.initialize_app(cred)
 
-    print("firebase admin initialized successfully!")
\ No newline at end of file
+def get_messaging():
+    """Returns the firebase_admin.messaging module with the app initialized."""
+    get_firebase_app()
+    from firebase_admin import messaging
+
+    return messaging
+
+
+def initializeFirebase():
+    return get_firebase_app()
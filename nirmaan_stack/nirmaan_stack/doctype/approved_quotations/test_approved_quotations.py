@@ -1,9 +1,117 @@
 # Copyright (c) 2024, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
 # See license.txt
 
-# import frappe
+import random
+from datetime import timezone
+from unittest.mock import patch
+
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, now_datetime
+
+from nirmaan_stack.integrations.controllers.procurement_requests import calculate_historical_average_quote
+from nirmaan_stack.integrations.controllers import vectorized_quotes
+from nirmaan_stack.integrations.controllers.vectorized_quotes import (
+	calculate_historical_average_quotes_vectorized,
+	to_columns,
+)
+
+
+def make_quote(item_id, quote, quantity, days_ago):
+	return {
+		"name": f"{item_id}-{quote}-{quantity}-{days_ago}",
+		"item_id": item_id,
+		"quote": quote,
+		"quantity": quantity,
+		"creation": add_days(now_datetime(), -days_ago) if days_ago is not None else None,
+	}
 
 
 class TestApprovedQuotations(FrappeTestCase):
-	pass
+	def assert_parity(self, approved_quotes):
+		vectorized = calculate_historical_average_quotes_vectorized(*to_columns(approved_quotes))
+
+		item_ids = {quote["item_id"] for quote in approved_quotes}
+		for item_id in item_ids:
+			item_quotes = [quote for quote in approved_quotes if quote["item_id"] == item_id]
+			expected = calculate_historical_average_quote(item_quotes, item_id)["averageRate"]
+			self.assertAlmostEqual(vectorized.get(item_id, 0.0), expected, places=6, msg=item_id)
+
+	def test_single_valid_quote(self):
+		self.assert_parity([
+			make_quote("ITEM-1", "120", "4", 400),
+			make_quote("ITEM-1", "0", "4", 2),
+			make_quote("ITEM-1", "90", "-1", 5),
+		])
+
+	def test_single_recent_quote(self):
+		self.assert_parity([
+			make_quote("ITEM-2", "100", "10", 10),
+			make_quote("ITEM-2", "80", "5", 200),
+			make_quote("ITEM-2", "60", "7", 300),
+		])
+
+	def test_weighted_average_of_recent_quotes(self):
+		self.assert_parity([
+			make_quote("ITEM-3", "100", "10", 5),
+			make_quote("ITEM-3", "110", "30", 40),
+			make_quote("ITEM-3", "500", "100", 365),
+		])
+
+	def test_fallback_to_all_history(self):
+		self.assert_parity([
+			make_quote("ITEM-4", "100", "10", 120),
+			make_quote("ITEM-4", "150", "2.5", 400),
+			make_quote("ITEM-4", "75.5", "8", 800),
+		])
+
+	def test_invalid_and_missing_values(self):
+		self.assert_parity([
+			make_quote("ITEM-5", None, "10", 5),
+			make_quote("ITEM-5", "100", None, 5),
+			make_quote("ITEM-5", "100", "10", None),
+			make_quote("ITEM-5", "abc", "10", 5),
+			make_quote("ITEM-6", "0", "0", 5),
+		])
+
+	def test_randomized_catalogue(self):
+		rng = random.Random(20261018)
+		approved_quotes = [
+			make_quote(
+				f"ITEM-R{rng.randint(1, 60)}",
+				str(round(rng.uniform(-5, 1000), 2)),
+				str(round(rng.uniform(-1, 50), 3)),
+				rng.choice([rng.randint(0, 80), rng.randint(100, 1500)]),
+			)
+			for _ in range(2000)
+		]
+		self.assert_parity(approved_quotes)
+
+	def test_columns_are_parsed_in_bulk(self):
+		rng = random.Random(7)
+		dirty_values = ("1,250", "abc", "", None, "1e3")
+		approved_quotes = [
+			make_quote(
+				f"ITEM-B{rng.randint(1, 500)}",
+				rng.choice(dirty_values) if rng.random() < 0.02 else str(round(rng.uniform(1, 1000), 2)),
+				str(rng.randint(1, 50)),
+				rng.randint(0, 700),
+			)
+			for _ in range(50_000)
+		]
+		# Creation as epoch microseconds, the way get_catalogue_average_quotes fetches it
+		rows = [
+			(quote["item_id"], quote["quote"], quote["quantity"], int(quote["creation"].replace(tzinfo=timezone.utc).timestamp() * 1_000_000))
+			for quote in approved_quotes
+		]
+
+		with patch.object(vectorized_quotes, "flt", wraps=vectorized_quotes.flt) as flt:
+			columns = to_columns(rows)
+		# Only the distinct values that are not plain decimals go through flt
+		self.assertLessEqual(flt.call_count, len(dirty_values))
+		self.assertEqual(str(columns[3].dtype), "datetime64[us]")
+
+		vectorized = calculate_historical_average_quotes_vectorized(*columns)
+		for item_id in sorted({quote["item_id"] for quote in approved_quotes})[:50]:
+			item_quotes = [quote for quote in approved_quotes if quote["item_id"] == item_id]
+			expected = calculate_historical_average_quote(item_quotes, item_id)["averageRate"]
+			self.assertAlmostEqual(vectorized.get(item_id, 0.0), expected, places=6, msg=item_id)
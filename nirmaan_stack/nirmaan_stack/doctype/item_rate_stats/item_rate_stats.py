@@ -0,0 +1,277 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, get_datetime, add_months, now_datetime
+from nirmaan_stack.integrations.controllers.item_rate_cache import clear_item_rate_cache, evict_cached_item_rates
+
+RECENT_WINDOW_MONTHS = 3  # Same look-back window used by calculate_historical_average_quote
+REBUILD_PAGE_SIZE = 50000
+
+
+class ItemRateStats(Document):
+	pass
+
+
+def get_month_key(value) -> str:
+	"""Returns the "YYYY-MM" bucket key for a datetime-like value."""
+	return get_datetime(value).strftime("%Y-%m")
+
+
+def parse_approved_quotation(aq):
+	"""
+	Validates and parses an Approved Quotation row the same way
+	calculate_historical_average_quote does.
+
+	Returns:
+		(item_id, quote, quantity, creation) for a usable row, None otherwise.
+	"""
+	item_id = aq.get("item_id")
+	if not item_id or aq.get("quote") is None or aq.get("quantity") is None or aq.get("creation") is None:
+		return None
+	try:
+		quote = flt(aq.get("quote"))
+		quantity = flt(aq.get("quantity"))
+		creation = get_datetime(aq.get("creation"))
+	except (ValueError, TypeError):
+		return None
+	if quote <= 0 or quantity <= 0 or not creation:
+		return None
+	return item_id, quote, quantity, creation
+
+
+def apply_approved_quotations(approved_quotations, removed=False):
+	"""
+	Folds Approved Quotation rows into (or, with removed=True, out of) the
+	Item Rate Stats of their items. Called from the Procurement Orders hooks
+	that write and delete Approved Quotations.
+
+	Args:
+		approved_quotations: Dicts/Documents with name, item_id, quote, quantity and creation.
+		removed: True when the rows have just been deleted from Approved Quotations.
+	"""
+	quotes_by_item = {}
+	for aq in approved_quotations or []:
+		parsed = parse_approved_quotation(aq)
+		if parsed:
+			item_id, quote, quantity, creation = parsed
+			quotes_by_item.setdefault(item_id, []).append((aq.get("name"), quote, quantity, creation))
+
+	for item_id, quotes in quotes_by_item.items():
+		_update_item_stats(item_id, quotes, removed)
+
+
+def _update_item_stats(item_id, quotes, removed):
+	stats = frappe.db.get_value(
+		"Item Rate Stats",
+		item_id,
+		["monthly_stats", "latest_quote", "latest_quote_date", "latest_approved_quotation"],
+		as_dict=True,
+		for_update=True
+	)
+	if not stats and removed:
+		return
+
+	stats = stats or frappe._dict()
+	monthly_stats = frappe.parse_json(stats.monthly_stats) if stats.monthly_stats else {}
+	sign = -1 if removed else 1
+
+	for name, quote, quantity, creation in quotes:
+		month_key = get_month_key(creation)
+		bucket = monthly_stats.setdefault(month_key, {"count": 0, "quantity": 0.0, "amount": 0.0})
+		bucket["count"] += sign
+		bucket["quantity"] += sign * quantity
+		bucket["amount"] += sign * quote * quantity
+		if bucket["count"] <= 0:
+			del monthly_stats[month_key]
+
+		if not removed and (not stats.latest_quote_date or creation >= get_datetime(stats.latest_quote_date)):
+			stats.latest_quote = quote
+			stats.latest_quote_date = creation
+			stats.latest_approved_quotation = name
+
+	if removed and stats.latest_approved_quotation in {name for name, *_ in quotes}:
+		latest = _get_latest_valid_quote(item_id)
+		stats.latest_quote = latest[1] if latest else 0
+		stats.latest_quote_date = latest[3] if latest else None
+		stats.latest_approved_quotation = latest[0] if latest else None
+
+	values = {
+		"quote_count": sum(bucket["count"] for bucket in monthly_stats.values()),
+		"monthly_stats": frappe.as_json(monthly_stats),
+		"latest_quote": stats.latest_quote,
+		"latest_quote_date": stats.latest_quote_date,
+		"latest_approved_quotation": stats.latest_approved_quotation,
+	}
+
+	if frappe.db.exists("Item Rate Stats", item_id):
+		frappe.db.set_value("Item Rate Stats", item_id, values, update_modified=False)
+	else:
+		frappe.get_doc({"doctype": "Item Rate Stats", "item_id": item_id, **values}).insert(ignore_permissions=True)
+
+
+def _get_latest_valid_quote(item_id):
+	"""Finds the most recent usable Approved Quotation of an item, as (name, quote, quantity, creation)."""
+	page_size = 50
+	start = 0
+	while True:
+		rows = frappe.get_all(
+			"Approved Quotations",
+			filters={"item_id": item_id},
+			fields=["name", "item_id", "quote", "quantity", "creation"],
+			order_by="creation desc",
+			limit_start=start,
+			limit_page_length=page_size
+		)
+		for row in rows:
+			parsed = parse_approved_quotation(row)
+			if parsed:
+				return (row.name, *parsed[1:])
+		if len(rows) < page_size:
+			return None
+		start += page_size
+
+
+def get_window_cutoff(reference_time=None):
+	"""Start of the recent window, exactly as calculate_historical_average_quote computes it."""
+	return add_months(reference_time or now_datetime(), -RECENT_WINDOW_MONTHS)
+
+
+def get_boundary_quotes(item_ids, cutoff) -> dict:
+	"""
+	The usable quotes of the cutoff's month created before the cutoff, i.e.
+	the part of the boundary month bucket that lies outside the window.
+
+	Returns:
+		dict: item_id -> list of (quote, quantity).
+	"""
+	if not item_ids:
+		return {}
+
+	month_start = get_datetime(cutoff).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+	rows = frappe.get_all(
+		"Approved Quotations",
+		filters=[
+			["item_id", "in", list(item_ids)],
+			["creation", ">=", month_start],
+			["creation", "<", cutoff],
+		],
+		fields=["item_id", "quote", "quantity", "creation"]
+	)
+	boundary_quotes = {}
+	for row in rows:
+		parsed = parse_approved_quotation(row)
+		if parsed:
+			boundary_quotes.setdefault(parsed[0], []).append((parsed[1], parsed[2]))
+	return boundary_quotes
+
+
+def has_boundary_bucket(stats, cutoff) -> bool:
+	monthly_stats = stats.get("monthly_stats") or {}
+	if isinstance(monthly_stats, str):
+		monthly_stats = frappe.parse_json(monthly_stats)
+	return get_month_key(cutoff) in monthly_stats
+
+
+def estimate_average_rate(stats, boundary_quotes=None, cutoff=None) -> float:
+	"""
+	Applies the historical average rules to a precomputed Item Rate Stats row:
+	a single quote (overall or within the window) is returned as is, otherwise
+	the quantity-weighted average of the recent window, falling back to the
+	weighted average of all history.
+
+	The window starts at the exact cutoff of calculate_historical_average_quote.
+	Months after the cutoff's month are wholly inside it; from the cutoff's
+	month bucket, the quotes created before the cutoff (`boundary_quotes`,
+	see get_boundary_quotes; queried for the item when not given) are
+	subtracted.
+	"""
+	monthly_stats = stats.get("monthly_stats") or {}
+	if isinstance(monthly_stats, str):
+		monthly_stats = frappe.parse_json(monthly_stats)
+	if not monthly_stats:
+		return 0.0
+
+	cutoff = cutoff or get_window_cutoff()
+	cutoff_month = get_month_key(cutoff)
+	recent = [bucket for month_key, bucket in monthly_stats.items() if month_key >= cutoff_month]
+	recent_count = sum(bucket["count"] for bucket in recent)
+	recent_quantity = sum(flt(bucket["quantity"]) for bucket in recent)
+	recent_amount = sum(flt(bucket["amount"]) for bucket in recent)
+
+	if cutoff_month in monthly_stats:
+		if boundary_quotes is None:
+			boundary_quotes = get_boundary_quotes([stats.get("item_id")], cutoff).get(stats.get("item_id"), [])
+		recent_count -= len(boundary_quotes)
+		recent_quantity -= sum(quantity for _quote, quantity in boundary_quotes)
+		recent_amount -= sum(quote * quantity for quote, quantity in boundary_quotes)
+
+	if recent_count > 0:
+		count, total_quantity, total_amount = recent_count, recent_quantity, recent_amount
+	else:
+		count = sum(bucket["count"] for bucket in monthly_stats.values())
+		total_quantity = sum(flt(bucket["quantity"]) for bucket in monthly_stats.values())
+		total_amount = sum(flt(bucket["amount"]) for bucket in monthly_stats.values())
+
+	# A single contributing quote is, by construction, the latest one
+	if count == 1 and flt(stats.get("latest_quote")) > 0:
+		return flt(stats.get("latest_quote"))
+
+	return total_amount / total_quantity if total_quantity > 0 else 0.0
+
+
+def rebuild_item_rate_stats(item_ids=None):
+	"""
+	Recomputes Item Rate Stats from Approved Quotations, for all items or only
+	the given ones. Used by the backfill patch and for drift repair:
+	bench --site [site] execute nirmaan_stack.nirmaan_stack.doctype.item_rate_stats.item_rate_stats.rebuild_item_rate_stats
+	"""
+	filters = {"item_id": ["in", item_ids]} if item_ids else {"item_id": ["is", "set"]}
+	stats_by_item = {}
+	start = 0
+	while True:
+		rows = frappe.get_all(
+			"Approved Quotations",
+			filters=filters,
+			fields=["name", "item_id", "quote", "quantity", "creation"],
+			order_by="name asc",
+			limit_start=start,
+			limit_page_length=REBUILD_PAGE_SIZE
+		)
+		for row in rows:
+			parsed = parse_approved_quotation(row)
+			if not parsed:
+				continue
+			item_id, quote, quantity, creation = parsed
+			stats = stats_by_item.setdefault(item_id, {"monthly_stats": {}, "latest": None})
+			bucket = stats["monthly_stats"].setdefault(get_month_key(creation), {"count": 0, "quantity": 0.0, "amount": 0.0})
+			bucket["count"] += 1
+			bucket["quantity"] += quantity
+			bucket["amount"] += quote * quantity
+			if not stats["latest"] or creation >= stats["latest"][3]:
+				stats["latest"] = (row.name, quote, quantity, creation)
+		if len(rows) < REBUILD_PAGE_SIZE:
+			break
+		start += REBUILD_PAGE_SIZE
+
+	if item_ids:
+		frappe.db.delete("Item Rate Stats", {"item_id": ["in", item_ids]})
+		evict_cached_item_rates(item_ids)
+	else:
+		frappe.db.delete("Item Rate Stats")
+		clear_item_rate_cache()
+
+	for item_id, stats in stats_by_item.items():
+		name, quote, _quantity, creation = stats["latest"]
+		frappe.get_doc({
+			"doctype": "Item Rate Stats",
+			"item_id": item_id,
+			"quote_count": sum(bucket["count"] for bucket in stats["monthly_stats"].values()),
+			"monthly_stats": frappe.as_json(stats["monthly_stats"]),
+			"latest_quote": quote,
+			"latest_quote_date": creation,
+			"latest_approved_quotation": name,
+		}).insert(ignore_permissions=True)
+
+	return len(stats_by_item)
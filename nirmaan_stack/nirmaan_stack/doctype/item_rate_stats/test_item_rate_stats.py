@@ -0,0 +1,180 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_months, now_datetime
+
+from nirmaan_stack.integrations.controllers.procurement_requests import calculate_historical_average_quote
+from nirmaan_stack.nirmaan_stack.doctype.item_rate_stats.item_rate_stats import (
+	apply_approved_quotations,
+	estimate_average_rate,
+	get_month_key,
+	get_window_cutoff,
+)
+
+TEST_ITEM = "_Test Rate Stats Item"
+
+
+def months_ago(months):
+	return add_months(now_datetime(), -months)
+
+
+def make_bucket(count, quantity, quote):
+	return {"count": count, "quantity": quantity, "amount": quantity * quote}
+
+
+def make_stats(buckets, latest_quote=0):
+	"""Item Rate Stats row with monthly buckets keyed by months ago."""
+	return {
+		"monthly_stats": {get_month_key(months_ago(months)): bucket for months, bucket in buckets.items()},
+		"latest_quote": latest_quote,
+	}
+
+
+def estimate_from_quotes(quotes):
+	"""estimate_average_rate over in-memory (quote, quantity, creation) tuples, bucketed as apply_approved_quotations does."""
+	cutoff = get_window_cutoff()
+	monthly_stats = {}
+	for quote, quantity, creation in quotes:
+		bucket = monthly_stats.setdefault(get_month_key(creation), {"count": 0, "quantity": 0.0, "amount": 0.0})
+		bucket["count"] += 1
+		bucket["quantity"] += quantity
+		bucket["amount"] += quote * quantity
+	boundary_quotes = [
+		(quote, quantity) for quote, quantity, creation in quotes
+		if get_month_key(creation) == get_month_key(cutoff) and creation < cutoff
+	]
+	latest_quote = max(quotes, key=lambda quote: quote[2])[0]
+	stats = {"monthly_stats": monthly_stats, "latest_quote": latest_quote}
+	return estimate_average_rate(stats, boundary_quotes, cutoff)
+
+
+def make_approved_quotation(name, quote, quantity, creation):
+	doc = frappe.get_doc({
+		"doctype": "Approved Quotations",
+		"name": name,
+		"item_id": TEST_ITEM,
+		"quote": str(quote),
+		"quantity": str(quantity),
+		"creation": creation,
+		"modified": creation,
+	})
+	doc.db_insert()
+	return frappe._dict(name=name, item_id=TEST_ITEM, quote=str(quote), quantity=str(quantity), creation=creation)
+
+
+def get_item_stats():
+	stats = frappe.db.get_value(
+		"Item Rate Stats", TEST_ITEM,
+		["quote_count", "monthly_stats", "latest_quote", "latest_approved_quotation"],
+		as_dict=True
+	)
+	stats.monthly_stats = frappe.parse_json(stats.monthly_stats)
+	return stats
+
+
+class TestItemRateStats(FrappeTestCase):
+	def setUp(self):
+		if not frappe.db.exists("Items", TEST_ITEM):
+			frappe.get_doc({
+				"doctype": "Items", "name": TEST_ITEM, "item_name": TEST_ITEM, "unit_name": "Nos", "category": "_Test Category"
+			}).db_insert()
+		frappe.db.delete("Approved Quotations", {"item_id": TEST_ITEM})
+		frappe.db.delete("Item Rate Stats", {"item_id": TEST_ITEM})
+
+	def test_empty_stats(self):
+		self.assertEqual(estimate_average_rate({}), 0.0)
+		self.assertEqual(estimate_average_rate({"monthly_stats": "{}"}), 0.0)
+
+	def test_single_quote_overall(self):
+		stats = make_stats({12: make_bucket(1, 4, 120)}, latest_quote=120)
+		self.assertEqual(estimate_average_rate(stats), 120)
+
+	def test_single_quote_in_window(self):
+		stats = make_stats({1: make_bucket(1, 10, 100), 6: make_bucket(2, 5, 80)}, latest_quote=100)
+		self.assertEqual(estimate_average_rate(stats), 100)
+
+	def test_weighted_average_of_window(self):
+		stats = make_stats({
+			0: make_bucket(1, 10, 100),
+			2: make_bucket(2, 30, 110),
+			12: make_bucket(1, 100, 500),
+		}, latest_quote=100)
+		self.assertAlmostEqual(estimate_average_rate(stats), (10 * 100 + 30 * 110) / 40)
+
+	def test_fallback_to_all_history_when_window_is_empty(self):
+		stats = make_stats({
+			5: make_bucket(1, 10, 100),
+			14: make_bucket(2, 10, 130),
+		}, latest_quote=100)
+		self.assertAlmostEqual(estimate_average_rate(stats), (10 * 100 + 10 * 130) / 20)
+
+	def test_window_boundary_matches_historical_average(self):
+		# 3 months + 10 days old is outside the exact window even when it
+		# falls in the same calendar month as the cutoff
+		now = now_datetime()
+		boundary = add_days(months_ago(3), -10)
+		cases = [
+			[(100, 10, boundary), (200, 5, months_ago(1))],
+			[(100, 10, boundary), (200, 5, months_ago(1)), (150, 5, add_days(months_ago(3), 2))],
+			[(100, 10, boundary), (130, 10, add_days(boundary, -40))],
+			[(100, 10, boundary), (120, 4, add_days(now, -1)), (90, 6, add_days(now, -2))],
+		]
+		for quotes in cases:
+			expected = calculate_historical_average_quote(
+				[{"quote": str(quote), "quantity": str(quantity), "creation": creation} for quote, quantity, creation in quotes],
+				TEST_ITEM
+			)["averageRate"]
+			self.assertAlmostEqual(estimate_from_quotes(quotes), expected)
+
+	def test_buckets_are_added_and_removed(self):
+		recent, old = months_ago(1), months_ago(8)
+		quotes = [
+			make_approved_quotation("_Test AQ 1", 100, 10, old),
+			make_approved_quotation("_Test AQ 2", 120, 5, recent),
+			make_approved_quotation("_Test AQ 3", 90, 5, recent),
+		]
+		apply_approved_quotations(quotes)
+
+		stats = get_item_stats()
+		self.assertEqual(stats.quote_count, 3)
+		self.assertEqual(stats.monthly_stats[get_month_key(recent)], {"count": 2, "quantity": 10.0, "amount": 1050.0})
+		self.assertEqual(stats.monthly_stats[get_month_key(old)], {"count": 1, "quantity": 10.0, "amount": 1000.0})
+
+		frappe.db.delete("Approved Quotations", {"name": "_Test AQ 1"})
+		apply_approved_quotations(quotes[:1], removed=True)
+
+		stats = get_item_stats()
+		self.assertEqual(stats.quote_count, 2)
+		self.assertNotIn(get_month_key(old), stats.monthly_stats)
+
+	def test_remove_then_add_is_symmetric(self):
+		quotes = [
+			make_approved_quotation("_Test AQ 1", 100, 10, months_ago(1)),
+			make_approved_quotation("_Test AQ 2", 80, 4, months_ago(2)),
+		]
+		apply_approved_quotations(quotes)
+		before = get_item_stats()
+
+		apply_approved_quotations(quotes[1:], removed=True)
+		apply_approved_quotations(quotes[1:])
+		self.assertEqual(get_item_stats(), before)
+
+	def test_latest_quote_is_recomputed_after_deleting_it(self):
+		quotes = [
+			make_approved_quotation("_Test AQ 1", 100, 10, months_ago(3)),
+			make_approved_quotation("_Test AQ 2", 0, 4, months_ago(2)),
+			make_approved_quotation("_Test AQ 3", 150, 2, months_ago(1)),
+		]
+		apply_approved_quotations(quotes)
+		stats = get_item_stats()
+		self.assertEqual((stats.latest_quote, stats.latest_approved_quotation), (150, "_Test AQ 3"))
+
+		frappe.db.delete("Approved Quotations", {"name": "_Test AQ 3"})
+		apply_approved_quotations(quotes[2:], removed=True)
+
+		# The zero quote is skipped, as it is by the average
+		stats = get_item_stats()
+		self.assertEqual((stats.latest_quote, stats.latest_approved_quotation), (100, "_Test AQ 1"))
+		self.assertEqual(estimate_average_rate(stats), 100)
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Nirmaan Notification Archive", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,99 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, now_datetime
+
+from nirmaan_stack.integrations.Notifications import notification_retention
+from nirmaan_stack.integrations.Notifications.notification_retention import (
+	archive_seen_notifications,
+	compact_unseen_notifications,
+)
+
+TEST_RECIPIENTS = ("_test_retention_1@nirmaan.app", "_test_retention_2@nirmaan.app")
+
+
+def make_notification(name, recipient, days_ago, seen="false", docname="PR-TEST-0001", digest_count=None):
+	creation = add_days(now_datetime(), -days_ago)
+	frappe.get_doc({
+		"doctype": "Nirmaan Notifications",
+		"name": name,
+		"creation": creation,
+		"modified": creation,
+		"title": "PR Approved",
+		"document": "Procurement Requests",
+		"docname": docname,
+		"event_id": "pr:approved",
+		"seen": seen,
+		"recipient": recipient,
+		"digest_count": digest_count,
+	}).db_insert()
+
+
+class TestNirmaanNotificationArchive(FrappeTestCase):
+	def setUp(self):
+		# The job commits each batch; keep the test inside its transaction,
+		# which is rolled back, so other old notifications can be cleared
+		commit = patch.object(frappe.db, "commit")
+		commit.start()
+		self.addCleanup(commit.stop)
+		self.cutoff = add_days(now_datetime(), -30)
+		frappe.db.delete("Nirmaan Notifications", {"creation": ("<", self.cutoff)})
+		for doctype in ("Nirmaan Notifications", "Nirmaan Notification Archive"):
+			frappe.db.delete(doctype, {"recipient": ("in", TEST_RECIPIENTS)})
+
+	def get_names(self, doctype, **filters):
+		return sorted(frappe.get_all(doctype, filters={"recipient": ("in", TEST_RECIPIENTS), **filters}, pluck="name"))
+
+	def test_seen_notifications_are_archived_in_batches(self):
+		recipient = TEST_RECIPIENTS[0]
+		for index in range(5):
+			make_notification(f"_test-seen-{index}", recipient, 40 + index, seen="true")
+		make_notification("_test-seen-recent", recipient, 5, seen="true")
+		make_notification("_test-unseen-old", recipient, 60)
+
+		with patch.object(frappe, "get_all", wraps=frappe.get_all) as get_all:
+			moved = archive_seen_notifications(self.cutoff, batch_size=2)
+		self.assertEqual(moved, 5)
+		# Three batches, then the empty read that ends the loop
+		self.assertEqual(get_all.call_count, 4)
+
+		self.assertEqual(self.get_names("Nirmaan Notifications"), ["_test-seen-recent", "_test-unseen-old"])
+		self.assertEqual(self.get_names("Nirmaan Notification Archive"), [f"_test-seen-{index}" for index in range(5)])
+		self.assertEqual(archive_seen_notifications(self.cutoff, batch_size=2), 0)
+
+	def test_unseen_notifications_are_compacted_into_digests(self):
+		recipient, other_recipient = TEST_RECIPIENTS
+		make_notification("_test-digest-old", recipient, 50, digest_count=2)
+		make_notification("_test-digest-mid", recipient, 45)
+		make_notification("_test-digest-new", recipient, 40)
+		make_notification("_test-digest-recent", recipient, 5)
+		make_notification("_test-other-doc-1", recipient, 40, docname="PR-TEST-0002")
+		make_notification("_test-other-doc-2", recipient, 41, docname="PR-TEST-0002")
+		make_notification("_test-single", other_recipient, 40)
+
+		with patch.object(notification_retention, "decrement_unread_counts") as decrement_unread_counts:
+			archived, digests = compact_unseen_notifications(self.cutoff, group_batch_size=1)
+
+		self.assertEqual((archived, digests), (3, 2))
+		self.assertEqual(
+			self.get_names("Nirmaan Notifications"),
+			["_test-digest-new", "_test-digest-recent", "_test-other-doc-1", "_test-single"],
+		)
+		# The newest row stands for itself and every row it replaced
+		self.assertEqual(frappe.db.get_value("Nirmaan Notifications", "_test-digest-new", "digest_count"), 4)
+		self.assertEqual(frappe.db.get_value("Nirmaan Notifications", "_test-other-doc-1", "digest_count"), 2)
+		self.assertFalse(frappe.db.get_value("Nirmaan Notifications", "_test-single", "digest_count"))
+
+		decremented = sorted(row.name for call in decrement_unread_counts.call_args_list for row in call.args[0])
+		self.assertEqual(decremented, ["_test-digest-mid", "_test-digest-old", "_test-other-doc-2"])
+		self.assertEqual(
+			self.get_names("Nirmaan Notification Archive", archive_reason="Compacted"),
+			["_test-digest-mid", "_test-digest-old", "_test-other-doc-2"],
+		)
+
+		with patch.object(notification_retention, "decrement_unread_counts"):
+			self.assertEqual(compact_unseen_notifications(self.cutoff), (0, 0))
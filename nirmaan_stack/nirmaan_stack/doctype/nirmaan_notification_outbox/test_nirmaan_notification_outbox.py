@@ -0,0 +1,95 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nirmaan_stack.benchmarks.fcm_stub import start_stub
+from nirmaan_stack.integrations.Notifications.fcm_batch import FCM_MULTICAST_LIMIT, send_batched_notifications
+from nirmaan_stack.integrations.Notifications.notification_outbox import BACKOFF_MAX_SECONDS, get_backoff_seconds
+from nirmaan_stack.integrations.Notifications.push_health import _summarize, is_dead_token, is_permanent_failure
+
+
+def make_message(index, title="PR Approved", token=None):
+	return {
+		"recipient": f"user-{index}@nirmaan.app",
+		"fcm_token": token or f"token-{index}",
+		"title": title,
+		"body": "Test notification",
+		"click_action_url": "procurement-requests/TEST-PR",
+	}
+
+
+class TestNirmaanNotificationOutbox(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.server, cls.stub_url, cls.stats = start_stub(latency=0)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.shutdown()
+		super().tearDownClass()
+
+	def setUp(self):
+		self.previous_stub_url = frappe.conf.get("fcm_stub_url")
+		frappe.conf.fcm_stub_url = self.stub_url
+
+	def tearDown(self):
+		frappe.conf.fcm_stub_url = self.previous_stub_url
+
+	def test_messages_are_grouped_by_payload_and_chunked(self):
+		messages = [make_message(index) for index in range(FCM_MULTICAST_LIMIT + 10)]
+		messages += [make_message(index, title="PO Dispatched") for index in range(5)]
+
+		calls_before = self.stats["calls"]
+		results = send_batched_notifications(messages)
+
+		self.assertEqual(self.stats["calls"] - calls_before, 3)
+		self.assertEqual(len(results), len(messages))
+		self.assertTrue(all(result["success"] for result in results))
+
+	def test_failures_are_mapped_back_to_recipients(self):
+		messages = [
+			make_message(0),
+			make_message(1, token="unregistered-1"),
+			make_message(2),
+			make_message(3, token="invalid-3"),
+		]
+		results = send_batched_notifications(messages)
+
+		failed = {message["recipient"]: result["error_code"] for message, result in zip(messages, results) if not result["success"]}
+		self.assertEqual(failed, {"user-1@nirmaan.app": "UNREGISTERED", "user-3@nirmaan.app": "INVALID_ARGUMENT"})
+		self.assertEqual([result["failure"] for result in results], [None, "unregistered", None, "invalid"])
+
+	def test_unreachable_endpoint_fails_the_whole_batch(self):
+		frappe.conf.fcm_stub_url = "http://127.0.0.1:9"
+		results = send_batched_notifications([make_message(0), make_message(1)])
+		self.assertEqual([result["error_code"] for result in results], ["BATCH_FAILED", "BATCH_FAILED"])
+		self.assertFalse(any(is_permanent_failure(result) for result in results))
+
+	def test_health_summary_tracks_streaks_and_dead_tokens(self):
+		messages = [make_message(0), make_message(0, token="unregistered-0"), make_message(1, token="invalid-1")]
+		rows = [frappe._dict(message) for message in messages]
+		summaries = _summarize(zip(rows, send_batched_notifications(messages)))
+
+		self.assertEqual((summaries["user-0@nirmaan.app"]["sent"], summaries["user-0@nirmaan.app"]["streak"]), (1, 1))
+		self.assertEqual(summaries["user-0@nirmaan.app"]["dead_tokens"], {"unregistered-0"})
+		self.assertEqual(summaries["user-1@nirmaan.app"]["values"]["token_status"], "Invalid")
+
+	def test_rejected_payload_keeps_the_tokens(self):
+		messages = [make_message(0, title="invalid-payload PR Approved"), make_message(1, title="invalid-payload PR Approved")]
+		results = send_batched_notifications(messages)
+
+		self.assertEqual([result["error_code"] for result in results], ["INVALID_ARGUMENT", "INVALID_ARGUMENT"])
+		self.assertEqual([result["failure"] for result in results], ["rejected", "rejected"])
+		self.assertTrue(all(is_permanent_failure(result) for result in results))
+		self.assertFalse(any(is_dead_token(result) for result in results))
+
+		summaries = _summarize(zip([frappe._dict(message) for message in messages], results))
+		self.assertEqual(summaries["user-0@nirmaan.app"]["dead_tokens"], set())
+		self.assertNotIn("token_status", summaries["user-0@nirmaan.app"]["values"])
+
+	def test_backoff_is_exponential_and_capped(self):
+		self.assertEqual([get_backoff_seconds(attempt) for attempt in (1, 2, 3)], [30, 60, 120])
+		self.assertEqual(get_backoff_seconds(20), BACKOFF_MAX_SECONDS)
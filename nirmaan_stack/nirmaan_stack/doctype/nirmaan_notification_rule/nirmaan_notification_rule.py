@@ -0,0 +1,25 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from nirmaan_stack.integrations.Notifications.notification_rules import clear_rules_cache
+
+
+class NirmaanNotificationRule(Document):
+	def validate(self):
+		recipients = frappe.parse_json(self.recipients) if self.recipients else None
+		if not isinstance(recipients, dict) or not recipients.get("list"):
+			frappe.throw(_("Recipients must be a JSON object with a non-empty \"list\" of role profiles"))
+		for recipient in recipients["list"]:
+			if not recipient.get("role_profile"):
+				frappe.throw(_("Every recipient needs a role_profile"))
+		if self.trigger == "after_insert" and self.from_states:
+			frappe.throw(_("From States only apply to the on_update trigger"))
+
+	def on_update(self):
+		clear_rules_cache()
+
+	def on_trash(self):
+		clear_rules_cache()
@@ -0,0 +1,77 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nirmaan_stack.integrations.Notifications import notification_rules
+from nirmaan_stack.integrations.Notifications.notification_rules import build_push_messages, rule_matches, uses_variable
+
+
+def make_rule(**kwargs):
+	return frappe._dict({
+		"trigger": "on_update",
+		"state_field": "workflow_state",
+		"from_states": [],
+		"to_state": None,
+		"condition": None,
+		**kwargs,
+	})
+
+
+class TestNirmaanNotificationRule(FrappeTestCase):
+	def test_transition_must_match(self):
+		rule = make_rule(from_states=["Pending", "Vendor Selected"], to_state="Rejected")
+		doc = frappe._dict({"workflow_state": "Rejected"})
+
+		self.assertTrue(rule_matches(rule, doc, frappe._dict({"workflow_state": "Pending"})))
+		self.assertFalse(rule_matches(rule, doc, frappe._dict({"workflow_state": "Approved"})))
+		self.assertFalse(rule_matches(rule, frappe._dict({"workflow_state": "Approved"}), frappe._dict({"workflow_state": "Pending"})))
+
+	def test_unchanged_state_does_not_fire_again(self):
+		rule = make_rule(state_field="status", to_state="Vendor Selected")
+		doc = frappe._dict({"status": "Vendor Selected"})
+
+		self.assertTrue(rule_matches(rule, doc, frappe._dict({"status": "Created"})))
+		self.assertFalse(rule_matches(rule, doc, frappe._dict({"status": "Vendor Selected"})))
+
+	def test_push_messages_skip_users_without_push(self):
+		rule = make_rule(
+			push_title_template="PR {{ doc.name }}",
+			push_body_template="Hi {{ user.full_name }}",
+			push_url_template="/frontend/prs",
+		)
+		users = [
+			{"name": "lead@nirmaan.app", "full_name": "Lead", "role_profile": "Nirmaan Project Lead Profile", "push_notification": "true", "fcm_token": "t1"},
+			{"name": "admin@nirmaan.app", "full_name": "Admin", "role_profile": "Nirmaan Admin Profile", "push_notification": "false", "fcm_token": "t2"},
+			{"name": "acc@nirmaan.app", "full_name": "Acc", "role_profile": "Nirmaan Accountant Profile", "push_notification": "true", "fcm_token": "t3"},
+		]
+		context = {"doc": frappe._dict({"name": "PR-1"})}
+
+		messages = build_push_messages(rule, users, context, {"Nirmaan Accountant Profile": {"push_url": "/frontend/payments"}})
+
+		self.assertEqual([message["recipient"] for message in messages], ["lead@nirmaan.app", "acc@nirmaan.app"])
+		self.assertEqual(messages[0]["title"], "PR PR-1")
+		self.assertEqual(messages[1]["body"], "Hi Acc")
+		self.assertEqual(messages[1]["click_action_url"], "/frontend/payments")
+
+	def test_templates_without_user_variable_are_rendered_once(self):
+		self.assertTrue(uses_variable("{% if doc.custom %}Hi {{ user.full_name }}{% endif %}", "user"))
+		self.assertFalse(uses_variable("New PR for user review by {{ sender_name }}", "user"))
+
+		title = "New PR for user review: {{ doc.name }}"
+		rule = make_rule(push_title_template=title, push_body_template="Hi {{ user.full_name }}", push_url_template=None)
+		users = [
+			{"name": f"user-{index}@nirmaan.app", "full_name": f"User {index}", "role_profile": "Nirmaan Admin Profile", "push_notification": "true", "fcm_token": f"t{index}"}
+			for index in range(3)
+		]
+		context = {"doc": frappe._dict({"name": "PR-1"})}
+
+		with patch.object(notification_rules, "render", wraps=notification_rules.render) as render:
+			messages = build_push_messages(rule, users, context, {})
+
+		self.assertEqual([call.args[0] for call in render.call_args_list].count(title), 1)
+		self.assertEqual([message["body"] for message in messages], ["Hi User 0", "Hi User 1", "Hi User 2"])
+		self.assertEqual({message["title"] for message in messages}, {"New PR for user review: PR-1"})
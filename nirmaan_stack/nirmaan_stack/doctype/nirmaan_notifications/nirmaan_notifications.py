@@ -1,9 +1,29 @@
 # Copyright (c) 2024, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
+from nirmaan_stack.integrations.Notifications.unread_counters import decrement_unread_counts, increment_unread_counts
 
 
 class NirmaanNotifications(Document):
-	pass
+	def after_insert(self):
+		if self.seen == "false":
+			frappe.db.after_commit.add(lambda: increment_unread_counts([self.as_dict()]))
+
+	def on_update(self):
+		# Single notifications are marked seen from the UI with a plain doc update
+		previous = self.get_doc_before_save()
+		if not previous or previous.seen == self.seen:
+			return
+		if self.seen == "true":
+			decrement_unread_counts([{**self.as_dict(), "seen": "false"}])
+		elif self.seen == "false":
+			frappe.db.after_commit.add(lambda: increment_unread_counts([self.as_dict()]))
+
+	def on_trash(self):
+		decrement_unread_counts([self.as_dict()])
+
+
+def on_doctype_update():
+	frappe.db.add_index("Nirmaan Notifications", ["recipient", "seen"])
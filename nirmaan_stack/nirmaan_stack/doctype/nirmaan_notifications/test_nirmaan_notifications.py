@@ -1,9 +1,52 @@
 # Copyright (c) 2024, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import patch
+
 from frappe.tests.utils import FrappeTestCase
 
+from nirmaan_stack.integrations.Notifications.realtime_buffer import (
+	REALTIME_BATCH_EVENT,
+	clear_realtime_buffer,
+	flush_realtime_buffer,
+	queue_realtime,
+)
+from nirmaan_stack.integrations.Notifications.unread_counters import _collect_deltas, get_count_fields
+
 
 class TestNirmaanNotifications(FrappeTestCase):
-	pass
+	def test_count_fields(self):
+		self.assertEqual(
+			get_count_fields({"event_id": "pr:new", "project": "PROJ-0001"}),
+			["total", "event:pr:new", "project:PROJ-0001"],
+		)
+		self.assertEqual(get_count_fields({"event_id": "pr:new", "project": None}), ["total", "event:pr:new"])
+
+	def test_seen_notifications_are_not_counted(self):
+		deltas = _collect_deltas([
+			{"recipient": "lead@nirmaan.app", "event_id": "pr:new", "project": "PROJ-0001", "seen": "false"},
+			{"recipient": "lead@nirmaan.app", "event_id": "pr:new", "project": "PROJ-0002"},
+			{"recipient": "lead@nirmaan.app", "event_id": "pr:new", "project": "PROJ-0001", "seen": "true"},
+		], -1)
+
+		self.assertEqual(deltas["lead@nirmaan.app"]["total"], -2)
+		self.assertEqual(deltas["lead@nirmaan.app"]["event:pr:new"], -2)
+		self.assertEqual(deltas["lead@nirmaan.app"]["project:PROJ-0001"], -1)
+
+	def test_realtime_events_are_coalesced_per_user(self):
+		clear_realtime_buffer()
+		queue_realtime("po:delete", {"docname": "PO-1", "notificationId": "n1"}, "lead@nirmaan.app")
+		queue_realtime("po:delete", {"docname": "PO-1", "notificationId": "n2"}, "lead@nirmaan.app")
+		queue_realtime("pr:delete", {"docname": "PR-1", "notificationId": "n3"}, "lead@nirmaan.app")
+		queue_realtime("po:delete", {"docname": "PO-1", "notificationId": "n4"}, "admin@nirmaan.app")
+
+		with patch("frappe.publish_realtime") as publish_realtime:
+			flush_realtime_buffer()
+
+		calls = {call.kwargs["user"]: call.kwargs for call in publish_realtime.call_args_list}
+		self.assertEqual(len(publish_realtime.call_args_list), 2)
+		self.assertEqual(calls["admin@nirmaan.app"]["event"], "po:delete")
+		self.assertEqual(calls["lead@nirmaan.app"]["event"], REALTIME_BATCH_EVENT)
+		events = calls["lead@nirmaan.app"]["message"]["events"]
+		self.assertEqual([entry["event"] for entry in events], ["po:delete", "pr:delete"])
+		self.assertEqual(events[0]["message"]["notificationIds"], ["n1", "n2"])
@@ -0,0 +1,136 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nirmaan_stack.integrations.Notifications import push_health
+from nirmaan_stack.integrations.Notifications.push_health import (
+	HEALTH_DOCTYPE,
+	OUTBOX_DOCTYPE,
+	prune_dead_tokens,
+	record_push_results,
+)
+
+TEST_USERS = ("_test_push_health_1@nirmaan.app", "_test_push_health_2@nirmaan.app")
+
+
+def make_user(user, token):
+	frappe.get_doc({
+		"doctype": "Nirmaan Users",
+		"name": user,
+		"first_name": "Test",
+		"full_name": "Test User",
+		"email": user,
+		"fcm_token": token,
+	}).db_insert()
+
+
+def make_outbox_row(name, user, token, status="Queued"):
+	frappe.get_doc({
+		"doctype": OUTBOX_DOCTYPE,
+		"name": name,
+		"recipient": user,
+		"fcm_token": token,
+		"title": "PR Approved",
+		"status": status,
+	}).db_insert()
+	return frappe._dict(name=name, recipient=user, fcm_token=token)
+
+
+def success():
+	return {"success": True}
+
+
+def failure(kind, error_code="messaging/test"):
+	return {"success": False, "failure": kind, "error_code": error_code, "error": f"{kind} failure"}
+
+
+class TestNirmaanPushDeliveryHealth(FrappeTestCase):
+	def setUp(self):
+		for doctype, field in (("Nirmaan Users", "name"), (OUTBOX_DOCTYPE, "recipient"), (HEALTH_DOCTYPE, "name")):
+			frappe.db.delete(doctype, {field: ("in", TEST_USERS)})
+		invalidate = patch.object(push_health, "invalidate_user_recipients")
+		self.invalidate_user_recipients = invalidate.start()
+		self.addCleanup(invalidate.stop)
+
+	def get_health(self, user):
+		return frappe.db.get_value(
+			HEALTH_DOCTYPE, user,
+			["token_status", *push_health.HEALTH_COUNTER_FIELDS, "last_error_code"],
+			as_dict=True
+		)
+
+	def test_unregistered_token_is_pruned(self):
+		user = TEST_USERS[0]
+		make_user(user, "dead-token")
+		sent = make_outbox_row("_test-push-sent", user, "dead-token", status="Sending")
+		queued = make_outbox_row("_test-push-queued", user, "dead-token")
+		other = make_outbox_row("_test-push-other-token", user, "new-token")
+
+		record_push_results([(sent, failure("unregistered"))])
+
+		self.assertIsNone(frappe.db.get_value("Nirmaan Users", user, "fcm_token"))
+		self.assertEqual(frappe.db.get_value(OUTBOX_DOCTYPE, queued.name, "status"), "Failed")
+		# Only messages queued for the dead token are cancelled
+		self.assertEqual(frappe.db.get_value(OUTBOX_DOCTYPE, other.name, "status"), "Queued")
+		self.assertEqual(frappe.db.get_value(OUTBOX_DOCTYPE, sent.name, "status"), "Sending")
+		self.invalidate_user_recipients.assert_called_once_with(user)
+
+		health = self.get_health(user)
+		self.assertEqual((health.token_status, health.tokens_pruned, health.failed_count), ("Unregistered", 1, 1))
+
+	def test_token_replaced_since_the_send_is_kept(self):
+		user = TEST_USERS[0]
+		make_user(user, "new-token")
+		prune_dead_tokens(user, ["dead-token"])
+		self.assertEqual(frappe.db.get_value("Nirmaan Users", user, "fcm_token"), "new-token")
+
+	def test_transient_and_rejected_failures_do_not_prune(self):
+		user = TEST_USERS[0]
+		make_user(user, "live-token")
+		first = make_outbox_row("_test-push-transient", user, "live-token", status="Sending")
+		queued = make_outbox_row("_test-push-queued", user, "live-token")
+
+		record_push_results([(first, failure("transient")), (first, failure("rejected"))])
+
+		self.assertEqual(frappe.db.get_value("Nirmaan Users", user, "fcm_token"), "live-token")
+		self.assertEqual(frappe.db.get_value(OUTBOX_DOCTYPE, queued.name, "status"), "Queued")
+		self.invalidate_user_recipients.assert_not_called()
+
+		health = self.get_health(user)
+		self.assertEqual((health.token_status, health.tokens_pruned), ("Valid", 0))
+		self.assertEqual((health.failed_count, health.consecutive_failures), (2, 2))
+
+	def test_counters_are_aggregated_across_batches(self):
+		user, other_user = TEST_USERS
+		make_user(user, "token-1")
+		make_user(other_user, "token-2")
+		row = frappe._dict(recipient=user, fcm_token="token-1")
+		other_row = frappe._dict(recipient=other_user, fcm_token="token-2")
+
+		# New rows: one write per user, streak counted after the last success
+		record_push_results([
+			(row, failure("transient")),
+			(row, success()),
+			(row, failure("transient", error_code="messaging/internal-error")),
+			(other_row, success()),
+		])
+		health = self.get_health(user)
+		self.assertEqual((health.sent_count, health.failed_count, health.consecutive_failures), (1, 2, 1))
+		self.assertEqual(health.last_error_code, "messaging/internal-error")
+		self.assertEqual(self.get_health(other_user).sent_count, 1)
+
+		# Existing rows: counters add up and the streak continues
+		record_push_results([(row, failure("transient")), (other_row, success()), (other_row, success())])
+		health = self.get_health(user)
+		self.assertEqual((health.sent_count, health.failed_count, health.consecutive_failures), (1, 3, 2))
+		other_health = self.get_health(other_user)
+		self.assertEqual((other_health.sent_count, other_health.failed_count, other_health.consecutive_failures), (3, 0, 0))
+
+		# A success resets the streak
+		record_push_results([(row, success())])
+		health = self.get_health(user)
+		self.assertEqual((health.sent_count, health.consecutive_failures), (2, 0))
@@ -3,6 +3,8 @@
 
 import frappe
 from frappe.model.document import Document
+from nirmaan_stack.integrations.Notifications.project_recipients import invalidate_user_recipients
+from nirmaan_stack.integrations.controllers.user_name_cache import invalidate_user_names
 
 
 class NirmaanUsers(Document):
@@ -47,6 +49,8 @@ def on_user_update(doc, method=None):
 		profile.mobile_no = doc.mobile_no
 		profile.role_profile = doc.role_profile_name
 		profile.save(ignore_permissions=True)
+		invalidate_user_recipients(profile.name)
+		invalidate_user_names(profile.name)
 
 # Creating infinite loop if enabled with nirmaan users controller on_trash function
 def delete_user_profile(doc, method=None):
@@ -1,9 +1,189 @@
 # Copyright (c) 2024, Abhishek and Contributors
 # See license.txt
 
-# import frappe
+import csv
+import io
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now_datetime
+
+from nirmaan_stack.api.procurement_orders import (
+	PO_ITEM_COLUMNS,
+	_write_csv,
+	generate_po_summary,
+	get_po_item_conditions,
+)
+from nirmaan_stack.integrations.controllers import procurement_orders
+from nirmaan_stack.integrations.controllers.order_totals import calculate_po_totals
+
+
+def make_aq_row(item_id, quote, quantity="10"):
+	return {
+		"item_id": item_id, "vendor": "VEN-0001", "item_name": f"Item {item_id}", "unit": "Nos",
+		"quantity": quantity, "quote": quote, "tax": "18", "make": None, "city": "Bengaluru", "state": "Karnataka",
+	}
+
+
+def make_summary_po(name, project, creation, items, custom="false"):
+	frappe.get_doc({
+		"doctype": "Procurement Orders",
+		"name": name,
+		"project": project,
+		"vendor": "_Test Vendor",
+		"status": "PO Approved",
+		"custom": custom,
+		"creation": creation,
+		"modified": creation,
+		"order_list": frappe.as_json({"list": items}),
+	}).db_insert()
+
+
+def make_summary_item(item_id, category, quantity, quote):
+	return {"name": item_id, "item": f"Item {item_id}", "unit": "Nos", "category": category, "quantity": quantity, "quote": quote, "tax": 18}
 
 
 class TestProcurementOrders(FrappeTestCase):
-	pass
+	def test_po_totals(self):
+		order_list = {"list": [
+			{"quote": 100, "quantity": 3, "tax": 18},
+			{"quote": "55", "quantity": "2", "tax": "5"},
+			{"quote": 10, "tax": 12},
+		]}
+		totals = calculate_po_totals(order_list, "100", "50")
+
+		self.assertEqual(totals["amount"], 300 + 110 + 10)
+		self.assertEqual(totals["tax_amount"], 54 + 5 + 1)
+		self.assertEqual(totals["additional_charges"], 150)
+		self.assertAlmostEqual(totals["additional_charges_tax"], 27)
+		self.assertAlmostEqual(totals["total_amount"], 420 + 60 + 150 + 27)
+
+	def test_po_totals_without_items(self):
+		totals = calculate_po_totals('{"list": []}', 100, 50)
+		self.assertEqual(totals["total_amount"], 0)
+		self.assertEqual(totals["additional_charges"], 0)
+
+	def test_redispatch_replaces_only_changed_quotations(self):
+		existing_aqs = [
+			frappe._dict(make_aq_row("ITEM-1", "100"), name="AQ-1"),
+			frappe._dict(make_aq_row("ITEM-2", "200"), name="AQ-2"),
+			frappe._dict(make_aq_row("ITEM-3", "300"), name="AQ-3"),
+		]
+		desired_rows = [make_aq_row("ITEM-1", "100"), make_aq_row("ITEM-2", "250"), make_aq_row("ITEM-3", "300")]
+		po = frappe._dict(name="PO/001/00001/24-25")
+
+		with (
+			patch.object(procurement_orders, "build_approved_quotation_rows", return_value=desired_rows),
+			patch.object(procurement_orders.frappe, "get_all", return_value=existing_aqs),
+			patch.object(procurement_orders.frappe.db, "delete") as delete,
+			patch.object(procurement_orders.frappe.db, "bulk_insert") as bulk_insert,
+			patch.object(procurement_orders, "apply_approved_quotations"),
+			patch.object(procurement_orders, "evict_cached_item_rates"),
+			patch.object(procurement_orders, "refresh_vendor_item_prices") as refresh_vendor_item_prices,
+		):
+			procurement_orders.sync_approved_quotations(po, frappe._dict())
+
+		delete.assert_called_once_with("Approved Quotations", {"name": ("in", ["AQ-2"])})
+		inserted = bulk_insert.call_args.kwargs["values"]
+		fields = bulk_insert.call_args.kwargs["fields"]
+		self.assertEqual(len(inserted), 1)
+		self.assertEqual(dict(zip(fields, inserted[0]))["quote"], "250")
+		self.assertEqual(dict(zip(fields, inserted[0]))["procurement_order"], po.name)
+		self.assertEqual(
+			sorted(aq["item_id"] for aq in refresh_vendor_item_prices.call_args.args[0]), ["ITEM-2", "ITEM-2"]
+		)
+
+	def test_po_item_conditions(self):
+		conditions, values = get_po_item_conditions(
+			project_id="PROJ-0001", status='["PO Approved", "Dispatched"]', from_date="2026-01-01", to_date="2026-01-31"
+		)
+		self.assertIn("po.status != 'Merged'", conditions)
+		self.assertIn("po.project = %(project_id)s", conditions)
+		self.assertNotIn("%(projects)s", conditions)
+		self.assertEqual(values["status"], ("PO Approved", "Dispatched"))
+		self.assertEqual(str(values["to_date"]), "2026-01-31")
+
+		_conditions, values = get_po_item_conditions(project_id="PROJ-0001", status="Dispatched")
+		self.assertEqual(values["status"], ("Dispatched",))
+
+	def test_po_item_conditions_without_project_use_permitted_projects(self):
+		with patch.object(frappe, "get_list", return_value=["PROJ-0001", "PROJ-0002"]) as get_list:
+			conditions, values = get_po_item_conditions(vendor="VEN-0001")
+		get_list.assert_called_once_with("Projects", pluck="name")
+		self.assertIn("po.project IN %(projects)s", conditions)
+		self.assertEqual(values["projects"], ("PROJ-0001", "PROJ-0002"))
+
+		with patch.object(frappe, "get_list", return_value=[]):
+			conditions, values = get_po_item_conditions()
+		self.assertTrue(conditions.endswith("FALSE"))
+		self.assertNotIn("projects", values)
+
+	def test_po_summary_csv(self):
+		rows = [
+			("PO/001", "2026-01-05 10:00:00", "VEN-0001", "Acme, Ltd.", "Electrical", "Wires", "ITEM-1", "Wire", "Mtr", 10, 4, 55.5, 18, False, 1),
+			("PO/001", "2026-01-05 10:00:00", "VEN-0001", "Acme, Ltd.", "Electrical", "Wires", "ITEM-2", 'Cable "2 core"', "Mtr", 5, None, 80, 18, False, 2),
+		]
+		file = io.BytesIO()
+		_write_csv(iter(rows), file)
+
+		text = file.getvalue().decode("utf-8-sig")
+		parsed = list(csv.reader(io.StringIO(text)))
+		self.assertEqual(parsed[0], [label for _key, label in PO_ITEM_COLUMNS])
+		self.assertEqual(len(parsed), 3)
+		self.assertEqual(parsed[1][3], "Acme, Ltd.")
+		self.assertEqual(parsed[2][7], 'Cable "2 core"')
+		self.assertEqual(parsed[2][10], "")
+
+	def make_summary_pos(self, project):
+		creation = now_datetime()
+		# Same creation for both POs, so the pages also break ties on the PO name
+		make_summary_po(f"{project}/PO-1", project, creation, [
+			make_summary_item("ITEM-1", "Wires", 10, 50),
+			make_summary_item("ITEM-2", "Wires", 4, 100),
+			make_summary_item("ITEM-3", "Switches", 2, 300),
+		])
+		make_summary_po(f"{project}/PO-2", project, creation, [
+			make_summary_item("ITEM-1", "Wires", 5, 60),
+			make_summary_item("ITEM-4", "Switches", 1, 500),
+		])
+		make_summary_po(f"{project}/PO-3", project, creation, [
+			make_summary_item("ITEM-5", "Conduits", 3, 20),
+		], custom="true")
+
+	def test_po_summary_pages_return_every_row_once(self):
+		project = "_Test PO Summary Paging"
+		self.make_summary_pos(project)
+		expected = generate_po_summary(project)
+		self.assertIsNone(expected["next_cursor"])
+		expected_keys = sorted(
+			(row["po_number"], row["item_index"]) for row in expected["po_items"] + expected["custom"]
+		)
+		self.assertEqual(len(expected_keys), 6)
+
+		keys, after, pages = [], None, 0
+		while True:
+			page = generate_po_summary(project, page_length=4 if pages else 2, after=after)
+			keys += [(row["po_number"], row["item_index"]) for row in page["po_items"] + page["custom"]]
+			pages += 1
+			after = page["next_cursor"]
+			if not after:
+				break
+			self.assertLess(pages, 10)
+
+		self.assertEqual(len(keys), len(set(keys)))
+		self.assertEqual(sorted(keys), expected_keys)
+
+	def test_po_summary_group_by_category(self):
+		project = "_Test PO Summary Groups"
+		self.make_summary_pos(project)
+		groups = {group["category"]: group for group in generate_po_summary(project, group_by="category")["groups"]}
+
+		self.assertEqual(set(groups), {"Wires", "Switches", "Conduits"})
+		self.assertEqual(groups["Wires"]["quantity"], 19)
+		self.assertEqual(groups["Wires"]["amount"], 10 * 50 + 4 * 100 + 5 * 60)
+		self.assertEqual(groups["Wires"]["po_count"], 2)
+		self.assertAlmostEqual(float(groups["Switches"]["amount_with_tax"]), (600 + 500) * 1.18)
+
+		with self.assertRaises(frappe.ValidationError):
+			generate_po_summary(project, group_by="vendor")
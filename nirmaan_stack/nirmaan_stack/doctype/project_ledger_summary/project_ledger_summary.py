@@ -0,0 +1,178 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, now_datetime
+
+LEDGER_DOCTYPE = "Project Ledger Summary"
+EXCLUDED_PO_STATUSES = ("Cancelled", "Merged", "PO Amendment")
+APPROVED_SR_STATUS = "Approved"
+PAID_PAYMENT_STATUS = "Paid"
+REQUESTED_PAYMENT_STATUSES = ("Requested", "Approved")
+AMOUNT_FIELDS = ("po_amount", "sr_amount", "amount_paid", "amount_requested", "inflow_amount")
+
+# Source doctype -> fields get_ledger_entries needs
+LEDGER_SOURCES = {
+	"Procurement Orders": ["project", "status", "total_amount"],
+	"Service Requests": ["project", "status", "total_amount"],
+	"Project Payments": ["project", "status", "amount"],
+	"Project Inflows": ["project", "amount"],
+}
+
+
+class ProjectLedgerSummary(Document):
+	pass
+
+
+def get_ledger_entries(doctype, doc) -> dict:
+	"""
+	What one source document contributes to the ledger.
+
+	Returns:
+		dict: (project, ledger field) -> amount; empty if it contributes nothing.
+	"""
+	if not doc or not doc.get("project"):
+		return {}
+
+	project, status = doc.get("project"), doc.get("status")
+	if doctype == "Procurement Orders" and status not in EXCLUDED_PO_STATUSES:
+		return {(project, "po_amount"): flt(doc.get("total_amount"))}
+	if doctype == "Service Requests" and status == APPROVED_SR_STATUS:
+		return {(project, "sr_amount"): flt(doc.get("total_amount"))}
+	if doctype == "Project Payments":
+		if status == PAID_PAYMENT_STATUS:
+			return {(project, "amount_paid"): flt(doc.get("amount"))}
+		if status in REQUESTED_PAYMENT_STATUSES:
+			return {(project, "amount_requested"): flt(doc.get("amount"))}
+	if doctype == "Project Inflows":
+		return {(project, "inflow_amount"): flt(doc.get("amount"))}
+	return {}
+
+
+def get_amount_due(values) -> float:
+	return flt(values.get("po_amount")) + flt(values.get("sr_amount")) - flt(values.get("amount_paid"))
+
+
+def update_project_ledger(doc, method=None):
+	"""
+	doc_event (on_update / after_delete) of the ledger source doctypes:
+	applies the difference between what the document contributed before
+	this save and what it contributes now.
+	"""
+	if method == "after_delete":
+		old, new = get_ledger_entries(doc.doctype, doc), {}
+	else:
+		old = get_ledger_entries(doc.doctype, doc.get_doc_before_save())
+		new = get_ledger_entries(doc.doctype, doc)
+
+	deltas = dict(new)
+	for key, amount in old.items():
+		deltas[key] = deltas.get(key, 0) - amount
+	apply_ledger_deltas(deltas)
+
+
+def apply_ledger_deltas(deltas) -> None:
+	"""
+	Adds (project, field) -> delta amounts to the ledger rows with one
+	atomic UPDATE per project. A project without a ledger row gets it built
+	from the current data instead, which already includes the change.
+	"""
+	by_project = {}
+	for (project, field), delta in deltas.items():
+		if delta:
+			by_project.setdefault(project, {})[field] = delta
+	if not by_project:
+		return
+
+	existing = set(frappe.get_all(LEDGER_DOCTYPE, filters={"name": ("in", list(by_project))}, pluck="name"))
+	missing = [project for project in by_project if project not in existing]
+	if missing:
+		rebuild_project_ledgers(missing)
+
+	Ledger = frappe.qb.DocType(LEDGER_DOCTYPE)
+	for project in existing:
+		fields = by_project[project]
+		query = frappe.qb.update(Ledger).set(Ledger.modified, now_datetime()).where(Ledger.name == project)
+		for field, delta in fields.items():
+			query = query.set(Ledger[field], Ledger[field] + delta)
+		due_delta = get_amount_due(fields)
+		if due_delta:
+			query = query.set(Ledger.amount_due, Ledger.amount_due + due_delta)
+		query.run()
+
+
+def rebuild_project_ledgers(projects=None) -> int:
+	"""
+	Recomputes ledger rows from the source documents, for the given
+	projects or, by default, for every project. Repairs any drift left by
+	writes that bypass the doc_events (e.g. frappe.db.set_value):
+	bench --site [site] execute nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary.rebuild_project_ledgers
+
+	Returns:
+		int: ledger rows written.
+	"""
+	if projects is None:
+		projects = frappe.get_all("Projects", pluck="name")
+		project_filters = {}
+		frappe.db.delete(LEDGER_DOCTYPE)
+	else:
+		project_filters = {"project": ("in", projects)}
+		frappe.db.delete(LEDGER_DOCTYPE, {"name": ("in", projects)})
+	if not projects:
+		return 0
+
+	totals = {project: dict.fromkeys(AMOUNT_FIELDS, 0) for project in projects}
+	for doctype, fields in LEDGER_SOURCES.items():
+		for row in frappe.get_all(doctype, filters=project_filters, fields=fields):
+			for (project, field), amount in get_ledger_entries(doctype, row).items():
+				if project in totals:
+					totals[project][field] += amount
+
+	timestamp = now_datetime()
+	frappe.db.bulk_insert(
+		LEDGER_DOCTYPE,
+		fields=[
+			"name", "creation", "modified", "owner", "modified_by", "project",
+			*AMOUNT_FIELDS, "amount_due", "last_rebuilt_on"
+		],
+		values=[
+			(
+				project, timestamp, timestamp, "Administrator", "Administrator", project,
+				*(values[field] for field in AMOUNT_FIELDS), get_amount_due(values), timestamp
+			)
+			for project, values in totals.items()
+		],
+		ignore_duplicates=True
+	)
+	return len(totals)
+
+
+def get_project_ledgers(projects) -> dict:
+	"""Ledger rows of the given projects, building any that are missing."""
+	if not projects:
+		return {}
+
+	fields = ["project", *AMOUNT_FIELDS, "amount_due"]
+	ledgers = {
+		row.project: row
+		for row in frappe.get_all(LEDGER_DOCTYPE, filters={"name": ("in", projects)}, fields=fields)
+	}
+	missing = [project for project in projects if project not in ledgers]
+	if missing:
+		rebuild_project_ledgers(missing)
+		ledgers.update({
+			row.project: row
+			for row in frappe.get_all(LEDGER_DOCTYPE, filters={"name": ("in", missing)}, fields=fields)
+		})
+	return ledgers
+
+
+@frappe.whitelist()
+def get_project_ledger_summary(project: str):
+	"""
+	Returns the financial summary of a project: PO and SR commitments,
+	amounts paid and requested, inflows and the amount due.
+	"""
+	frappe.has_permission("Projects", doc=project, throw=True)
+	return get_project_ledgers([project]).get(project)
@@ -0,0 +1,35 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary import (
+	get_amount_due,
+	get_ledger_entries,
+)
+
+
+class TestProjectLedgerSummary(FrappeTestCase):
+	def test_ledger_entries(self):
+		po = frappe._dict(project="PROJ-1", status="PO Approved", total_amount=1180)
+		self.assertEqual(get_ledger_entries("Procurement Orders", po), {("PROJ-1", "po_amount"): 1180})
+		po.status = "Merged"
+		self.assertEqual(get_ledger_entries("Procurement Orders", po), {})
+
+		sr = frappe._dict(project="PROJ-1", status="Pending", total_amount=500)
+		self.assertEqual(get_ledger_entries("Service Requests", sr), {})
+		sr.status = "Approved"
+		self.assertEqual(get_ledger_entries("Service Requests", sr), {("PROJ-1", "sr_amount"): 500})
+
+		payment = frappe._dict(project="PROJ-1", status="Requested", amount="300")
+		self.assertEqual(get_ledger_entries("Project Payments", payment), {("PROJ-1", "amount_requested"): 300})
+		payment.status = "Paid"
+		self.assertEqual(get_ledger_entries("Project Payments", payment), {("PROJ-1", "amount_paid"): 300})
+
+		inflow = frappe._dict(project="PROJ-1", amount="1000")
+		self.assertEqual(get_ledger_entries("Project Inflows", inflow), {("PROJ-1", "inflow_amount"): 1000})
+		self.assertEqual(get_ledger_entries("Project Inflows", None), {})
+
+	def test_amount_due(self):
+		self.assertEqual(get_amount_due({"po_amount": 1180, "sr_amount": 500, "amount_paid": 300}), 1380)
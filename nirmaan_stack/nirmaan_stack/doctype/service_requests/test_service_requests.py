@@ -4,6 +4,18 @@
 # import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from nirmaan_stack.integrations.controllers.order_totals import calculate_sr_totals
+
 
 class TestServiceRequests(FrappeTestCase):
-	pass
+	def test_sr_totals(self):
+		service_order_list = {"list": [{"rate": "250", "quantity": 4}, {"rate": 100, "quantity": "1"}]}
+
+		with_gst = calculate_sr_totals(service_order_list, "true")
+		self.assertEqual(with_gst["amount"], 1100)
+		self.assertAlmostEqual(with_gst["tax_amount"], 198)
+		self.assertAlmostEqual(with_gst["total_amount"], 1298)
+
+		without_gst = calculate_sr_totals(service_order_list, "false")
+		self.assertEqual(without_gst["tax_amount"], 0)
+		self.assertEqual(without_gst["total_amount"], 1100)
@@ -0,0 +1,26 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from nirmaan_stack.nirmaan_stack.doctype.vendor_invoices.vendor_invoices import get_invoice_date, get_invoice_values
+
+
+class TestVendorInvoices(FrappeTestCase):
+	def test_invoice_date_from_key(self):
+		self.assertEqual(get_invoice_date("2024-01-15"), getdate("2024-01-15"))
+		self.assertEqual(get_invoice_date("2024-01-15_10:30:05.123456"), getdate("2024-01-15"))
+		self.assertIsNone(get_invoice_date("not a date"))
+
+	def test_invoice_values(self):
+		po = frappe._dict(doctype="Procurement Orders", name="PO/001/00001/24-25", project="PROJ-1", vendor="VEN-1")
+		entry = {"invoice_no": "INV-7", "amount": "1250.50", "updated_by": "a@nirmaan.app", "invoice_attachment_id": "ATT-1"}
+		values = get_invoice_values(po, "2024-01-15_10:30:05.123456", entry)
+
+		self.assertEqual(values["document_name"], po.name)
+		self.assertEqual(values["amount"], 1250.5)
+		self.assertEqual(values["status"], "Pending")
+		self.assertEqual(values["invoice_attachment"], "ATT-1")
+		self.assertEqual(values["date_key"], "2024-01-15_10:30:05.123456")
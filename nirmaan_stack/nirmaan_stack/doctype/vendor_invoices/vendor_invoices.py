@@ -0,0 +1,132 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, now_datetime
+
+from nirmaan_stack.api.projects.project_wise_invoice_data import bump_project_invoice_version
+
+# One row per entry of the invoice_data JSON of Procurement Orders and
+# Service Requests ({"data": {date_key: entry}}). update_invoice_data,
+# delete_invoice_entry and update_invoice_task_status write both, so
+# invoice queries can filter on indexed columns instead of parsing JSON.
+
+INVOICE_DOCTYPE = "Vendor Invoices"
+INVOICE_SOURCE_DOCTYPES = ("Procurement Orders", "Service Requests")
+REBUILD_BATCH_SIZE = 500
+
+
+class VendorInvoices(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index(INVOICE_DOCTYPE, ["project", "vendor", "status", "invoice_date"])
+	frappe.db.add_index(INVOICE_DOCTYPE, ["document_type", "document_name", "date_key"])
+
+
+def get_invoice_date(date_key):
+	"""The date part of an invoice_data key ("2024-01-15" or "2024-01-15_10:30:05.123456")."""
+	try:
+		return getdate(str(date_key)[:10])
+	except Exception:
+		return None
+
+
+def get_invoice_values(parent_doc, date_key, entry) -> dict:
+	"""Field values of the invoice row for one invoice_data entry of `parent_doc`."""
+	return {
+		"document_type": parent_doc.get("doctype"),
+		"document_name": parent_doc.get("name"),
+		"project": parent_doc.get("project"),
+		"vendor": parent_doc.get("vendor"),
+		"invoice_no": entry.get("invoice_no"),
+		"invoice_date": get_invoice_date(date_key),
+		"date_key": date_key,
+		"amount": flt(entry.get("amount")),
+		"status": entry.get("status") or "Pending",
+		"invoice_attachment": entry.get("invoice_attachment_id"),
+		"updated_by": entry.get("updated_by"),
+	}
+
+
+def add_invoice_entry(parent_doc, date_key, entry) -> None:
+	frappe.get_doc({"doctype": INVOICE_DOCTYPE, **get_invoice_values(parent_doc, date_key, entry)}).insert(
+		ignore_permissions=True
+	)
+
+
+def delete_invoice_entry_row(document_type, document_name, date_key) -> None:
+	frappe.db.delete(INVOICE_DOCTYPE, {
+		"document_type": document_type, "document_name": document_name, "date_key": date_key
+	})
+
+
+def set_invoice_entry_status(document_type, document_name, date_key, status) -> None:
+	frappe.db.set_value(
+		INVOICE_DOCTYPE,
+		{"document_type": document_type, "document_name": document_name, "date_key": date_key},
+		"status",
+		status
+	)
+
+
+def rebuild_vendor_invoices(doctypes=INVOICE_SOURCE_DOCTYPES, batch_size=REBUILD_BATCH_SIZE) -> int:
+	"""
+	Rebuilds the invoice rows from the invoice_data of every Procurement
+	Order and Service Request:
+	bench --site [site] execute nirmaan_stack.nirmaan_stack.doctype.vendor_invoices.vendor_invoices.rebuild_vendor_invoices
+
+	Returns:
+		int: invoice rows written.
+	"""
+	fields = [
+		"name", "creation", "modified", "owner", "modified_by",
+		"document_type", "document_name", "project", "vendor", "invoice_no", "invoice_date",
+		"date_key", "amount", "status", "invoice_attachment", "updated_by"
+	]
+	written = 0
+	for doctype in doctypes:
+		# Projects that lose rows get a fresh invoice cache too
+		for project in frappe.get_all(
+			INVOICE_DOCTYPE, filters={"document_type": doctype}, pluck="project", distinct=True
+		):
+			bump_project_invoice_version(project)
+		frappe.db.delete(INVOICE_DOCTYPE, {"document_type": doctype})
+		last_name = ""
+		while True:
+			docs = frappe.get_all(
+				doctype,
+				filters={"name": (">", last_name)},
+				fields=["name", "project", "vendor", "invoice_data"],
+				order_by="name asc",
+				limit=batch_size
+			)
+			if not docs:
+				break
+
+			timestamp = now_datetime()
+			values = []
+			for doc in docs:
+				invoice_data = frappe.parse_json(doc.invoice_data) if doc.invoice_data else None
+				if not isinstance(invoice_data, dict) or not isinstance(invoice_data.get("data"), dict):
+					continue
+				doc.doctype = doctype
+				for date_key, entry in invoice_data["data"].items():
+					if not isinstance(entry, dict):
+						continue
+					row = get_invoice_values(doc, date_key, entry)
+					values.append((
+						frappe.generate_hash(length=10), timestamp, timestamp, "Administrator", "Administrator",
+						*(row[field] for field in fields[5:])
+					))
+
+			if values:
+				frappe.db.bulk_insert(INVOICE_DOCTYPE, fields=fields, values=values)
+			for project in {doc.project for doc in docs if doc.project}:
+				bump_project_invoice_version(project)
+			frappe.db.commit()
+			written += len(values)
+			last_name = docs[-1].name
+	return written
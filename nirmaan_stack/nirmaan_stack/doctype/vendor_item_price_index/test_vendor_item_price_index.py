@@ -0,0 +1,61 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, now_datetime
+
+from nirmaan_stack.api.vendor_item_prices import get_top_vendors_for_items
+from nirmaan_stack.nirmaan_stack.doctype.vendor_item_price_index.vendor_item_price_index import _insert_index_rows
+
+TEST_ITEMS = ("_Test Price Item 1", "_Test Price Item 2")
+
+
+def make_price_row(item_id, vendor, quote, city="Pune", state="Maharashtra", days_ago=1):
+	return {
+		"item_id": item_id, "vendor": vendor, "city": city, "state": state, "quote_count": 1,
+		"last_quote": quote, "min_quote": quote, "median_quote": quote, "max_quote": quote,
+		"weighted_average_quote": quote, "last_procurement_order": None,
+		"last_po_date": add_days(now_datetime(), -days_ago),
+	}
+
+
+class TestVendorItemPriceIndex(FrappeTestCase):
+	def setUp(self):
+		frappe.db.delete("Vendor Item Price Index", {"item_id": ["in", TEST_ITEMS]})
+		item_1, item_2 = TEST_ITEMS
+		_insert_index_rows([
+			# The same vendor quoted from two cities
+			make_price_row(item_1, "VEN-1", 100),
+			make_price_row(item_1, "VEN-1", 90, city="Mumbai", days_ago=30),
+			make_price_row(item_1, "VEN-2", 95),
+			make_price_row(item_1, "VEN-3", 120),
+			make_price_row(item_1, "VEN-4", 0),
+			make_price_row(item_2, "VEN-1", 40),
+			make_price_row(item_2, "VEN-2", 40, days_ago=10),
+		])
+
+	def vendors(self, rows):
+		return [(row.vendor, row.last_quote) for row in rows]
+
+	def test_vendors_are_ranked_once_each(self):
+		top_vendors = get_top_vendors_for_items(list(TEST_ITEMS), limit=2)
+		item_1, item_2 = TEST_ITEMS
+
+		self.assertEqual(self.vendors(top_vendors[item_1]), [("VEN-1", 90), ("VEN-2", 95)])
+		self.assertEqual(top_vendors[item_1][0].city, "Mumbai")
+		# Equal prices: the most recent PO first
+		self.assertEqual(self.vendors(top_vendors[item_2]), [("VEN-1", 40), ("VEN-2", 40)])
+
+		top_vendors = get_top_vendors_for_items(frappe.as_json([item_1]), limit=10)
+		self.assertEqual([row.vendor for row in top_vendors[item_1]], ["VEN-1", "VEN-2", "VEN-3"])
+		self.assertNotIn("vendor_rank", top_vendors[item_1][0])
+
+	def test_city_filter(self):
+		item_1 = TEST_ITEMS[0]
+		top_vendors = get_top_vendors_for_items([item_1], city="Pune")
+		self.assertEqual(self.vendors(top_vendors[item_1]), [("VEN-2", 95), ("VEN-1", 100), ("VEN-3", 120)])
+
+	def test_invalid_ranking_field(self):
+		with self.assertRaises(frappe.ValidationError):
+			get_top_vendors_for_items(list(TEST_ITEMS), order_by="max_quote")
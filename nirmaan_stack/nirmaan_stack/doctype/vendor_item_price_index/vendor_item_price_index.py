@@ -0,0 +1,129 @@
+# Copyright (c) 2026, Nirmaan (Stratos Infra Technologies Pvt. Ltd.) and contributors
+# For license information, please see license.txt
+
+import statistics
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cstr, now_datetime
+from nirmaan_stack.nirmaan_stack.doctype.item_rate_stats.item_rate_stats import parse_approved_quotation
+
+SOURCE_FIELDS = ["name", "item_id", "vendor", "city", "state", "quote", "quantity", "creation", "procurement_order"]
+INDEX_FIELDS = [
+	"item_id", "vendor", "city", "state", "quote_count", "last_quote", "min_quote", "median_quote",
+	"max_quote", "weighted_average_quote", "last_procurement_order", "last_po_date"
+]
+REBUILD_PAGE_SIZE = 50000
+
+
+class VendorItemPriceIndex(Document):
+	pass
+
+
+def get_price_key(aq):
+	"""The index is keyed by (item_id, vendor, city, state)."""
+	return (aq.get("item_id"), aq.get("vendor"), cstr(aq.get("city")), cstr(aq.get("state")))
+
+
+def _build_index_rows(approved_quotations):
+	"""Aggregates Approved Quotation rows into one price row per (item_id, vendor, city, state)."""
+	grouped = {}
+	for aq in approved_quotations:
+		parsed = parse_approved_quotation(aq)
+		if parsed and aq.get("vendor"):
+			grouped.setdefault(get_price_key(aq), []).append((parsed[1], parsed[2], parsed[3], aq.get("procurement_order")))
+
+	latest_by_key = {key: max(quotes, key=lambda quote: quote[2]) for key, quotes in grouped.items()}
+	po_names = list({latest[3] for latest in latest_by_key.values() if latest[3]})
+	po_dates = {
+		po.name: po.creation
+		for po in frappe.get_all("Procurement Orders", filters={"name": ["in", po_names]}, fields=["name", "creation"])
+	} if po_names else {}
+
+	rows = []
+	for key, quotes in grouped.items():
+		item_id, vendor, city, state = key
+		rates = [quote for quote, _quantity, _creation, _po in quotes]
+		total_quantity = sum(quantity for _quote, quantity, _creation, _po in quotes)
+		latest = latest_by_key[key]
+		rows.append({
+			"item_id": item_id,
+			"vendor": vendor,
+			"city": city or None,
+			"state": state or None,
+			"quote_count": len(quotes),
+			"last_quote": latest[0],
+			"min_quote": min(rates),
+			"median_quote": statistics.median(rates),
+			"max_quote": max(rates),
+			"weighted_average_quote": sum(quote * quantity for quote, quantity, _creation, _po in quotes) / total_quantity,
+			"last_procurement_order": latest[3],
+			"last_po_date": po_dates.get(latest[3], latest[2]),
+		})
+	return rows
+
+
+def _insert_index_rows(rows):
+	if not rows:
+		return
+	timestamp = now_datetime()
+	fields = ["name", "creation", "modified", "owner", "modified_by", *INDEX_FIELDS]
+	frappe.db.bulk_insert(
+		"Vendor Item Price Index",
+		fields=fields,
+		values=[
+			(frappe.generate_hash(length=10), timestamp, timestamp, "Administrator", "Administrator", *(row[field] for field in INDEX_FIELDS))
+			for row in rows
+		]
+	)
+
+
+def refresh_vendor_item_prices(approved_quotations):
+	"""
+	Recomputes the price index rows touched by a change to Approved Quotations.
+	All (item, vendor) pairs among the changed rows are re-aggregated from one
+	query, then replaced with a single delete and a single multi-row insert.
+
+	Args:
+		approved_quotations: The inserted and/or deleted Approved Quotation rows.
+	"""
+	item_ids = list({aq.get("item_id") for aq in approved_quotations if aq.get("item_id") and aq.get("vendor")})
+	vendors = list({aq.get("vendor") for aq in approved_quotations if aq.get("item_id") and aq.get("vendor")})
+	if not item_ids:
+		return
+
+	source_rows = frappe.get_all(
+		"Approved Quotations",
+		filters={"item_id": ["in", item_ids], "vendor": ["in", vendors]},
+		fields=SOURCE_FIELDS
+	)
+	frappe.db.delete("Vendor Item Price Index", {"item_id": ["in", item_ids], "vendor": ["in", vendors]})
+	_insert_index_rows(_build_index_rows(source_rows))
+
+
+def rebuild_vendor_item_price_index():
+	"""
+	Rebuilds the whole price index from Approved Quotations. Used by the
+	backfill patch and for drift repair:
+	bench --site [site] execute nirmaan_stack.nirmaan_stack.doctype.vendor_item_price_index.vendor_item_price_index.rebuild_vendor_item_price_index
+	"""
+	source_rows = []
+	start = 0
+	while True:
+		rows = frappe.get_all(
+			"Approved Quotations",
+			filters={"item_id": ["is", "set"], "vendor": ["is", "set"]},
+			fields=SOURCE_FIELDS,
+			order_by="name asc",
+			limit_start=start,
+			limit_page_length=REBUILD_PAGE_SIZE
+		)
+		source_rows.extend(rows)
+		if len(rows) < REBUILD_PAGE_SIZE:
+			break
+		start += REBUILD_PAGE_SIZE
+
+	frappe.db.delete("Vendor Item Price Index")
+	index_rows = _build_index_rows(source_rows)
+	_insert_index_rows(index_rows)
+	return len(index_rows)
@@ -0,0 +1,12 @@
+import frappe
+from nirmaan_stack.integrations.controllers.order_totals import ORDER_TOTALS, backfill_order_totals
+
+def execute():
+    """
+    Fills the stored totals (amount, tax, additional charges, total) of all
+    existing Procurement Orders and Service Requests from their order lists.
+    """
+    frappe.db.auto_commit_on_many_writes = 1
+    for doctype in ORDER_TOTALS:
+        updated = backfill_order_totals(doctype)
+        print(f"Backfilled totals of {updated} {doctype}")
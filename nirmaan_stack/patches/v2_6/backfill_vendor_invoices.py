@@ -0,0 +1,11 @@
+import frappe
+from nirmaan_stack.nirmaan_stack.doctype.vendor_invoices.vendor_invoices import rebuild_vendor_invoices
+
+def execute():
+    """
+    Backfills Vendor Invoices with one row per invoice_data entry of the
+    existing Procurement Orders and Service Requests.
+    """
+    frappe.db.auto_commit_on_many_writes = 1
+    rows_built = rebuild_vendor_invoices()
+    print(f"Built {rows_built} Vendor Invoices rows")
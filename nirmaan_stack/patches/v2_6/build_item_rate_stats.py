@@ -0,0 +1,11 @@
+import frappe
+from nirmaan_stack.nirmaan_stack.doctype.item_rate_stats.item_rate_stats import rebuild_item_rate_stats
+
+def execute():
+    """
+    Backfills Item Rate Stats (monthly quantity-weighted sums, counts and the
+    latest quote per item) from all existing Approved Quotations.
+    """
+    frappe.db.auto_commit_on_many_writes = 1
+    items_built = rebuild_item_rate_stats()
+    print(f"Built Item Rate Stats for {items_built} items")
@@ -0,0 +1,11 @@
+import frappe
+from nirmaan_stack.nirmaan_stack.doctype.project_ledger_summary.project_ledger_summary import rebuild_project_ledgers
+
+def execute():
+    """
+    Builds a Project Ledger Summary row for every project from its existing
+    Procurement Orders, Service Requests, Project Payments and Project Inflows.
+    """
+    frappe.db.auto_commit_on_many_writes = 1
+    rows_built = rebuild_project_ledgers()
+    print(f"Built {rows_built} Project Ledger Summary rows")
@@ -0,0 +1,12 @@
+import frappe
+from nirmaan_stack.nirmaan_stack.doctype.vendor_item_price_index.vendor_item_price_index import rebuild_vendor_item_price_index
+
+def execute():
+    """
+    Backfills the Vendor Item Price Index (last/min/median/max and
+    quantity-weighted quotes per item, vendor and location) from all existing
+    Approved Quotations.
+    """
+    frappe.db.auto_commit_on_many_writes = 1
+    rows_built = rebuild_vendor_item_price_index()
+    print(f"Built {rows_built} Vendor Item Price Index rows")